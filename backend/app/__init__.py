@@ -1,3 +1,5 @@
+import os
+from datetime import datetime, timezone
 from flask import Flask, jsonify
 from flask_cors import CORS
 from .config import config
@@ -7,7 +9,21 @@ from app.routes.food_resource_routes import food_resource_bp
 from app.routes.reporting_routes import reporting_bp
 from app.models.report import Report  
 from app.models.food_resource import FoodResource
+from app.models.data_version import DataVersion
+from app.models.accessibility_score import AccessibilityScore
 from app.routes.suggestion_routes import suggestion_bp
+from app.routes.tile_routes import tile_bp
+from app.routes.neighborhood_routes import neighborhood_bp
+from app.routes.analytics_routes import analytics_bp
+from app.routes.raster_routes import raster_bp
+from app.utils.compression import compress_response, supported_encodings
+from app.utils.resource_cache import resource_snapshots
+from app.utils.spatial_index import resource_grid
+from app.utils.clustering import resource_clusters
+from app.utils.tiles import resource_tiles
+from app.utils.neighborhoods import neighborhood_index
+from app.utils.boundaries import neighborhood_boundaries
+from app.utils.distance_raster import raster_tiles, resource_raster
 
 def create_app(config_name="default"):
     app = Flask(__name__)
@@ -27,11 +43,50 @@ def create_app(config_name="default"):
     # Initialize database
     init_db(app)
     
+    # Size the encoded-response cache for public resource reads
+    resource_snapshots.max_entries = app.config["RESOURCE_SNAPSHOT_MAX_ENTRIES"]
+    resource_grid.cell_size = app.config["SPATIAL_GRID_CELL_DEG"]
+    resource_clusters.radius_px = app.config["CLUSTER_RADIUS_PX"]
+    resource_clusters.max_zoom = app.config["CLUSTER_MAX_ZOOM"]
+    resource_tiles.max_entries = app.config["TILE_MEMORY_ENTRIES"]
+    resource_tiles.directory = app.config["TILE_CACHE_DIR"] or os.path.join(app.instance_path, "tiles")
+    resource_raster.cell_meters = app.config["RASTER_CELL_METERS"]
+    resource_raster.resource_types = tuple(app.config["RASTER_RESOURCE_TYPES"])
+    resource_raster.max_miles = app.config["RASTER_MAX_MILES"]
+    resource_raster.directory = app.config["RASTER_DIR"] or os.path.join(app.instance_path, "raster")
+    raster_tiles.max_entries = app.config["RASTER_TILE_MEMORY_ENTRIES"]
+    
+    # Neighborhood polygons for point-in-polygon lookups and simplified
+    # boundary payloads, built and compressed once per process
+    neighborhoods_path = app.config["NEIGHBORHOODS_GEOJSON"]
+    if neighborhood_index.path != neighborhoods_path and os.path.exists(neighborhoods_path):
+        neighborhood_index.load(neighborhoods_path)
+        mtime = os.path.getmtime(neighborhoods_path)
+        with app.app_context():
+            neighborhood_boundaries.build(
+                neighborhood_index.features,
+                app.config["NEIGHBORHOOD_BOUNDARY_ZOOMS"],
+                app.config["NEIGHBORHOOD_BOUNDARY_TOLERANCE_PX"],
+                version=int(mtime),
+                last_modified=datetime.fromtimestamp(mtime, timezone.utc),
+                dumps=app.json.dumps
+            )
+            for snapshot in neighborhood_boundaries.snapshots():
+                for encoding in supported_encodings():
+                    snapshot.compressed(encoding)
+    
     # Register blueprints
     app.register_blueprint(user_bp)
     app.register_blueprint(food_resource_bp)
     app.register_blueprint(reporting_bp)
     app.register_blueprint(suggestion_bp)
+    app.register_blueprint(tile_bp)
+    app.register_blueprint(neighborhood_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(raster_bp)
+    
+    # gzip/brotli for responses that were not compressed from a cache
+    app.after_request(compress_response)
     
     # Health check endpoint
     @app.route("/api/health")
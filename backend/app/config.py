@@ -15,10 +15,71 @@ class Config:
     
     # Database
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_WAL = True  # Write-ahead log on SQLite so reads are not blocked while an import merges
     
     # CORS
     CORS_ORIGINS = ["http://localhost:3000"]
     CORS_SUPPORTS_CREDENTIALS = True  # Required for session cookies with CORS
+    
+    # Caching
+    RESOURCE_SNAPSHOT_MAX_ENTRIES = 256  # Encoded FeatureCollections kept per worker; 0 streams every list request
+    RESOURCE_STREAM_BATCH_SIZE = 500  # Rows fetched and encoded per chunk when building/streaming lists
+    RESOURCE_PAGE_DEFAULT_LIMIT = 500  # Page size for after_id keyset paging without an explicit limit
+    RESOURCE_PAGE_MAX_LIMIT = 5000
+    RESOURCE_BATCH_MAX_IDS = 500  # Max ids accepted by ?ids=1,2,3
+    COLUMNAR_COORD_PRECISION = 5  # Decimal places kept in columnar coordinates (~1 m)
+    PUBLIC_CACHE_MAX_AGE = 60  # Seconds clients may reuse public GET responses
+    PUBLIC_CACHE_STALE_WHILE_REVALIDATE = 300  # Seconds a stale copy may be served while revalidating
+    
+    # Spatial search
+    SPATIAL_GRID_CELL_DEG = 0.01  # Grid index cell size in degrees (~0.7 mi at Pittsburgh)
+    NEARBY_DEFAULT_RADIUS_MILES = 2
+    NEARBY_MAX_RADIUS_MILES = 50
+    NEARBY_DEFAULT_LIMIT = 100
+    NEARBY_MAX_LIMIT = 500
+    NEAREST_DEFAULT_K = 5
+    NEAREST_MAX_K = 50
+    VIEWPORT_MAX_LIMIT = 2000  # Most features returned for one bbox request
+    VIEWPORT_LIMITS_BY_ZOOM = {0: 200, 11: 500, 13: 1000, 15: 2000}  # Cap from the highest zoom key <= requested zoom
+    CLUSTER_RADIUS_PX = 60  # Cluster cell size in screen pixels
+    CLUSTER_MAX_ZOOM = 16  # Above this zoom, /clusters returns individual resources
+    
+    # Opening hours
+    HOURS_TIMEZONE = "America/New_York"  # Resource hours are local times; naive open_at values use this zone
+    
+    # Search
+    SEARCH_DEFAULT_LIMIT = 20
+    SEARCH_MAX_LIMIT = 100
+    
+    # Tiles
+    TILE_MAX_ZOOM = 18
+    TILE_POINT_MIN_ZOOM = 12  # Lower zoom tiles carry clusters instead of points
+    TILE_MEMORY_ENTRIES = 2048  # Encoded tiles kept in memory per worker
+    TILE_CACHE_DIR = os.environ.get("TILE_CACHE_DIR")  # Defaults to <instance>/tiles
+    
+    # Compression
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024  # Bytes; smaller bodies are sent as they are
+    COMPRESS_GZIP_LEVEL = 6  # Cached payloads are compressed once, per-request ones on every response
+    COMPRESS_BROTLI_QUALITY = 9  # Used only when the optional brotli package is installed
+    
+    # Neighborhoods
+    NEIGHBORHOODS_GEOJSON = os.path.join(BASE_DIR, "..", "data", "neighborhoods.geojson")
+    NEIGHBORHOOD_BOUNDARY_ZOOMS = (10, 12, 14, 16)  # Simplified boundary levels precomputed at startup
+    NEIGHBORHOOD_BOUNDARY_TOLERANCE_PX = 1.0  # Douglas-Peucker tolerance in screen pixels at each level
+    
+    # Accessibility (2SFCA batch job)
+    ACCESSIBILITY_CATCHMENT_MILES = 1.0
+    ACCESSIBILITY_DECAY = "gaussian"  # gaussian, linear or none
+    ACCESSIBILITY_DEMAND_PROPERTY = None  # Numeric block group property used as demand; None weighs block groups equally
+    ACCESSIBILITY_GRID_CELL_DEG = 0.01  # Grid cell for the job's catchment neighbor search
+    
+    # Distance raster (heatmap overlay)
+    RASTER_CELL_METERS = 100
+    RASTER_RESOURCE_TYPES = ("grocery", "pantry", "farmers_market")  # One layer per type
+    RASTER_MAX_MILES = 3.0  # Distances are capped here, which bounds what a single write recomputes
+    RASTER_DIR = os.environ.get("RASTER_DIR")  # Defaults to <instance>/raster
+    RASTER_TILE_MEMORY_ENTRIES = 1024  # Rendered heatmap tiles kept in memory per worker
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,60 @@
+# backfill_neighborhoods.py
+import argparse
+import json
+
+from app import create_app
+from app.database.db import db
+from app.models.food_resource import FoodResource
+from app.utils.neighborhoods import neighborhood_index
+from app.utils.resource_cache import bump_resource_version
+
+
+def backfill(overwrite: bool = False) -> dict:
+    """
+    Assign neighborhoods to food resources from their coordinates.
+    Only rows without a neighborhood are touched unless `overwrite` is set.
+    """
+    if not neighborhood_index.loaded:
+        raise SystemExit("Neighborhood polygons not loaded (check NEIGHBORHOODS_GEOJSON)")
+
+    query = db.session.query(
+        FoodResource.id, FoodResource.latitude, FoodResource.longitude, FoodResource.neighborhood
+    )
+    if not overwrite:
+        query = query.filter(db.or_(FoodResource.neighborhood.is_(None), FoodResource.neighborhood == ""))
+    rows = query.all()
+
+    names = neighborhood_index.names_for(
+        [r.latitude for r in rows], [r.longitude for r in rows]
+    )
+    updates = [
+        {"id": r.id, "neighborhood": name}
+        for r, name in zip(rows, names)
+        if name is not None and name != r.neighborhood
+    ]
+
+    if updates:
+        db.session.bulk_update_mappings(FoodResource, updates)
+        bump_resource_version()
+        db.session.commit()
+
+    return {
+        "checked": len(rows),
+        "updated": len(updates),
+        "outside_polygons": sum(name is None for name in names),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Fill FoodResource.neighborhood from data/neighborhoods.geojson.")
+    p.add_argument("--overwrite", action="store_true", help="Recompute neighborhoods that are already set.")
+    args = p.parse_args()
+
+    app = create_app("development")
+    with app.app_context():
+        summary = backfill(overwrite=args.overwrite)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+# bulk_upsert.py
+"""
+Shared bulk upsert engine for the intake scripts.
+
+Each intake script turns its sheet into a DataFrame with one column per
+FoodResource field (RESOURCE_COLUMNS) using vectorized pandas operations.
+BulkUpserter then validates each frame at once and stages it in a TEMP
+table with chunked executemany inserts. Once the whole source is staged,
+it is merged into food_resources with a handful of set-based statements
+(UPDATE ... FROM, INSERT ... SELECT) in one short transaction, so a long
+import never holds the write lock while it parses, and readers (WAL mode,
+see db.py) never see a half-applied import.
+
+Imports are deltas: each row stores its source, its key in that source and
+a content hash of the imported values. Re-importing an unchanged row is a
+hash comparison with no write, only changed rows are updated, and rows the
+source no longer lists are deactivated. An unchanged source leaves the data
+version (and every cache keyed on it) alone.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import (
+    Boolean, Column, DateTime, Index, Integer, MetaData, Table,
+    delete, exists, func, insert, literal, select, text, update,
+)
+
+from app.database.db import db
+from app.models.food_resource import FoodResource
+
+RESOURCE_COLUMNS = (
+    "name", "resource_type", "address", "neighborhood", "latitude", "longitude",
+    "hours", "phone", "website", "description",
+)
+TEXT_COLUMNS = ("name", "resource_type", "address", "neighborhood", "phone", "website", "description")
+REQUIRED_COLUMNS = ("name", "resource_type", "address", "latitude", "longitude")
+
+MISSING_TEXT = {"", "nan", "none", "null"}
+
+# Above this many touched rows an import bumps the version without locations
+CHANGE_LOCATION_LIMIT = 100
+
+
+# --- vectorized cleaning helpers ---
+def clean_text(series: pd.Series) -> pd.Series:
+    """Strip strings; blanks, NaN and "nan"/"none" become None."""
+    text = series.astype(object).where(series.notna(), None)
+    text = text.map(lambda v: v if v is None else str(v).strip(), na_action="ignore")
+    missing = text.isna() | text.str.lower().isin(MISSING_TEXT)
+    return text.where(~missing, None)
+
+
+def clean_zip(series: pd.Series) -> pd.Series:
+    """ZIP codes as text without the ".0" Excel adds to numeric cells."""
+    return clean_text(series).str.replace(r"\.0+$", "", regex=True)
+
+
+def to_float(series: pd.Series, decimal_comma=False) -> pd.Series:
+    """Numbers from a column that may hold text; unreadable values become NaN."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(np.float64)
+    text = series.astype(str).str.strip()
+    if decimal_comma:
+        text = text.str.replace(",", ".", regex=False)
+    return pd.to_numeric(text, errors="coerce")
+
+
+def join_text(parts, sep=", ") -> pd.Series:
+    """Join cleaned text Series row-wise, skipping missing parts (None if all are)."""
+    parts = [clean_text(p) for p in parts]
+    joined = pd.Series("", index=parts[0].index, dtype=object)
+    for part in parts:
+        present = part.notna()
+        joined = joined.where(~present, joined.where(joined == "", joined + sep) + part.fillna(""))
+    return joined.where(joined != "", None)
+
+
+def column(df: pd.DataFrame, name: str, default=None) -> pd.Series:
+    """A column of `df`, or a Series of `default` when the sheet does not have it."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def map_unique(series: pd.Series, fn) -> pd.Series:
+    """Apply a scalar mapping once per distinct value instead of once per row."""
+    values = series.astype(object).where(series.notna(), None)
+    lookup = {v: fn(v) for v in pd.unique(values)}
+    return values.map(lambda v: lookup[v], na_action=None)
+
+
+# --- engine ---
+def validate_frame(df: pd.DataFrame, key_columns):
+    """
+    Coerce a payload frame to RESOURCE_COLUMNS and drop unusable rows.
+    Returns (valid frame, [(row label, reason), ...]). Later duplicates of a
+    natural key win, like repeated upserts of the same row would.
+    """
+    df = df.reindex(columns=RESOURCE_COLUMNS).copy()
+    for name in TEXT_COLUMNS:
+        df[name] = clean_text(df[name])
+    df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
+    df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
+
+    reasons = pd.Series(None, index=df.index, dtype=object)
+    for name in REQUIRED_COLUMNS:
+        reasons = reasons.where(reasons.notna() | df[name].notna(), f"missing {name}")
+    bad_coords = ~df["latitude"].between(-90, 90) | ~df["longitude"].between(-180, 180)
+    reasons = reasons.where(reasons.notna() | ~bad_coords, "invalid coordinates")
+
+    invalid = reasons.notna()
+    skipped = list(zip(df.index[invalid].tolist(), reasons[invalid].tolist()))
+    df = df[~invalid]
+    df = df[~df.duplicated(subset=list(key_columns), keep="last")]
+    return df, skipped
+
+
+def frame_records(df: pd.DataFrame):
+    """DataFrame rows as dicts with NaN replaced by None."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def source_keys(df: pd.DataFrame, key_columns) -> list:
+    """Natural key of every row as text, e.g. "Giant Eagle|40.44|-79.99"."""
+    return ["|".join(map(str, key)) for key in zip(*(df[c].tolist() for c in key_columns))]
+
+
+def content_hashes(df: pd.DataFrame) -> list:
+    """Hex fingerprint of each row's RESOURCE_COLUMNS values."""
+    frame = df[list(RESOURCE_COLUMNS)].copy()
+    frame["hours"] = frame["hours"].map(lambda h: json.dumps(h, sort_keys=True))
+    hashes = pd.util.hash_pandas_object(frame, index=False)
+    return [f"{h:016x}" for h in hashes.tolist()]
+
+
+def staging_table(source: str) -> Table:
+    """
+    TEMP table an import of `source` is staged in. It lives in the
+    connection's temp database, so filling it takes no lock on the main one.
+    """
+    resources = FoodResource.__table__
+    return Table(
+        f"intake_staging_{source}", MetaData(),
+        Column("position", Integer, primary_key=True),  # arrival order, later rows win
+        *(Column(c, resources.c[c].type) for c in RESOURCE_COLUMNS),
+        Column("source", resources.c.source.type),
+        Column("source_key", resources.c.source_key.type),
+        Column("content_hash", resources.c.content_hash.type),
+        prefixes=["TEMPORARY"],
+    )
+
+
+class BulkUpserter:
+    """
+    Import payload frames from one source into food_resources.
+
+    upsert() validates and fingerprints each batch and appends it to a
+    staging table; food_resources is not touched. prepare() drops
+    superseded duplicate keys and indexes the staging table. merge() then
+    applies the difference in a few set-based statements:
+
+    - rows with no source yet (seeded, or imported before sources were
+      recorded) whose natural key columns match a staged row are adopted;
+    - rows of the source whose content hash differs are updated and
+      reactivated, unchanged ones are not written;
+    - staged keys the source does not have yet are inserted;
+    - active rows of the source missing from the staging table are
+      deactivated, with their hash cleared so they return if the row does.
+
+    merge() starts with a write, so the write lock is taken up front and
+    held only for the merge, not for the parse. Commit right after it.
+    """
+
+    def __init__(self, key_columns, source, chunk_size=5000):
+        self.key_columns = tuple(key_columns)
+        self.source = source
+        self.chunk_size = chunk_size
+        self.staging = None
+        self.changes = []
+        self.totals = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0, "deactivated": 0, "reasons": []}
+
+    def _create_staging(self):
+        self.staging = staging_table(self.source)
+        connection = db.session.connection()
+        self.staging.drop(connection, checkfirst=True)
+        self.staging.create(connection)
+
+    def upsert(self, df: pd.DataFrame) -> dict:
+        """Validate one payload frame and stage it. Returns counts and skip reasons."""
+        if self.staging is None:
+            self._create_staging()
+        df, skipped = validate_frame(df, self.key_columns)
+        keys = source_keys(df, self.key_columns)
+        hashes = content_hashes(df)
+        rows = [
+            record | {"source": self.source, "source_key": key, "content_hash": digest}
+            for record, key, digest in zip(frame_records(df), keys, hashes)
+        ]
+        statement = insert(self.staging)
+        for start in range(0, len(rows), self.chunk_size):
+            db.session.execute(statement, rows[start:start + self.chunk_size])
+
+        self.totals["skipped"] += len(skipped)
+        self.totals["reasons"].extend(skipped)
+        return {"staged": len(rows), "skipped": len(skipped), "reasons": skipped}
+
+    def prepare(self):
+        """Keep the last staged row per key and index the staging table."""
+        if self.staging is None:
+            self._create_staging()
+        staged = self.staging
+        latest = select(func.max(staged.c.position)).group_by(staged.c.source_key)
+        db.session.execute(delete(staged).where(staged.c.position.not_in(latest)))
+        connection = db.session.connection()
+        Index(f"ix_{staged.name}_key", staged.c.source_key, unique=True).create(connection)
+        Index(f"ix_{staged.name}_natural", *(staged.c[c] for c in self.key_columns)).create(connection)
+
+    def _record_changes(self, rows):
+        # Only worth keeping while few enough for selective invalidation
+        if self.changes is not None:
+            self.changes.extend(rows)
+            if len(self.changes) > CHANGE_LOCATION_LIMIT:
+                self.changes = None
+
+    def _count(self, query):
+        return db.session.execute(select(func.count()).select_from(query.subquery())).scalar()
+
+    def merge(self):
+        """Apply the staged rows to food_resources (see the class docstring)."""
+        resources = FoodResource.__table__
+        staged = self.staging
+        owned = resources.c.source == self.source
+        matches = db.and_(owned, resources.c.source_key == staged.c.source_key)
+
+        # Adopt unsourced rows first: a write, so the lock is taken before any read
+        legacy = resources.alias("legacy")
+        sourced = resources.alias("sourced")
+        adoptable = select(func.max(legacy.c.id).label("id"), staged.c.source_key).select_from(
+            legacy.join(staged, db.and_(*(legacy.c[c] == staged.c[c] for c in self.key_columns)))
+        ).where(
+            legacy.c.source.is_(None),
+            ~exists().where(sourced.c.source == self.source, sourced.c.source_key == staged.c.source_key),
+        ).group_by(staged.c.source_key).subquery()
+        db.session.execute(
+            update(resources).where(resources.c.id == adoptable.c.id).values(
+                source=self.source, source_key=adoptable.c.source_key, content_hash=None
+            )
+        )
+
+        changed = select(resources.c.id, resources.c.latitude, resources.c.longitude,
+                         staged.c.latitude, staged.c.longitude).where(
+            matches, resources.c.content_hash.is_distinct_from(staged.c.content_hash)
+        )
+        matched = self._count(select(resources.c.id).where(matches))
+        updated = self._count(changed)
+        new = select(staged.c.source_key, staged.c.latitude, staged.c.longitude).where(
+            ~exists().where(matches)
+        )
+        inserted = self._count(new)
+        missing = select(resources.c.id, resources.c.latitude, resources.c.longitude).where(
+            owned, resources.c.is_active.is_(True),
+            ~exists().where(staged.c.source_key == resources.c.source_key),
+        )
+        deactivated = self._count(missing)
+
+        if self.changes is not None and updated + inserted + deactivated <= CHANGE_LOCATION_LIMIT:
+            for resource_id, old_lat, old_lng, lat, lng in db.session.execute(changed).all():
+                self._record_changes([(resource_id, old_lat, old_lng)])
+                if (old_lat, old_lng) != (lat, lng):
+                    self._record_changes([(resource_id, lat, lng)])
+            self._record_changes([tuple(row) for row in db.session.execute(missing).all()])
+            new_keys = [row.source_key for row in db.session.execute(new).all()]
+        elif updated + inserted + deactivated:
+            self.changes = None
+            new_keys = []
+        else:
+            new_keys = []
+
+        db.session.execute(
+            update(resources).where(
+                matches, resources.c.content_hash.is_distinct_from(staged.c.content_hash)
+            ).values(
+                {c: staged.c[c] for c in RESOURCE_COLUMNS}
+                | {"content_hash": staged.c.content_hash, "is_active": True}
+            )
+        )
+        db.session.execute(
+            update(resources).where(
+                owned, resources.c.is_active.is_(True),
+                ~exists().where(staged.c.source_key == resources.c.source_key),
+            ).values(is_active=False, content_hash=None)
+        )
+        columns = RESOURCE_COLUMNS + ("source", "source_key", "content_hash")
+        db.session.execute(
+            insert(resources).from_select(
+                columns + ("is_active", "created_at"),
+                select(
+                    *(staged.c[c] for c in columns),
+                    literal(True, Boolean), literal(datetime.utcnow(), DateTime),
+                ).where(~exists().where(matches)).order_by(staged.c.position),
+            )
+        )
+        if new_keys:
+            self._record_changes([
+                tuple(row) for row in db.session.execute(
+                    select(resources.c.id, resources.c.latitude, resources.c.longitude)
+                    .where(owned, resources.c.source_key.in_(new_keys))
+                ).all()
+            ])
+
+        db.session.execute(text(f"DROP TABLE {staged.name}"))
+        self.staging = None
+        self.totals["inserted"] += inserted
+        self.totals["updated"] += updated
+        self.totals["unchanged"] += matched - updated
+        self.totals["deactivated"] += deactivated
+
+    def finish(self):
+        """prepare() and merge() in one go."""
+        self.prepare()
+        self.merge()
+
+    def summary(self) -> dict:
+        """
+        Counts over everything staged and merged so far. `changes` is the list
+        of touched locations for bump_resource_version, or None when there
+        were too many to list.
+        """
+        totals = self.totals
+        return totals | {
+            "changed": bool(totals["inserted"] or totals["updated"] or totals["deactivated"]),
+            "changes": self.changes,
+        }
+
+    def upsert_all(self, frames) -> dict:
+        """
+        Stage an iterable of payload frames (e.g. batches from
+        readers.iter_batches) that make up the whole source, then merge them.
+        """
+        for df in frames:
+            self.upsert(df)
+        self.finish()
+        return self.summary()
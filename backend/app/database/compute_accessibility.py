@@ -0,0 +1,89 @@
+# compute_accessibility.py
+import argparse
+import json
+from datetime import datetime
+
+from flask import current_app
+
+from app.database.db import db
+from app.models.accessibility_score import AccessibilityScore
+from app.models.food_resource import FoodResource
+from app.utils.accessibility import accessibility_scores, block_group_demand
+from app.utils.analytics import block_group_origins
+from app.utils.neighborhoods import neighborhood_index
+from app.utils.resource_cache import get_resource_version
+
+
+def compute_accessibility(catchment_miles=None, decay=None) -> dict:
+    """
+    Recompute 2SFCA scores for every block group and resource type and
+    replace the accessibility_scores table in one transaction.
+    """
+    if not neighborhood_index.loaded:
+        raise RuntimeError("Neighborhood polygons not loaded (check NEIGHBORHOODS_GEOJSON)")
+
+    config = current_app.config
+    catchment = float(catchment_miles or config["ACCESSIBILITY_CATCHMENT_MILES"])
+    decay = decay or config["ACCESSIBILITY_DECAY"]
+
+    version = get_resource_version()[0]
+    rows = db.session.query(
+        FoodResource.id, FoodResource.latitude, FoodResource.longitude,
+        FoodResource.resource_type, FoodResource.neighborhood
+    ).filter(FoodResource.is_active.is_(True)).all()
+
+    features = neighborhood_index.features
+    lats, lngs, _ = block_group_origins(features)
+    demand = block_group_demand(features, config["ACCESSIBILITY_DEMAND_PROPERTY"])
+    results = accessibility_scores(
+        rows, lats, lngs, demand, catchment, decay, config["ACCESSIBILITY_GRID_CELL_DEG"]
+    )
+
+    computed_at = datetime.utcnow()
+    mappings = [
+        {
+            "geoid10": feature["geoid10"],
+            "neighborhood": feature["neighborhood"],
+            "resource_type": resource_type,
+            "score": float(scores[i]),
+            "resources_in_catchment": int(counts[i]),
+            "catchment_miles": catchment,
+            "decay": decay,
+            "data_version": version,
+            "computed_at": computed_at,
+        }
+        for resource_type, (scores, counts) in results.items()
+        for i, feature in enumerate(features)
+    ]
+
+    AccessibilityScore.query.delete()
+    if mappings:
+        db.session.bulk_insert_mappings(AccessibilityScore, mappings)
+    db.session.commit()
+
+    return {
+        "block_groups": len(features),
+        "resource_types": sorted(results),
+        "rows": len(mappings),
+        "catchment_miles": catchment,
+        "decay": decay,
+        "data_version": version,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Recompute 2SFCA food accessibility scores per block group.")
+    p.add_argument("--catchment", type=float, help="Catchment radius in miles (default ACCESSIBILITY_CATCHMENT_MILES).")
+    p.add_argument("--decay", choices=("gaussian", "linear", "none"), help="Distance-decay function (default ACCESSIBILITY_DECAY).")
+    args = p.parse_args()
+
+    from app import create_app
+
+    app = create_app("development")
+    with app.app_context():
+        summary = compute_accessibility(args.catchment, args.decay)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
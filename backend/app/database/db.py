@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 
 db = SQLAlchemy()
 
@@ -7,6 +8,37 @@ def init_db(app):
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        add_missing_columns()
+        if app.config.get("SQLITE_WAL"):
+            enable_sqlite_wal()
+
+# Switch a SQLite database to write-ahead logging. The mode is stored in the
+# database file, so setting it once covers every later connection and process.
+# Readers then keep reading the last committed state while a writer holds the
+# lock, instead of waiting for it.
+def enable_sqlite_wal():
+    if db.engine.dialect.name != "sqlite":
+        return
+    with db.engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+# Bring tables that already exist up to date with the models.
+# create_all() only creates missing tables, so columns added to a model later
+# (e.g. food_resources.source) are added here, along with their indexes.
+def add_missing_columns():
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        present = {c["name"] for c in inspector.get_columns(table.name)}
+        missing = [c for c in table.columns if c.name not in present]
+        for column in missing:
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            db.session.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        if missing:
+            db.session.commit()
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
 
 # Get db session
 def get_db_session():
@@ -0,0 +1,306 @@
+# intake.py
+"""
+Unified intake command for every registered source (see sources.py).
+
+    python -m app.database.intake farms=data/farmers_markets.xlsx gardens=grow.csv
+    python -m app.database.intake --all
+
+Every sheet of every file is a parse task. Tasks run in a process pool;
+each worker streams its sheet with readers.iter_batches, maps the batch
+to FoodResource columns and fills in neighborhoods, then hands the
+payload to the parent through a bounded queue. The parent is the only
+writer: it stages the batches through one BulkUpserter per source, and
+only once every file parsed cleanly merges all sources into food_resources,
+bumps the data version once and commits, in one short transaction. A
+failed file leaves the database untouched, and the write lock is held for
+the merge only, not for the parse.
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+from collections import defaultdict
+
+from app import create_app
+from app.config import config
+from app.database.bulk_upsert import CHANGE_LOCATION_LIMIT, BulkUpserter
+from app.database.db import db
+from app.database.readers import BATCH_SIZE, iter_batches, sheet_names
+from app.database.sources import get_source, load_sources
+from app.utils.neighborhoods import fill_neighborhoods, neighborhood_index
+from app.utils.resource_cache import bump_resource_version
+
+# Payload batches buffered per worker before parsing waits for the writer
+QUEUE_BATCHES_PER_WORKER = 2
+
+WORKER_STAGES = ("read", "payload", "neighborhoods")
+WRITER_STAGES = ("wait", "stage", "prepare", "merge", "commit")
+
+
+class IntakeError(Exception):
+    """A source file could not be imported; nothing was written."""
+
+
+def plan_tasks(jobs):
+    """(task id, source name, path, sheet) for every sheet of every (source, path) job."""
+    tasks = []
+    for source_name, path in jobs:
+        source = get_source(source_name)
+        if not os.path.exists(path):
+            raise IntakeError(f"{source_name}: file not found: {path}")
+        sheets = sheet_names(path)
+        if not source.all_sheets:
+            sheets = sheets[:1]
+        for sheet in sheets:
+            tasks.append((len(tasks), source_name, str(path), sheet))
+    return tasks
+
+
+def task_label(task):
+    _, source_name, path, sheet = task
+    return f"{source_name} {path}" + (f" [{sheet}]" if sheet else "")
+
+
+def parse_batches(task, batch_size, timings):
+    """Payload frames of one task, adding seconds spent per stage to `timings`."""
+    source = get_source(task[1])
+    batches = iter_batches(task[2], batch_size, sheet=task[3])
+    first = True
+    while True:
+        started = time.perf_counter()
+        batch = next(batches, None)
+        timings["read"] += time.perf_counter() - started
+        if batch is None:
+            return
+        if first:
+            first = False
+            required = dict.fromkeys(source.required_columns + (source.lat_column, source.lng_column))
+            missing = [c for c in required if c not in batch.columns]
+            if missing:
+                raise IntakeError(f"missing required column(s): {', '.join(missing)}")
+            missing = [c for c in source.expected_columns if c not in batch.columns]
+            if missing:
+                print(f"Warning: {task_label(task)}: missing columns: {missing}", file=sys.stderr)
+
+        started = time.perf_counter()
+        payload = source.to_payload(batch)
+        timings["payload"] += time.perf_counter() - started
+
+        # From the parsed coordinates, so sources that clean them in
+        # to_payload (e.g. decimal commas) get neighborhoods too
+        started = time.perf_counter()
+        fill_neighborhoods(payload, "latitude", "longitude")
+        timings["neighborhoods"] += time.perf_counter() - started
+        yield payload
+
+
+def _describe_error(error):
+    if isinstance(error, IntakeError):
+        return str(error)
+    return "".join(traceback.format_exception(error)).rstrip()
+
+
+# --- parse workers ---
+_batch_queue = None
+
+
+def _init_worker(batch_queue, neighborhoods_path):
+    global _batch_queue
+    _batch_queue = batch_queue
+    if neighborhoods_path and os.path.exists(neighborhoods_path):
+        neighborhood_index.load(neighborhoods_path)
+
+
+def _parse_worker(task, batch_size):
+    timings = defaultdict(float)
+    error = None
+    try:
+        for payload in parse_batches(task, batch_size, timings):
+            _batch_queue.put(("batch", task[0], payload))
+    except Exception as e:
+        error = _describe_error(e)
+    _batch_queue.put(("done", task[0], dict(timings), error))
+
+
+def _pool_messages(tasks, workers, batch_size, neighborhoods_path):
+    """Messages from a pool of parse workers, ending once every task reported done."""
+    # spawn: workers must not inherit the writer's open database connections
+    context = multiprocessing.get_context("spawn")
+    batch_queue = context.Queue(maxsize=workers * QUEUE_BATCHES_PER_WORKER)
+    pool = context.Pool(workers, initializer=_init_worker, initargs=(batch_queue, neighborhoods_path))
+    try:
+        results = [pool.apply_async(_parse_worker, (task, batch_size)) for task in tasks]
+        pending = len(tasks)
+        while pending:
+            try:
+                message = batch_queue.get(timeout=1)
+            except queue.Empty:
+                for result in results:
+                    if result.ready() and not result.successful():
+                        result.get()  # re-raises the worker's error
+                continue
+            if message[0] == "done":
+                pending -= 1
+            yield message
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _inline_messages(tasks, batch_size):
+    """The same messages as _pool_messages, parsing in this process."""
+    for task in tasks:
+        timings = defaultdict(float)
+        error = None
+        try:
+            for payload in parse_batches(task, batch_size, timings):
+                yield ("batch", task[0], payload)
+        except Exception as e:
+            error = _describe_error(e)
+        yield ("done", task[0], dict(timings), error)
+
+
+def merge_changes(summaries):
+    """Touched locations across sources, or None when any source had too many."""
+    changes = []
+    for summary in summaries.values():
+        if summary["changes"] is None:
+            return None
+        changes.extend(summary["changes"])
+    return changes if len(changes) <= CHANGE_LOCATION_LIMIT else None
+
+
+def run_intake(jobs, config_name="development", workers=None, batch_size=BATCH_SIZE):
+    """
+    Import [(source name, path), ...] in one transaction.
+    `workers` parse processes (default: one per core; 0 parses in this
+    process). Returns ({source: summary}, {stage: seconds}).
+    """
+    started = time.perf_counter()
+    load_sources()
+    tasks = plan_tasks(jobs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+
+    timings = defaultdict(float)
+    app = create_app(config_name)
+    with app.app_context():
+        upserters = {}
+        for source_name, _ in jobs:
+            source = get_source(source_name)
+            upserters.setdefault(source_name, BulkUpserter(source.key_columns, source_name))
+
+        if workers > 0:
+            messages = _pool_messages(tasks, workers, batch_size, config[config_name].NEIGHBORHOODS_GEOJSON)
+        else:
+            messages = _inline_messages(tasks, batch_size)
+        try:
+            while True:
+                stage = time.perf_counter()
+                message = next(messages, None)
+                timings["wait"] += time.perf_counter() - stage
+                if message is None:
+                    break
+                task = tasks[message[1]]
+                if message[0] == "batch":
+                    stage = time.perf_counter()
+                    upserters[task[1]].upsert(message[2])
+                    timings["stage"] += time.perf_counter() - stage
+                    continue
+                _, _, worker_timings, error = message
+                for name, seconds in worker_timings.items():
+                    timings[name] += seconds
+                if error:
+                    raise IntakeError(f"{task_label(task)}: {error}")
+
+            stage = time.perf_counter()
+            for upserter in upserters.values():
+                upserter.prepare()
+            timings["prepare"] += time.perf_counter() - stage
+
+            # The write lock is taken by the first merge and released by the commit
+            stage = time.perf_counter()
+            for upserter in upserters.values():
+                upserter.merge()
+            summaries = {name: upserter.summary() for name, upserter in upserters.items()}
+            if any(summary["changed"] for summary in summaries.values()):
+                bump_resource_version(merge_changes(summaries))
+            timings["merge"] += time.perf_counter() - stage
+
+            stage = time.perf_counter()
+            db.session.commit()
+            timings["commit"] += time.perf_counter() - stage
+        except BaseException:
+            db.session.rollback()
+            raise
+        finally:
+            messages.close()
+
+    timings["total"] = time.perf_counter() - started
+    timings["workers"] = workers
+    timings["tasks"] = len(tasks)
+    return summaries, dict(timings)
+
+
+def format_timings(timings):
+    """Per-stage breakdown; worker stages are summed over all parse workers."""
+    workers = timings.get("workers", 0)
+    lines = [f"Stages ({timings.get('tasks', 0)} sheet(s), {workers or 'no'} parse worker(s)):"]
+    for name in WORKER_STAGES:
+        lines.append(f"  {name:<14}{timings.get(name, 0.0):8.2f} s  (parse, summed over workers)")
+    for name in WRITER_STAGES:
+        lines.append(f"  {name:<14}{timings.get(name, 0.0):8.2f} s  (writer)")
+    lines.append(f"  {'total':<14}{timings.get('total', 0.0):8.2f} s  (wall clock)")
+    return "\n".join(lines)
+
+
+def format_summary(name, summary):
+    return (
+        f"{name}: inserted={summary['inserted']} updated={summary['updated']} "
+        f"unchanged={summary['unchanged']} deactivated={summary['deactivated']} skipped={summary['skipped']}"
+    )
+
+
+def parse_job(value):
+    """argparse type for "source=path"."""
+    source_name, sep, path = value.partition("=")
+    if not sep or not source_name or not path:
+        raise argparse.ArgumentTypeError(f"expected SOURCE=PATH, got: {value}")
+    return source_name, path
+
+
+def main():
+    sources = load_sources()
+    p = argparse.ArgumentParser(description="Import food resources from every registered source in one transaction.")
+    p.add_argument("jobs", nargs="*", type=parse_job, metavar="SOURCE=PATH",
+                   help=f"File to import for a source ({', '.join(sorted(sources))})")
+    p.add_argument("--all", action="store_true", help="Import every source from its default file under data/")
+    p.add_argument("--workers", type=int, default=None, help="Parse processes (default: one per core, 0 = no pool)")
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"Rows per batch (default: {BATCH_SIZE})")
+    p.add_argument("--config", default="development", choices=sorted(config), help="App config name (default: development)")
+    args = p.parse_args()
+
+    jobs = list(args.jobs)
+    if args.all:
+        jobs += [(name, source.default_path) for name, source in sources.items() if source.default_path]
+    if not jobs:
+        p.error("give at least one SOURCE=PATH or --all")
+
+    try:
+        summaries, timings = run_intake(jobs, args.config, args.workers, args.batch_size)
+    except (IntakeError, KeyError) as e:
+        print(f"Import failed, nothing was written: {e.args[0]}", file=sys.stderr)
+        sys.exit(1)
+
+    for name, summary in summaries.items():
+        print(format_summary(name, summary))
+    print(format_timings(timings))
+
+
+if __name__ == "__main__":
+    main()
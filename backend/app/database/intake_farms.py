@@ -1,34 +1,23 @@
 # app/database/intake_markets_by_coords.py
+import os
 import sys
 import pandas as pd
-from sqlalchemy import and_
 
-from app import create_app
-from app.database.db import db
-from app.models.food_resource import FoodResource
+from app.database.bulk_upsert import clean_text, clean_zip, column, join_text, map_unique, to_float
+from app.database.sources import DATA_DIR, register_source
 
-def norm_cols(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = (
-        df.columns.str.strip().str.lower().str.replace(r"[^\w]+", "_", regex=True)
-    )
-    return df
+# Rows are matched to existing resources on these columns
+NATURAL_KEY = ("name", "latitude", "longitude")
 
-def ffloat(v):
-    if v is None or (isinstance(v, float) and pd.isna(v)):
-        return None
-    try:
-        return float(str(v).strip())
-    except Exception:
-        return None
+# Imported rows are tagged with this source; rows of it missing from a re-import are deactivated
+SOURCE = "farms"
 
-def clean_phone(p, ext=None):
-    if not p or str(p).strip().lower() in ("nan", "none"):
-        return None
-    s = "".join(ch for ch in str(p) if ch.isdigit())
-    if ext and str(ext).strip():
-        s += f" x{ext}"
-    return s or None
+def clean_phone(phone: pd.Series, ext: pd.Series) -> pd.Series:
+    digits = clean_zip(phone).str.replace(r"\D", "", regex=True)
+    ext = clean_zip(ext)
+    with_ext = digits.notna() & (digits != "") & ext.notna()
+    digits = digits.where(~with_ext, digits + " x" + ext.fillna(""))
+    return digits.where(digits != "", None)
 
 def map_type(market_type: str) -> str:
     t = (market_type or "").strip().lower()
@@ -36,82 +25,52 @@ def map_type(market_type: str) -> str:
         return "farmers_market"
     return "farmers_market"
 
-def address(row) -> str:
-    parts = [
-        (row.get("address1") or "").strip(),
-        (row.get("city") or "").strip(),
-        (row.get("state") or "").strip(),
-        str(row.get("zip_code") or "").strip(),
-    ]
-    return ", ".join([p for p in parts if p])
+def address(df: pd.DataFrame) -> pd.Series:
+    return join_text([
+        column(df, "address1"),
+        column(df, "city"),
+        column(df, "state"),
+        clean_zip(column(df, "zip_code")),
+    ])
 
-def upsert_by_coords(payload):
-    existing = FoodResource.query.filter(
-        and_(
-            FoodResource.name == payload["name"],
-            FoodResource.latitude == payload["latitude"],
-            FoodResource.longitude == payload["longitude"],
-        )
-    ).first()
-    if existing:
-        for k, v in payload.items():
-            setattr(existing, k, v)
-        return "updated"
-    db.session.add(FoodResource(**payload))
-    return "inserted"
+def to_payload(df: pd.DataFrame) -> pd.DataFrame:
+    """FoodResource columns for the whole sheet, built column-wise."""
+    market_type = clean_text(column(df, "market_type"))
+    county = clean_text(column(df, "county"))
+    description = (market_type.fillna("") + " • County: " + county.fillna("")).str.strip(" •")
+    return pd.DataFrame({
+        "name": column(df, "market_name"),
+        "resource_type": map_unique(market_type, map_type),
+        "address": address(df),
+        "neighborhood": column(df, "neighborhood"),  # from the coordinates
+        "latitude": to_float(column(df, "latitude")),
+        "longitude": to_float(column(df, "longitude")),
+        "phone": clean_phone(column(df, "phone"), column(df, "phone_ext")),
+        "website": None,
+        "description": description,
+        "hours": [{} for _ in range(len(df))],  # not provided
+    }, index=df.index)
 
-def load_any(path: str) -> pd.DataFrame:
-    if path.lower().endswith((".xlsx", ".xls")):
-        xls = pd.ExcelFile(path)
-        frames = [pd.read_excel(path, sheet_name=s) for s in xls.sheet_names]
-        df = pd.concat(frames, ignore_index=True)
-    else:
-        df = pd.read_csv(path)
-    return norm_cols(df)
+register_source(
+    SOURCE, NATURAL_KEY, to_payload, "latitude", "longitude",
+    required_columns=("market_name", "latitude", "longitude"),
+    default_path=os.path.join(DATA_DIR, "farmers_markets.xlsx"),
+)
 
 def main(path: str):
-    app = create_app("development")
-    with app.app_context():
-        df = load_any(path)
-
-        # required columns after normalization
-        for col in ["market_name", "latitude", "longitude"]:
-            if col not in df.columns:
-                raise SystemExit(f"Missing column: {col}")
-
-        inserted = updated = skipped = 0
-        for _, row in df.iterrows():
-            name = str(row.get("market_name") or "").strip()
-            lat = ffloat(row.get("latitude"))
-            lon = ffloat(row.get("longitude"))
-            if not name or lat is None or lon is None:
-                skipped += 1
-                continue
+    # parses in this process; `python -m app.database.intake` imports several sources in parallel
+    # (imported here: intake loads this module through load_sources)
+    from app.database.intake import IntakeError, run_intake
 
-            payload = {
-                "name": name,
-                "resource_type": map_type(row.get("market_type")),
-                "address": address(row),
-                "neighborhood": None,  # unknown; you can map later
-                "latitude": lat,
-                "longitude": lon,
-                "phone": clean_phone(row.get("phone"), row.get("phone_ext")),
-                "website": None,
-                "description": f"{row.get('market_type') or ''} • County: {row.get('county') or ''}".strip(" •"),
-                "hours": {},  # not provided
-            }
-
-            try:
-                status = upsert_by_coords(payload)
-                inserted += status == "inserted"
-                updated  += status == "updated"
-            except Exception as e:
-                db.session.rollback()
-                skipped += 1
-                print(f"Skip due to DB error: {e}")
-
-        db.session.commit()
-        print(f"Done: inserted={inserted} updated={updated} skipped={skipped}")
+    try:
+        summaries, _ = run_intake([(SOURCE, path)], workers=0)
+    except IntakeError as e:
+        raise SystemExit(str(e))
+    result = summaries[SOURCE]
+    print(
+        f"Done: inserted={result['inserted']} updated={result['updated']} "
+        f"unchanged={result['unchanged']} deactivated={result['deactivated']} skipped={result['skipped']}"
+    )
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -1,14 +1,20 @@
 # intake.py
 import argparse
 import json
+import os
 import sys
 from pathlib import Path
 
 import pandas as pd
 
-from app import create_app
-from app.database.db import db
-from app.models.food_resource import FoodResource
+from app.database.bulk_upsert import clean_text, clean_zip, column, join_text, map_unique, to_float
+from app.database.sources import DATA_DIR, register_source
+
+# Rows are matched to existing resources on these columns
+NATURAL_KEY = ("name", "address")
+
+# Imported rows are tagged with this source; rows of it missing from a re-import are deactivated
+SOURCE = "gardens"
 
 # category normalization (simple)
 RAW_TO_RESOURCE_TYPE = {
@@ -33,127 +39,83 @@ def first_mapped_category(raw: str) -> str:
     return "other"
 
 
-# --- IO helpers ---
-def read_tabular(path: Path) -> pd.DataFrame:
-    if path.suffix.lower() in {".xlsx", ".xls"}:
-        return pd.read_excel(path)
-    try:
-        return pd.read_csv(path)
-    except Exception:
-        return pd.read_csv(path, sep="\t")
-
-
-def fmt_address(street, city, state, zip_code):
-    parts = [p for p in [street, city, state] if p and not pd.isna(p)]
-    tail = str(zip_code).split(".")[0] if pd.notna(zip_code) else None
-    if tail:
-        return f"{', '.join(parts)} {tail}"
-    return ", ".join(parts) if parts else None
-
-
-def row_to_resource_kwargs(row: pd.Series) -> dict:
-    name = row.get("urban_grower") or row.get("name")
-    website = row.get("url")
-    resource_type = first_mapped_category(row.get("category"))
-    address = fmt_address(
-        row.get("street_address"),
-        row.get("city"),
-        row.get("state"),
-        row.get("zip_code"),
-    )
-
-    neighborhood = row.get("neighborhood")
-    if not neighborhood and str(row.get("city") or "").lower().strip() == "pittsburgh":
-        neighborhood = None
-
-    lat = row.get("latitude")
-    lon = row.get("longitude")
-    latitude = float(lat) if pd.notna(lat) else None
-    longitude = float(lon) if pd.notna(lon) else None
-
-    return dict(
-        name=name,
-        resource_type=resource_type,
-        address=address,
-        neighborhood=neighborhood,
-        latitude=latitude,
-        longitude=longitude,
-        phone=None,
-        website=website,
-        description="Imported from Grow Pittsburgh directory",
-        hours=None,
-    )
-
-
-def upsert_resource(row_kwargs: dict) -> tuple[str, FoodResource]:
-    """Upsert by (name, address)."""
-    name = (row_kwargs.get("name") or "").strip()
-    address = (row_kwargs.get("address") or "").strip()
-    if not name:
-        return "skipped", None
-
-    q = FoodResource.query.filter(
-        FoodResource.name == name,
-        FoodResource.address == address if address else FoodResource.address.is_(None),
-    )
-    existing = q.first()
-    if existing:
-        for k, v in row_kwargs.items():
-            setattr(existing, k, v)
-        return "updated", existing
-
-    inst = FoodResource(**row_kwargs)
-    db.session.add(inst)
-    return "created", inst
-
-
-def import_sheet(path: Path, truncate: bool) -> dict:
-    df = read_tabular(path)
-    expected = {
-        "urban_grower",
-        "category",
-        "url",
-        "street_address",
-        "city",
-        "state",
-        "zip_code",
-        "country",
-        "latitude",
-        "longitude",
-    }
-    missing = [c for c in expected if c not in df.columns]
-    if missing:
-        print(f"Warning: missing columns: {missing}", file=sys.stderr)
+def fmt_address(df: pd.DataFrame) -> pd.Series:
+    """"street, city, state zip" for every row."""
+    head = join_text([column(df, "street_address"), column(df, "city"), column(df, "state")])
+    tail = clean_zip(column(df, "zip_code"))
+    with_zip = tail.notna()
+    full = head.fillna("").where(~with_zip, (head.fillna("") + " " + tail.fillna("")).str.strip())
+    return full.where(full != "", None)
+
+
+def to_payload(df: pd.DataFrame) -> pd.DataFrame:
+    """FoodResource columns for the whole sheet, built column-wise."""
+    return pd.DataFrame({
+        "name": clean_text(column(df, "urban_grower")).fillna(clean_text(column(df, "name"))),
+        "resource_type": map_unique(column(df, "category"), first_mapped_category),
+        "address": fmt_address(df),
+        "neighborhood": column(df, "neighborhood"),
+        "latitude": to_float(column(df, "latitude")),
+        "longitude": to_float(column(df, "longitude")),
+        "phone": None,
+        "website": column(df, "url"),
+        "description": "Imported from Grow Pittsburgh directory",
+        "hours": None,
+    }, index=df.index)
+
+
+EXPECTED_COLUMNS = {
+    "urban_grower",
+    "category",
+    "url",
+    "street_address",
+    "city",
+    "state",
+    "zip_code",
+    "country",
+    "latitude",
+    "longitude",
+}
 
-    app = create_app("development")
-    with app.app_context():
-        if truncate:
-            FoodResource.query.delete()
-            db.session.commit()
 
-        created = updated = skipped = 0
+register_source(
+    SOURCE, NATURAL_KEY, to_payload, "latitude", "longitude",
+    expected_columns=sorted(EXPECTED_COLUMNS),
+    all_sheets=False,  # first sheet only
+    default_path=os.path.join(DATA_DIR, "food_gardens.xlsx"),
+)
 
-        for _, row in df.iterrows():
-            status, _inst = upsert_resource(row_to_resource_kwargs(row))
-            if status == "created":
-                created += 1
-            elif status == "updated":
-                updated += 1
-            else:
-                skipped += 1
 
-        db.session.commit()
+def import_sheet(path: Path) -> dict:
+    # parses in this process; `python -m app.database.intake` imports several sources in parallel
+    # (imported here: intake loads this module through load_sources)
+    from app.database.intake import IntakeError, run_intake
 
-        return {"created": created, "updated": updated, "skipped": skipped, "truncated": truncate}
+    try:
+        summaries, _ = run_intake([(SOURCE, str(path))], workers=0)
+    except IntakeError as e:
+        raise SystemExit(str(e))
+    result = summaries[SOURCE]
+    return {
+        "created": result["inserted"],
+        "updated": result["updated"],
+        "unchanged": result["unchanged"],
+        "deactivated": result["deactivated"],
+        "skipped": result["skipped"],
+    }
 
 
 def main():
     p = argparse.ArgumentParser(description="Import food resources from Excel/CSV/TSV into DB.")
     p.add_argument("path", type=Path, help="Path to .xlsx/.csv/.tsv file")
-    p.add_argument("--truncate", action="store_true", help="Delete all existing FoodResource rows before import.")
+    # Kept so old invocations still run: garden rows missing from the sheet
+    # are now deactivated on every import, and other sources are left alone.
+    p.add_argument("--truncate", action="store_true", help=argparse.SUPPRESS)
     args = p.parse_args()
+    if args.truncate:
+        print("Note: --truncate is no longer needed; garden rows missing from the sheet are deactivated.", file=sys.stderr)
 
-    summary = import_sheet(args.path, truncate=args.truncate)
+    summary = import_sheet(args.path)
     print(json.dumps(summary, indent=2))
 
 
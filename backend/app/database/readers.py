@@ -0,0 +1,135 @@
+# readers.py
+"""
+Streaming readers for the intake scripts.
+
+iter_batches() yields a spreadsheet as DataFrames of at most `batch_size`
+rows with normalized column names, so an import holds one batch in memory
+at a time however large the file is. .xlsx/.xlsm sheets are read with
+openpyxl in read-only mode (rows are parsed straight from the zipped XML,
+each sheet opened once); CSV/TSV files use chunked pd.read_csv. Legacy .xls
+workbooks cannot be streamed and are read whole, then sliced into batches.
+
+Row labels continue across batches and sheets, so skip reasons point at
+the same row numbers a single concatenated frame would have.
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import load_workbook
+
+BATCH_SIZE = 5000
+
+WORKBOOK_SUFFIXES = {".xlsx", ".xlsm"}
+LEGACY_WORKBOOK_SUFFIXES = {".xls"}
+
+
+def normalize_column(name, position=0) -> str:
+    """`" Street # "` -> `"street__"`; blank headers become `column_<n>`."""
+    if name is None or str(name).strip() == "":
+        return f"column_{position}"
+    return re.sub(r"[^\w]+", "_", str(name).strip().lower())
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize the column names of `df` in place and return it."""
+    df.columns = [normalize_column(c, i) for i, c in enumerate(df.columns)]
+    return df
+
+
+def _sheet_batches(rows, batch_size, start):
+    """Batches of one read-only worksheet; the first non-empty row is the header."""
+    header = None
+    batch = []
+    for row in rows:
+        if all(v is None for v in row):
+            continue
+        if header is None:
+            header = [normalize_column(v, i) for i, v in enumerate(row)]
+            continue
+        batch.append(row[:len(header)])
+        if len(batch) >= batch_size:
+            yield pd.DataFrame.from_records(batch, columns=header, index=range(start, start + len(batch)))
+            start += len(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame.from_records(batch, columns=header, index=range(start, start + len(batch)))
+
+
+def _workbook_batches(path, batch_size, all_sheets, sheet=None):
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet is not None:
+            sheets = [workbook[sheet]]
+        else:
+            sheets = workbook.worksheets if all_sheets else workbook.worksheets[:1]
+        start = 0
+        for worksheet in sheets:
+            for batch in _sheet_batches(worksheet.iter_rows(values_only=True), batch_size, start):
+                start = batch.index[-1] + 1
+                yield batch
+    finally:
+        # read-only workbooks keep the file open until closed
+        workbook.close()
+
+
+def _legacy_workbook_batches(path, batch_size, all_sheets, sheet=None):
+    if sheet is not None:
+        frames = [pd.read_excel(path, sheet_name=sheet)]
+    elif all_sheets:
+        frames = pd.read_excel(path, sheet_name=None).values()
+    else:
+        frames = [pd.read_excel(path, sheet_name=0)]
+    start = 0
+    for frame in frames:
+        for offset in range(0, len(frame), batch_size):
+            batch = normalize_columns(frame.iloc[offset:offset + batch_size].copy())
+            batch.index = range(start, start + len(batch))
+            start += len(batch)
+            yield batch
+
+
+def csv_separator(path: Path) -> str:
+    """Tab for .tsv files or a tab-separated header line, comma otherwise."""
+    if path.suffix.lower() == ".tsv":
+        return "\t"
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        header = f.readline()
+    return "\t" if "\t" in header and "," not in header else ","
+
+
+def _csv_batches(path, batch_size):
+    for batch in pd.read_csv(path, sep=csv_separator(path), chunksize=batch_size, encoding="utf-8-sig"):
+        yield normalize_columns(batch)
+
+
+def sheet_names(path):
+    """Sheet names of a workbook, or [None] for CSV/TSV files."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in WORKBOOK_SUFFIXES:
+        workbook = load_workbook(path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    if suffix in LEGACY_WORKBOOK_SUFFIXES:
+        return list(pd.ExcelFile(path).sheet_names)
+    return [None]
+
+
+def iter_batches(path, batch_size=BATCH_SIZE, all_sheets=True, sheet=None):
+    """
+    Yield DataFrame batches of an .xlsx/.xls/.csv/.tsv file with normalized
+    columns. `all_sheets=False` reads only the first sheet of a workbook and
+    `sheet` only the named one.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in WORKBOOK_SUFFIXES:
+        yield from _workbook_batches(path, batch_size, all_sheets, sheet)
+    elif suffix in LEGACY_WORKBOOK_SUFFIXES:
+        yield from _legacy_workbook_batches(path, batch_size, all_sheets, sheet)
+    else:
+        yield from _csv_batches(path, batch_size)
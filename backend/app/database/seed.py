@@ -2,6 +2,7 @@ from app import create_app
 from app.database.db import db
 from app.models.food_resource import FoodResource
 from app.models.user import User
+from app.utils.resource_cache import bump_resource_version
 
 # Sample food resources (data is not verified)
 FOOD_RESOURCES = [
@@ -131,6 +132,7 @@ def seed_database():
             db.session.add(resource)
         
         # Commit all changes
+        bump_resource_version()
         db.session.commit()
         
         # Print summary
@@ -0,0 +1,66 @@
+# sources.py
+"""
+Registry of intake sources.
+
+Each intake module describes its sheet with register_source(): the
+natural key rows are matched on, the columns its coordinates are in, the
+columns it cannot do without and the to_payload() function that maps a
+normalized batch to FoodResource columns. The intake command looks
+sources up here by name, so adding a source means writing one module and
+listing it in SOURCE_MODULES.
+"""
+
+import importlib
+import os
+
+# Modules that register a source when imported
+SOURCE_MODULES = (
+    "app.database.intake_farms",
+    "app.database.intake_supermarkets",
+    "app.database.intake_foodgardens",
+)
+
+SOURCES = {}
+
+# Where the sheets used by `intake --all` live
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+
+
+class IntakeSource:
+    """How to read one kind of sheet into food_resources."""
+
+    def __init__(self, name, key_columns, to_payload, lat_column, lng_column,
+                 required_columns=(), expected_columns=(), all_sheets=True, default_path=None):
+        self.name = name
+        self.key_columns = tuple(key_columns)
+        self.to_payload = to_payload
+        self.lat_column = lat_column
+        self.lng_column = lng_column
+        self.required_columns = tuple(required_columns)  # missing -> the import fails
+        self.expected_columns = tuple(expected_columns)  # missing -> a warning
+        self.all_sheets = all_sheets
+        self.default_path = default_path
+
+    def __repr__(self):
+        return f"<IntakeSource {self.name}>"
+
+
+def register_source(name, key_columns, to_payload, lat_column, lng_column, **options):
+    """Add a source to the registry (called at import time by intake modules)."""
+    SOURCES[name] = IntakeSource(name, key_columns, to_payload, lat_column, lng_column, **options)
+    return SOURCES[name]
+
+
+def load_sources():
+    """Import every module in SOURCE_MODULES and return the registry."""
+    for module in SOURCE_MODULES:
+        importlib.import_module(module)
+    return SOURCES
+
+
+def get_source(name):
+    """The registered source called `name`; raises KeyError listing the known ones."""
+    sources = load_sources()
+    if name not in sources:
+        raise KeyError(f"Unknown intake source: {name} (known: {', '.join(sorted(sources))})")
+    return sources[name]
@@ -0,0 +1,37 @@
+from app.database.db import db
+from datetime import datetime
+
+class AccessibilityScore(db.Model):
+    __tablename__ = 'accessibility_scores'
+
+    id = db.Column(db.Integer, primary_key=True)
+    geoid10 = db.Column(db.String(20), nullable=False, index=True)  # Block group
+    neighborhood = db.Column(db.String(100), nullable=True)
+    resource_type = db.Column(db.String(50), nullable=False, index=True)
+
+    # Two-step floating catchment area result for this block group and type
+    score = db.Column(db.Float, nullable=False, default=0.0)
+    resources_in_catchment = db.Column(db.Integer, nullable=False, default=0)
+
+    # Inputs the batch run used
+    catchment_miles = db.Column(db.Float, nullable=False)
+    decay = db.Column(db.String(20), nullable=False)
+    data_version = db.Column(db.Integer, nullable=False)  # food_resources version the run read
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'geoid10': self.geoid10,
+            'neighborhood': self.neighborhood,
+            'resource_type': self.resource_type,
+            'score': self.score,
+            'resources_in_catchment': self.resources_in_catchment,
+            'catchment_miles': self.catchment_miles,
+            'decay': self.decay,
+            'data_version': self.data_version,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+    def __repr__(self):
+        return f'<AccessibilityScore {self.geoid10} {self.resource_type} {self.score:.4f}>'
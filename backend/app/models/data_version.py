@@ -0,0 +1,20 @@
+from app.database.db import db
+from datetime import datetime
+
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+    
+    # One row per dataset, e.g. "food_resources"
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<DataVersion {self.name} v{self.version}>'
@@ -22,6 +22,16 @@ class FoodResource(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Set by the intake scripts: which import the row came from, its key in
+    # that source and a fingerprint of the source row as last imported
+    source = db.Column(db.String(50))
+    source_key = db.Column(db.String(500))
+    content_hash = db.Column(db.String(16))
+    
+    __table_args__ = (
+        db.Index("ix_food_resources_source_key", "source", "source_key"),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
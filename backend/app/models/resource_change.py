@@ -0,0 +1,18 @@
+from app.database.db import db
+from datetime import datetime
+
+class ResourceChange(db.Model):
+    __tablename__ = 'resource_changes'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, index=True)  # food_resources data version that introduced the change
+    resource_id = db.Column(db.Integer, nullable=True)
+    
+    # Location touched by the change; NULL means "anywhere" (bulk imports)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ResourceChange v{self.version} - Resource {self.resource_id}>'
@@ -11,6 +11,8 @@ class Suggestion(db.Model):
     
     # Optional fields
     neighborhood = db.Column(db.String(100), nullable=True)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
     phone = db.Column(db.String(20), nullable=True)
     website = db.Column(db.String(255), nullable=True)
     hours = db.Column(db.Text, nullable=True)
@@ -35,6 +37,8 @@ class Suggestion(db.Model):
             'address': self.address,
             'resource_type': self.resource_type,
             'neighborhood': self.neighborhood,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'phone': self.phone,
             'website': self.website,
             'hours': self.hours,
@@ -0,0 +1,105 @@
+from flask import Blueprint, jsonify, request, current_app
+from app.database.compute_accessibility import compute_accessibility
+from app.database.db import db
+from app.models.accessibility_score import AccessibilityScore
+from app.utils.accessibility import DECAY_FUNCTIONS
+from app.utils.analytics import resource_access
+from app.utils.auth_utils import admin_required
+from app.utils.http_cache import conditional_response, content_etag
+from app.utils.neighborhoods import neighborhood_index
+from app.utils.resource_cache import Snapshot, get_resource_version, resource_snapshots
+
+analytics_bp = Blueprint("analytics_bp", __name__)
+
+@analytics_bp.route("/api/analytics/access", methods=["GET"])
+def get_access_analytics():
+    """
+    Get food access metrics per block group: distance to the nearest active
+    resource and resources per km² of land, for each resource_type.
+    Query params: optional type (comma-separated resource types).
+    Results are cached until food resources change.
+    Public endpoint - no authentication required.
+    """
+    if not neighborhood_index.loaded:
+        return jsonify({"error": "Neighborhood data not available"}), 404
+
+    resource_types = tuple(sorted(
+        t.strip() for t in request.args.get('type', '').split(',') if t.strip()
+    ))
+
+    version, updated_at = get_resource_version()
+    key = ("analytics", "access", resource_types)
+    snapshot = resource_snapshots.get(version, key)
+    if snapshot is None:
+        resource_access.ensure_current(version)
+        types = list(resource_types) or resource_access.resource_types
+        body = current_app.json.dumps({
+            "resource_types": types,
+            "distance_unit": "miles",
+            "block_groups": resource_access.access(types)
+        }).encode("utf-8")
+        snapshot = resource_snapshots.put(
+            Snapshot(version, body, last_modified=updated_at), key
+        )
+
+    return conditional_response(
+        snapshot.body, snapshot.etag, snapshot.last_modified, snapshot.mimetype,
+        compressed=snapshot.compressed
+    )
+
+@analytics_bp.route("/api/analytics/accessibility", methods=["GET"])
+def get_accessibility():
+    """
+    Get the stored 2SFCA accessibility scores per block group.
+    Query params: optional type (comma-separated resource types).
+    `stale` is true when food resources changed after the last batch run.
+    Public endpoint - no authentication required.
+    """
+    query = AccessibilityScore.query
+    resource_types = [t.strip() for t in request.args.get('type', '').split(',') if t.strip()]
+    if resource_types:
+        query = query.filter(AccessibilityScore.resource_type.in_(resource_types))
+    scores = query.order_by(AccessibilityScore.geoid10, AccessibilityScore.resource_type).all()
+
+    version = get_resource_version()[0]
+    first = scores[0] if scores else None
+    body = current_app.json.dumps({
+        "computed_at": first.computed_at.isoformat() if first else None,
+        "data_version": first.data_version if first else None,
+        "stale": first is None or first.data_version != version,
+        "catchment_miles": first.catchment_miles if first else None,
+        "decay": first.decay if first else None,
+        "scores": [score.to_dict() for score in scores]
+    }).encode("utf-8")
+    return conditional_response(body, content_etag(body))
+
+@analytics_bp.route("/api/analytics/accessibility", methods=["POST"])
+@admin_required
+def refresh_accessibility():
+    """
+    Rerun the 2SFCA batch job and replace the stored scores.
+    Optional JSON body: catchment_miles, decay (gaussian, linear or none).
+    Admin only endpoint.
+    """
+    data = request.get_json(silent=True) or {}
+
+    try:
+        catchment = float(data['catchment_miles']) if data.get('catchment_miles') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "catchment_miles must be a valid number"}), 400
+    if catchment is not None and catchment <= 0:
+        return jsonify({"error": "catchment_miles must be positive"}), 400
+
+    decay = data.get('decay')
+    if decay is not None and decay not in DECAY_FUNCTIONS:
+        return jsonify({"error": f"decay must be one of {', '.join(DECAY_FUNCTIONS)}"}), 400
+
+    try:
+        summary = compute_accessibility(catchment, decay)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(summary), 200
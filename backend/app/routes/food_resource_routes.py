@@ -1,10 +1,27 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime
+import math
+import numpy as np
+from flask import Blueprint, jsonify, request, current_app, stream_with_context
 from app.models.food_resource import FoodResource
 from app.database.db import db
 from app.utils.auth_utils import admin_required
+from app.utils.http_cache import conditional_response, content_etag
+from app.utils.resource_cache import (
+    Snapshot, bump_resource_version, get_resource_version,
+    notify_resource_changed, resource_snapshots
+)
+from app.utils.clustering import resource_clusters
+from app.utils.columnar import COLUMNAR_MIMETYPE, encode_columnar
+from app.utils.hours import current_week_slot, resource_hours, week_slot
+from app.utils.kdtree import resource_nearest
+from app.utils.search_index import resource_search
+from app.utils.spatial_index import resource_grid
 
 food_resource_bp = Blueprint("food_resource_bp", __name__)
 
+# Ids per IN (...) query when loading a known set of resources
+ID_QUERY_CHUNK = 500
+
 def resource_to_geojson(resource):
     """Convert FoodResource object to GeoJSON feature format."""
     return {
@@ -26,42 +43,699 @@ def resource_to_geojson(resource):
         }
     }
 
+# Feature properties that can be requested with `fields=`, in output order
+RESOURCE_FIELDS = {
+    "id": FoodResource.id,
+    "name": FoodResource.name,
+    "resource_type": FoodResource.resource_type,
+    "address": FoodResource.address,
+    "neighborhood": FoodResource.neighborhood,
+    "hours": FoodResource.hours,
+    "phone": FoodResource.phone,
+    "website": FoodResource.website,
+    "description": FoodResource.description,
+}
+
+def active_resources_query(resource_type=None, neighborhood=None):
+    """Active resources matching the list filters, in a stable order."""
+    query = FoodResource.query.filter_by(is_active=True)
+    
+    if resource_type:
+        query = query.filter_by(resource_type=resource_type)
+    if neighborhood:
+        query = query.filter_by(neighborhood=neighborhood)
+    
+    return query.order_by(FoodResource.id)
+
+def rows_with_ids(query, ids, limit=None):
+    """
+    Rows of `query` whose id is in `ids`, in id order, loaded with one
+    IN (...) query per ID_QUERY_CHUNK ids. Stops once `limit` rows are found.
+    """
+    ids = sorted(ids)
+    for start in range(0, len(ids), ID_QUERY_CHUNK):
+        for row in query.filter(FoodResource.id.in_(ids[start:start + ID_QUERY_CHUNK])).order_by(FoodResource.id):
+            yield row
+            if limit is not None:
+                limit -= 1
+                if limit <= 0:
+                    return
+
+def iter_feature_collection(query, batch_size=500, include_ids=None):
+    """
+    Encode a query as a GeoJSON FeatureCollection in chunks.
+    Rows are fetched `batch_size` at a time with yield_per, so only one
+    batch of ORM objects and encoded features is alive at once.
+    If `include_ids` is given, only those rows are queried (in id order).
+    """
+    dumps = current_app.json.dumps
+    yield b'{"type":"FeatureCollection","features":['
+    first = True
+    batch = []
+    rows = query.yield_per(batch_size) if include_ids is None else rows_with_ids(query, include_ids)
+    for resource in rows:
+        batch.append(dumps(resource_to_geojson(resource)))
+        if len(batch) >= batch_size:
+            yield ("" if first else ",").encode("utf-8") + ",".join(batch).encode("utf-8")
+            first = False
+            batch = []
+    if batch:
+        yield ("" if first else ",").encode("utf-8") + ",".join(batch).encode("utf-8")
+    yield b"]}"
+
+def build_feature_collection(resource_type=None, neighborhood=None):
+    """Query active resources and encode them as a GeoJSON FeatureCollection."""
+    # Return GeoJSON format for map compatibility
+    return b"".join(iter_feature_collection(
+        active_resources_query(resource_type, neighborhood),
+        current_app.config["RESOURCE_STREAM_BATCH_SIZE"]
+    ))
+
 @food_resource_bp.route("/api/food-resources", methods=["GET"])
 def get_food_resources():
     """
     Get all active food resources with optional filtering.
     Public endpoint - no authentication required.
+    
+    With `bbox=minLng,minLat,maxLng,maxLat` only resources in that viewport
+    are returned, capped by `limit` or a cap derived from `zoom`.
+    
+    With `after_id` / `limit` the list is paged by id (keyset), with
+    `ids=1,2,3` only those resources are returned, and `fields=id,name,...`
+    limits the properties (and the columns selected) for any of these.
+    
+    `open_now=1` or `open_at=<ISO datetime>` keeps only resources whose
+    parsed hours say they are open then (naive times are local to
+    HOURS_TIMEZONE; resources without readable hours are left out).
+    
+    Without bbox or paging parameters, `format=columnar` (or `Accept:
+    application/vnd.foodresources.columnar`) returns the compact binary
+    encoding in app/utils/columnar.py: coordinates, type and neighborhood only.
+    
+    With `stream=1` (or when RESOURCE_SNAPSHOT_MAX_ENTRIES is 0) the
+    collection is streamed from the database in batches instead of cached.
+    
+    The encoded FeatureCollection is cached per (type, neighborhood) and
+    rebuilt only after a write bumps the data version. Supports conditional
+    GET via ETag / Last-Modified.
     """
-    resource_type = request.args.get('type')
-    neighborhood = request.args.get('neighborhood')
+    resource_type = request.args.get('type') or None
+    neighborhood = request.args.get('neighborhood') or None
     
-    query = FoodResource.query.filter_by(is_active=True)
+    # The open-hours filter applies to every variant below
+    slot, error = requested_open_slot()
+    if error:
+        return error
+    
+    if request.args.get('bbox'):
+        return get_food_resources_in_view(resource_type, neighborhood, slot)
+    if any(request.args.get(arg) for arg in ('ids', 'after_id', 'limit', 'fields')):
+        return get_food_resource_page(resource_type, neighborhood, slot)
+    if slot is not None:
+        response = get_open_food_resources(resource_type, neighborhood, slot)
+        response.vary.add("Accept")
+        return response
+    
+    response_format = requested_format()
+    if response_format is None:
+        return jsonify({"error": "format must be geojson or columnar"}), 400
+    if response_format == "columnar":
+        response = get_food_resources_columnar(resource_type, neighborhood)
+        response.vary.add("Accept")
+        return response
     
+    version, updated_at = get_resource_version()
+    if request.args.get('stream') == '1' or not resource_snapshots.max_entries:
+        response = stream_food_resources(resource_type, neighborhood, version, updated_at)
+        response.vary.add("Accept")
+        return response
+    
+    key = (resource_type, neighborhood)
+    snapshot = resource_snapshots.get(version, key)
+    if snapshot is None:
+        snapshot = resource_snapshots.put(
+            Snapshot(
+                version,
+                build_feature_collection(resource_type, neighborhood),
+                last_modified=updated_at
+            ),
+            key
+        )
+    
+    response = conditional_response(
+        snapshot.body, snapshot.etag, snapshot.last_modified, snapshot.mimetype,
+        compressed=snapshot.compressed
+    )
+    response.vary.add("Accept")
+    return response
+
+def requested_open_slot():
+    """
+    Week slot from `open_at` (or now for `open_now=1`).
+    Returns (slot, None), (None, None) when no open-hours filter was asked
+    for, or (None, error_response).
+    """
+    timezone = current_app.config["HOURS_TIMEZONE"]
+    if request.args.get('open_at'):
+        try:
+            return week_slot(datetime.fromisoformat(request.args['open_at']), timezone), None
+        except ValueError:
+            return None, (jsonify({"error": "open_at must be an ISO 8601 datetime"}), 400)
+    if request.args.get('open_now') == '1':
+        return current_week_slot(timezone), None
+    return None, None
+
+def open_resource_ids(version, slot):
+    """Set of ids open during `slot`, or None when there is no open-hours filter."""
+    if slot is None:
+        return None
+    return set(resource_hours.ensure_current(version).open_ids(slot).tolist())
+
+def get_open_food_resources(resource_type, neighborhood, slot):
+    """
+    FeatureCollection of resources open during a week slot, checked
+    against the compiled hours index. Cached per 5 minute week slot.
+    """
+    version, updated_at = get_resource_version()
+    key = ("open", resource_type, neighborhood, slot)
+    snapshot = resource_snapshots.get(version, key)
+    if snapshot is None:
+        open_ids = open_resource_ids(version, slot)
+        body = b"".join(iter_feature_collection(
+            active_resources_query(resource_type, neighborhood),
+            current_app.config["RESOURCE_STREAM_BATCH_SIZE"],
+            include_ids=open_ids
+        ))
+        snapshot = resource_snapshots.put(Snapshot(version, body, last_modified=updated_at), key)
+    
+    return conditional_response(
+        snapshot.body, snapshot.etag, snapshot.last_modified, snapshot.mimetype,
+        compressed=snapshot.compressed
+    )
+
+def requested_format():
+    """
+    Response format from `format=` or, failing that, the Accept header.
+    Returns "geojson", "columnar" or None for an unknown format.
+    """
+    value = request.args.get('format')
+    if value:
+        return value if value in ("geojson", "columnar") else None
+    best = request.accept_mimetypes.best_match(["application/json", COLUMNAR_MIMETYPE])
+    return "columnar" if best == COLUMNAR_MIMETYPE else "geojson"
+
+def build_columnar(resource_type, neighborhood):
+    """Select only the columnar fields for active resources and encode them."""
+    query = db.session.query(
+        FoodResource.id, FoodResource.latitude, FoodResource.longitude,
+        FoodResource.resource_type, FoodResource.neighborhood
+    ).filter(FoodResource.is_active.is_(True))
     if resource_type:
-        query = query.filter_by(resource_type=resource_type)
+        query = query.filter(FoodResource.resource_type == resource_type)
     if neighborhood:
-        query = query.filter_by(neighborhood=neighborhood)
+        query = query.filter(FoodResource.neighborhood == neighborhood)
+    rows = query.all()
+    ids, lats, lngs, types, neighborhoods = zip(*rows) if rows else ((), (), (), (), ())
+    return encode_columnar(
+        ids, lats, lngs, types, neighborhoods, current_app.config["COLUMNAR_COORD_PRECISION"]
+    )
+
+def get_food_resources_columnar(resource_type, neighborhood):
+    """Columnar binary list for get_food_resources, cached per data version."""
+    version, updated_at = get_resource_version()
+    key = ("columnar", resource_type, neighborhood)
+    snapshot = resource_snapshots.get(version, key)
+    if snapshot is None:
+        snapshot = resource_snapshots.put(
+            Snapshot(
+                version,
+                build_columnar(resource_type, neighborhood),
+                mimetype=COLUMNAR_MIMETYPE,
+                last_modified=updated_at
+            ),
+            key
+        )
+    
+    return conditional_response(
+        snapshot.body, snapshot.etag, snapshot.last_modified, snapshot.mimetype,
+        compressed=snapshot.compressed
+    )
+
+def stream_food_resources(resource_type, neighborhood, version, updated_at):
+    """
+    Chunked FeatureCollection response with bounded memory per request.
+    The body is not known up front, so the ETag is derived from the data
+    version and filters; rows come out in id order, so the same version and
+    filters always produce the same bytes.
+    """
+    etag = content_etag(f"{version}|{resource_type}|{neighborhood}".encode("utf-8"))
+    body = stream_with_context(iter_feature_collection(
+        active_resources_query(resource_type, neighborhood),
+        current_app.config["RESOURCE_STREAM_BATCH_SIZE"]
+    ))
+    return conditional_response(body, etag, updated_at)
+
+# Largest id SQLite can store (signed 64-bit INTEGER)
+MAX_RESOURCE_ID = 2 ** 63 - 1
+
+def parse_resource_id(value):
+    """Parse one resource id; raises ValueError unless it is in 1..MAX_RESOURCE_ID."""
+    resource_id = int(value)
+    if not 1 <= resource_id <= MAX_RESOURCE_ID:
+        raise ValueError(f"id out of range: {value}")
+    return resource_id
+
+def parse_id_list(value, max_ids):
+    """
+    Parse a comma separated list of ids, dropping duplicates. Raises
+    ValueError for bad ids and OverflowError past `max_ids` distinct ids.
+    """
+    ids = {}
+    for part in value.split(','):
+        if part.strip():
+            ids[parse_resource_id(part)] = None
+            if len(ids) > max_ids:
+                raise OverflowError(f"At most {max_ids} ids per request")
+    return list(ids)
+
+def parse_fields(value):
+    """Parse `fields=` into property names; `id` is always included. Raises ValueError."""
+    if not value:
+        return list(RESOURCE_FIELDS)
+    requested = {f.strip() for f in value.split(',') if f.strip()}
+    unknown = requested - set(RESOURCE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return [name for name in RESOURCE_FIELDS if name in requested]
+
+def projected_features(rows, fields):
+    """GeoJSON features from (latitude, longitude, *fields) rows."""
+    return [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [row[1], row[0]]},
+            "properties": dict(zip(fields, row[2:]))
+        }
+        for row in rows
+    ]
+
+def build_resource_page(resource_type, neighborhood, fields, ids, after_id, limit, open_ids=None):
+    """
+    Encode one page of active resources, selecting only the requested columns.
+    `ids` keeps the requested order; otherwise rows come in id order after
+    `after_id`. Adds `next_after_id` when there may be another page.
+    With `open_ids` only those resources are considered.
+    """
+    columns = [FoodResource.latitude, FoodResource.longitude] + [RESOURCE_FIELDS[f] for f in fields]
+    query = db.session.query(*columns).filter(FoodResource.is_active.is_(True))
+    if resource_type:
+        query = query.filter(FoodResource.resource_type == resource_type)
+    if neighborhood:
+        query = query.filter(FoodResource.neighborhood == neighborhood)
     
-    resources = query.all()
+    payload = {"type": "FeatureCollection"}
+    if ids is not None and open_ids is not None:
+        ids = [resource_id for resource_id in ids if resource_id in open_ids]
+    if ids is not None:
+        rows = query.filter(FoodResource.id.in_(ids)).all() if ids else []
+        position = {resource_id: i for i, resource_id in enumerate(ids)}
+        id_column = 2 + fields.index("id")
+        rows.sort(key=lambda row: position[row[id_column]])
+        payload["features"] = projected_features(rows, fields)
+    else:
+        if after_id is not None:
+            query = query.filter(FoodResource.id > after_id)
+        if open_ids is not None:
+            rows = list(rows_with_ids(query, open_ids, limit))
+        else:
+            query = query.order_by(FoodResource.id)
+            if limit is not None:
+                query = query.limit(limit)
+            rows = query.all()
+        payload["features"] = projected_features(rows, fields)
+        if limit is not None:
+            # Keyset cursor: the next page starts after the last id returned
+            full_page = len(rows) == limit
+            payload["next_after_id"] = payload["features"][-1]["properties"]["id"] if full_page else None
+    return current_app.json.dumps(payload).encode("utf-8")
+
+def get_food_resource_page(resource_type, neighborhood, slot=None):
+    """Keyset page, batch-by-ids or projected list for get_food_resources."""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Return GeoJSON format for map compatibility
-    return jsonify({
+    ids = after_id = limit = None
+    try:
+        if request.args.get('ids'):
+            ids = parse_id_list(request.args['ids'], current_app.config["RESOURCE_BATCH_MAX_IDS"])
+        else:
+            if request.args.get('after_id'):
+                after_id = parse_resource_id(request.args['after_id'])
+            if request.args.get('limit') or after_id is not None:
+                limit = int(request.args.get('limit', current_app.config["RESOURCE_PAGE_DEFAULT_LIMIT"]))
+    except OverflowError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValueError:
+        return jsonify({"error": "ids, after_id and limit must be integers"}), 400
+    
+    if limit is not None:
+        limit = max(1, min(limit, current_app.config["RESOURCE_PAGE_MAX_LIMIT"]))
+    
+    version, updated_at = get_resource_version()
+    key = ("page", resource_type, neighborhood, tuple(fields),
+           tuple(ids) if ids is not None else None, after_id, limit, slot)
+    snapshot = resource_snapshots.get(version, key)
+    if snapshot is None:
+        snapshot = resource_snapshots.put(
+            Snapshot(
+                version,
+                build_resource_page(
+                    resource_type, neighborhood, fields, ids, after_id, limit,
+                    open_resource_ids(version, slot)
+                ),
+                last_modified=updated_at
+            ),
+            key
+        )
+    
+    return conditional_response(
+        snapshot.body, snapshot.etag, snapshot.last_modified, snapshot.mimetype,
+        compressed=snapshot.compressed
+    )
+
+def parse_point_args():
+    """
+    Read lat/lng query parameters.
+    Returns ((lat, lng), None) or (None, error_response).
+    """
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+    except KeyError as e:
+        return None, (jsonify({"error": f"Missing required parameter: {e.args[0]}"}), 400)
+    except ValueError:
+        return None, (jsonify({"error": "lat and lng must be valid numbers"}), 400)
+    
+    if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+        return None, (jsonify({"error": "Invalid coordinates"}), 400)
+    
+    return (lat, lng), None
+
+def features_for_ids(ids, distances=None, scores=None):
+    """
+    Load resources by id and return GeoJSON features in the given order.
+    If distances are given, each feature gets a `distance` property (miles);
+    if scores are given, a `score` property. Both are matched to ids by
+    position, so ids no longer in the table do not shift them.
+    """
+    ids = [int(i) for i in ids]
+    resources = FoodResource.query.filter(FoodResource.id.in_(ids)).all() if ids else []
+    by_id = {r.id: r for r in resources}
+    
+    features = []
+    for position, resource_id in enumerate(ids):
+        resource = by_id.get(resource_id)
+        if resource is None:
+            continue
+        feature = resource_to_geojson(resource)
+        if distances is not None:
+            feature["properties"]["distance"] = round(float(distances[position]), 3)
+        if scores is not None:
+            feature["properties"]["score"] = round(float(scores[position]), 4)
+        features.append(feature)
+    return features
+
+def parse_bbox(value):
+    """Parse `minLng,minLat,maxLng,maxLat` into (min_lat, min_lng, max_lat, max_lng)."""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in value.split(','))
+    except ValueError:
+        return None
+    if not (-90 <= min_lat <= max_lat <= 90) or not (-180 <= min_lng <= max_lng <= 180):
+        return None
+    return min_lat, min_lng, max_lat, max_lng
+
+def viewport_limit(zoom=None):
+    """
+    Feature cap for a viewport request: an explicit `limit`, else the cap
+    configured for the zoom (argument or `zoom` parameter), never above
+    VIEWPORT_MAX_LIMIT. Raises ValueError for non-numeric parameters.
+    """
+    max_limit = current_app.config["VIEWPORT_MAX_LIMIT"]
+    if request.args.get('limit'):
+        return max(1, min(int(request.args['limit']), max_limit))
+    if zoom is None and request.args.get('zoom'):
+        zoom = float(request.args['zoom'])
+        if not math.isfinite(zoom):
+            raise ValueError("zoom must be finite")
+    if zoom is not None:
+        caps = current_app.config["VIEWPORT_LIMITS_BY_ZOOM"]
+        eligible = [z for z in caps if z <= zoom]
+        if eligible:
+            return min(caps[max(eligible)], max_limit)
+    return max_limit
+
+def get_food_resources_in_view(resource_type, neighborhood, slot=None):
+    """Viewport query for get_food_resources, served from the grid index."""
+    bbox = parse_bbox(request.args['bbox'])
+    if bbox is None:
+        return jsonify({"error": "bbox must be minLng,minLat,maxLng,maxLat"}), 400
+    try:
+        limit = viewport_limit()
+    except ValueError:
+        return jsonify({"error": "limit and zoom must be valid numbers"}), 400
+    
+    version, updated_at = get_resource_version()
+    ids, total = resource_grid.ensure_current(version).in_box(
+        *bbox,
+        resource_types=[resource_type] if resource_type else None,
+        neighborhood=neighborhood,
+        limit=limit,
+        only_ids=open_resource_ids(version, slot)
+    )
+    
+    # Closest to the viewport center come first; `total` tells the client how many were cut
+    body = current_app.json.dumps({
+        "type": "FeatureCollection",
+        "features": features_for_ids(ids),
+        "total": total,
+        "truncated": total > len(ids)
+    }).encode("utf-8")
+    return conditional_response(body, content_etag(body), updated_at)
+
+@food_resource_bp.route("/api/food-resources/nearby", methods=["GET"])
+def get_nearby_food_resources():
+    """
+    Get active food resources within a radius of a point, nearest first.
+    Query params: lat, lng, radius (miles), optional type and limit.
+    Each feature's properties include `distance` in miles.
+    Public endpoint - no authentication required.
+    """
+    point, error = parse_point_args()
+    if error:
+        return error
+    lat, lng = point
+    
+    try:
+        radius = float(request.args.get('radius', current_app.config["NEARBY_DEFAULT_RADIUS_MILES"]))
+        limit = int(request.args.get('limit', current_app.config["NEARBY_DEFAULT_LIMIT"]))
+    except ValueError:
+        return jsonify({"error": "radius and limit must be valid numbers"}), 400
+    
+    if not (0 < radius <= current_app.config["NEARBY_MAX_RADIUS_MILES"]):
+        return jsonify({
+            "error": f"radius must be between 0 and {current_app.config['NEARBY_MAX_RADIUS_MILES']} miles"
+        }), 400
+    limit = max(1, min(limit, current_app.config["NEARBY_MAX_LIMIT"]))
+    
+    resource_type = request.args.get('type')
+    
+    version, updated_at = get_resource_version()
+    ids, distances = resource_grid.ensure_current(version).within(
+        lat, lng, radius,
+        resource_types=[resource_type] if resource_type else None,
+        limit=limit
+    )
+    
+    body = current_app.json.dumps({
+        "type": "FeatureCollection",
+        "features": features_for_ids(ids, distances)
+    }).encode("utf-8")
+    return conditional_response(body, content_etag(body), updated_at)
+
+@food_resource_bp.route("/api/food-resources/nearest", methods=["GET"])
+def get_nearest_food_resources():
+    """
+    Get the k nearest active food resources of each requested type.
+    Query params: lat, lng, optional k and types. `types` is a comma
+    separated list where each entry may carry its own k, e.g.
+    `types=grocery:5,pantry:3`. Without `types`, every type is included.
+    Features are grouped by type in request order, nearest first, with
+    `distance` in miles.
+    Public endpoint - no authentication required.
+    """
+    point, error = parse_point_args()
+    if error:
+        return error
+    lat, lng = point
+    
+    max_k = current_app.config["NEAREST_MAX_K"]
+    try:
+        default_k = int(request.args.get('k', current_app.config["NEAREST_DEFAULT_K"]))
+        requested = []
+        for entry in filter(None, (t.strip() for t in request.args.get('types', '').split(','))):
+            resource_type, _, k = entry.partition(':')
+            requested.append((resource_type.strip(), int(k) if k else default_k))
+    except ValueError:
+        return jsonify({"error": "k must be a whole number"}), 400
+    
+    version, updated_at = get_resource_version()
+    index = resource_nearest.ensure_current(version)
+    if not requested:
+        requested = [(resource_type, default_k) for resource_type in index.resource_types]
+    
+    all_ids, all_distances = [], []
+    for resource_type, k in requested:
+        ids, distances = index.nearest(lat, lng, max(1, min(k, max_k)), resource_type)
+        all_ids.append(ids)
+        all_distances.append(distances)
+    
+    body = current_app.json.dumps({
+        "type": "FeatureCollection",
+        "features": features_for_ids(
+            np.concatenate(all_ids) if all_ids else np.empty(0, dtype=np.int64),
+            np.concatenate(all_distances) if all_distances else np.empty(0)
+        )
+    }).encode("utf-8")
+    return conditional_response(body, content_etag(body), updated_at)
+
+@food_resource_bp.route("/api/food-resources/search", methods=["GET"])
+def search_food_resources():
+    """
+    Ranked full-text search over name, address, neighborhood and description.
+    Query params: q, optional type and limit. Every word of `q` must match;
+    the last one also matches as a prefix. Features come best first with a
+    `score` property, plus `total` matches.
+    Public endpoint - no authentication required.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Missing required parameter: q"}), 400
+    resource_type = request.args.get('type') or None
+    try:
+        limit = int(request.args.get('limit', current_app.config["SEARCH_DEFAULT_LIMIT"]))
+    except ValueError:
+        return jsonify({"error": "limit must be a whole number"}), 400
+    limit = max(1, min(limit, current_app.config["SEARCH_MAX_LIMIT"]))
+    
+    version, updated_at = get_resource_version()
+    ids, scores, total = resource_search.ensure_current(version).search(
+        query, resource_types=[resource_type] if resource_type else None, limit=limit
+    )
+    
+    features = features_for_ids(ids, scores=scores)
+    body = current_app.json.dumps({
+        "type": "FeatureCollection",
+        "features": features,
+        "total": total
+    }).encode("utf-8")
+    return conditional_response(body, content_etag(body), updated_at)
+
+def cluster_to_geojson(lat, lng, count):
+    """GeoJSON feature for a cluster of `count` resources."""
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [lng, lat]
+        },
+        "properties": {
+            "cluster": True,
+            "point_count": count
+        }
+    }
+
+@food_resource_bp.route("/api/food-resources/clusters", methods=["GET"])
+def get_food_resource_clusters():
+    """
+    Get clustered food resources for a map zoom level.
+    Query params: z (zoom), optional bbox=minLng,minLat,maxLng,maxLat, type
+    and limit. Clusters come back as features with `cluster: true` and
+    `point_count`; lone resources and every resource above
+    CLUSTER_MAX_ZOOM come back as regular resource features.
+    Public endpoint - no authentication required.
+    """
+    try:
+        zoom = int(request.args['z'])
+    except KeyError:
+        return jsonify({"error": "Missing required parameter: z"}), 400
+    except ValueError:
+        return jsonify({"error": "z must be a whole number"}), 400
+    if zoom < 0:
+        return jsonify({"error": "z must not be negative"}), 400
+    
+    bbox = (-90.0, -180.0, 90.0, 180.0)
+    if request.args.get('bbox'):
+        bbox = parse_bbox(request.args['bbox'])
+        if bbox is None:
+            return jsonify({"error": "bbox must be minLng,minLat,maxLng,maxLat"}), 400
+    try:
+        limit = viewport_limit(zoom)
+    except ValueError:
+        return jsonify({"error": "limit must be a whole number"}), 400
+    
+    resource_type = request.args.get('type') or None
+    version, updated_at = get_resource_version()
+    
+    if zoom > resource_clusters.max_zoom:
+        ids, total = resource_grid.ensure_current(version).in_box(
+            *bbox, resource_types=[resource_type] if resource_type else None, limit=limit
+        )
+        features = features_for_ids(ids)
+    else:
+        clusters = resource_clusters.ensure_current(version).clusters(zoom, *bbox, resource_type)
+        total = len(clusters)
+        if total > limit:
+            # Keep the biggest clusters when the viewport holds too many
+            clusters = sorted(clusters, key=lambda c: c[2], reverse=True)[:limit]
+        singles = {
+            f["properties"]["id"]: f
+            for f in features_for_ids([c[3] for c in clusters if c[3] is not None])
+        }
+        features = []
+        for lat, lng, count, resource_id in clusters:
+            if resource_id is None:
+                features.append(cluster_to_geojson(lat, lng, count))
+            elif resource_id in singles:
+                features.append(singles[resource_id])
+    
+    body = current_app.json.dumps({
         "type": "FeatureCollection",
-        "features": [resource_to_geojson(r) for r in resources]
-    })
+        "features": features,
+        "total": total,
+        "truncated": total > len(features)
+    }).encode("utf-8")
+    return conditional_response(body, content_etag(body), updated_at)
 
 @food_resource_bp.route("/api/food-resources/<int:id>", methods=["GET"])
 def get_food_resource(id):
     """
     Get single resource details.
     Public endpoint - no authentication required.
+    Supports conditional GET via ETag / Last-Modified.
     """
     resource = FoodResource.query.get(id)
     
     if not resource or not resource.is_active:
         return jsonify({"error": "Resource not found"}), 404
     
-    return jsonify(resource.to_dict())
+    # Last-Modified is the dataset's, which is never older than this row's
+    _, updated_at = get_resource_version()
+    body = current_app.json.dumps(resource.to_dict()).encode("utf-8")
+    return conditional_response(body, content_etag(body), updated_at)
 
 @food_resource_bp.route("/api/food-resources", methods=["POST"])
 @admin_required
@@ -103,7 +777,10 @@ def create_food_resource():
         )
         
         db.session.add(resource)
+        db.session.flush()
+        version = bump_resource_version([(resource.id, lat, lng)])
         db.session.commit()
+        notify_resource_changed(resource, version)
         
         return jsonify(resource.to_dict()), 201
     
@@ -124,6 +801,7 @@ def update_food_resource(id):
         return jsonify({"error": "Resource not found"}), 404
     
     data = request.get_json()
+    old_location = (resource.id, resource.latitude, resource.longitude)
     
     try:
         # Update fields if provided
@@ -160,7 +838,11 @@ def update_food_resource(id):
         if 'is_active' in data:
             resource.is_active = bool(data['is_active'])
         
+        version = bump_resource_version([
+            old_location, (resource.id, resource.latitude, resource.longitude)
+        ])
         db.session.commit()
+        notify_resource_changed(resource, version)
         
         return jsonify(resource.to_dict())
     
@@ -185,7 +867,9 @@ def delete_food_resource(id):
     try:
         # Soft delete: just mark as inactive
         resource.is_active = False
+        version = bump_resource_version([(resource.id, resource.latitude, resource.longitude)])
         db.session.commit()
+        notify_resource_changed(resource, version)
         
         return jsonify({"message": "Resource deleted successfully"}), 200
     
@@ -0,0 +1,94 @@
+import os
+from datetime import datetime, timezone
+from flask import Blueprint, jsonify, request, current_app
+from app.utils.boundaries import neighborhood_boundaries
+from app.utils.http_cache import conditional_response, content_etag
+from app.utils.neighborhoods import neighborhood_index
+from app.utils.resource_cache import Snapshot
+
+neighborhood_bp = Blueprint("neighborhood_bp", __name__)
+
+# Encoded neighborhoods file, reloaded only when its mtime changes
+_neighborhoods = {"snapshot": None}
+
+def load_neighborhoods_snapshot():
+    """Return the neighborhoods GeoJSON as a Snapshot versioned by file mtime."""
+    path = current_app.config["NEIGHBORHOODS_GEOJSON"]
+    mtime = int(os.path.getmtime(path))
+    snapshot = _neighborhoods["snapshot"]
+    if snapshot is None or snapshot.version != mtime:
+        with open(path, "rb") as f:
+            body = f.read()
+        snapshot = Snapshot(
+            mtime, body,
+            mimetype="application/geo+json",
+            last_modified=datetime.fromtimestamp(mtime, timezone.utc)
+        )
+        _neighborhoods["snapshot"] = snapshot
+    return snapshot
+
+@neighborhood_bp.route("/api/neighborhoods", methods=["GET"])
+def get_neighborhoods():
+    """
+    Get the neighborhood / block group boundaries as GeoJSON.
+    Public endpoint - no authentication required.
+    """
+    try:
+        snapshot = load_neighborhoods_snapshot()
+    except OSError:
+        return jsonify({"error": "Neighborhood data not available"}), 404
+    return conditional_response(
+        snapshot.body, snapshot.etag, snapshot.last_modified, snapshot.mimetype,
+        compressed=snapshot.compressed
+    )
+
+@neighborhood_bp.route("/api/neighborhoods/boundaries", methods=["GET"])
+def get_neighborhood_boundaries():
+    """
+    Get simplified neighborhood boundaries for a map zoom level.
+    Query params: optional zoom (defaults to the most detailed level).
+    Geometries are precomputed at startup for NEIGHBORHOOD_BOUNDARY_ZOOMS;
+    the closest level at or below `zoom` is served.
+    Public endpoint - no authentication required.
+    """
+    try:
+        zoom = float(request.args['zoom']) if request.args.get('zoom') else float("inf")
+    except ValueError:
+        return jsonify({"error": "zoom must be a valid number"}), 400
+    
+    snapshot = neighborhood_boundaries.for_zoom(zoom)
+    if snapshot is None:
+        return jsonify({"error": "Neighborhood data not available"}), 404
+    
+    return conditional_response(
+        snapshot.body, snapshot.etag, snapshot.last_modified, snapshot.mimetype,
+        compressed=snapshot.compressed
+    )
+
+@neighborhood_bp.route("/api/neighborhoods/lookup", methods=["GET"])
+def lookup_neighborhood():
+    """
+    Get the neighborhood (and block group geoid10) containing a point.
+    Query params: lat, lng.
+    Public endpoint - no authentication required.
+    """
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+    except KeyError as e:
+        return jsonify({"error": f"Missing required parameter: {e.args[0]}"}), 400
+    except ValueError:
+        return jsonify({"error": "lat and lng must be valid numbers"}), 400
+    
+    if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+        return jsonify({"error": "Invalid coordinates"}), 400
+    
+    feature = neighborhood_index.lookup(lat, lng)
+    if feature is None:
+        return jsonify({"error": "No neighborhood at this location"}), 404
+    
+    body = current_app.json.dumps({
+        "neighborhood": feature["neighborhood"],
+        "geoid10": feature["geoid10"]
+    }).encode("utf-8")
+    return conditional_response(body, content_etag(body))
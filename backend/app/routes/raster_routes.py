@@ -0,0 +1,59 @@
+from flask import Blueprint, jsonify, current_app
+from app.utils.distance_raster import raster_tiles, render_tile, resource_raster
+from app.utils.http_cache import conditional_response
+from app.utils.resource_cache import Snapshot, get_resource_version
+
+raster_bp = Blueprint("raster_bp", __name__)
+
+RASTER_TILE_MIMETYPES = {
+    "png": "image/png",
+    "npy": "application/octet-stream",
+}
+
+@raster_bp.route("/api/raster", methods=["GET"])
+def get_raster_info():
+    """
+    Get the distance raster layout: bounds, grid shape, cell size, layers
+    and the distance cap in miles.
+    Public endpoint - no authentication required.
+    """
+    resource_raster.ensure_current()
+    return jsonify(resource_raster.describe()), 200
+
+@raster_bp.route("/api/raster/<resource_type>/<int:z>/<int:x>/<int:y>.<fmt>", methods=["GET"])
+def get_raster_tile(resource_type, z, x, y, fmt):
+    """
+    Get one heatmap tile of distance to the nearest resource of a type
+    (slippy map z/x/y scheme). `.png` is a colored overlay, `.npy` the
+    distances in miles as a 256 x 256 float32 array (NaN outside the city,
+    inf beyond the distance cap).
+    Public endpoint - no authentication required.
+    """
+    if fmt not in RASTER_TILE_MIMETYPES:
+        return jsonify({"error": "Tile format must be png or npy"}), 400
+    if resource_type not in resource_raster.resource_types:
+        return jsonify({"error": f"No raster layer for resource type: {resource_type}"}), 404
+    if z > current_app.config["TILE_MAX_ZOOM"]:
+        return jsonify({"error": f"Zoom must be at most {current_app.config['TILE_MAX_ZOOM']}"}), 400
+    if x >= 2 ** z or y >= 2 ** z:
+        return jsonify({"error": "Tile coordinates out of range"}), 400
+
+    version, updated_at = get_resource_version()
+    key = ("raster", resource_type, z, x, y, fmt)
+    snapshot = raster_tiles.get(version, key)
+    if snapshot is None:
+        resource_raster.ensure_current(version)
+        snapshot = raster_tiles.put(
+            Snapshot(
+                version,
+                render_tile(resource_raster, resource_type, z, x, y, fmt),
+                mimetype=RASTER_TILE_MIMETYPES[fmt],
+                last_modified=updated_at
+            ),
+            key
+        )
+
+    return conditional_response(
+        snapshot.body, snapshot.etag, snapshot.last_modified, snapshot.mimetype,
+        compressed=snapshot.compressed
+    )
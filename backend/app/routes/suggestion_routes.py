@@ -1,7 +1,10 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from app.models.suggestion import Suggestion
 from app.database.db import db
+from app.utils.accessibility import block_group_demand
+from app.utils.analytics import resource_access
 from app.utils.auth_utils import admin_required
+from app.utils.neighborhoods import neighborhood_index
 
 suggestion_bp = Blueprint("suggestion_bp", __name__)
 
@@ -9,6 +12,8 @@ suggestion_bp = Blueprint("suggestion_bp", __name__)
 def create_suggestion():
     """
     Submit a new location suggestion.
+    Optional `latitude`/`longitude` are stored with the suggestion; if
+    `neighborhood` is blank it is looked up from them.
     Public endpoint - no authentication required.
     """
     data = request.get_json()
@@ -19,12 +24,31 @@ def create_suggestion():
         if not data.get(field) or not data[field].strip():
             return jsonify({"error": f"Missing required field: {field}"}), 400
     
+    latitude = longitude = None
+    if data.get('latitude') is not None or data.get('longitude') is not None:
+        try:
+            latitude = float(data['latitude'])
+            longitude = float(data['longitude'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": "latitude and longitude must be valid numbers"}), 400
+        if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+            return jsonify({"error": "Invalid coordinates"}), 400
+    
+    neighborhood = data.get('neighborhood', '').strip() or None
+    if neighborhood is None and latitude is not None:
+        # Fill the neighborhood from the submitted location when the form left it blank
+        feature = neighborhood_index.lookup(latitude, longitude)
+        if feature is not None:
+            neighborhood = feature["neighborhood"]
+    
     try:
         suggestion = Suggestion(
             name=data['name'].strip(),
             address=data['address'].strip(),
             resource_type=data['resource_type'].strip(),
-            neighborhood=data.get('neighborhood', '').strip() or None,
+            neighborhood=neighborhood,
+            latitude=latitude,
+            longitude=longitude,
             phone=data.get('phone', '').strip() or None,
             website=data.get('website', '').strip() or None,
             hours=data.get('hours', '').strip() or None,
@@ -149,6 +173,70 @@ def delete_suggestion(id):
         return jsonify({"error": str(e)}), 500
 
 
+def locate_suggestion(suggestion):
+    """
+    (lat, lng, source) for a suggestion: lat/lng query params, else the
+    coordinates submitted with it. None if it has no location.
+    """
+    if request.args.get('lat') is not None or request.args.get('lng') is not None:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+        if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+            raise ValueError("Invalid coordinates")
+        return lat, lng, "coordinates"
+    
+    if suggestion.latitude is not None and suggestion.longitude is not None:
+        return suggestion.latitude, suggestion.longitude, "suggestion"
+    return None
+
+
+@suggestion_bp.route("/api/suggestions/<int:id>/impact", methods=["GET"])
+@admin_required
+def get_suggestion_impact(id):
+    """
+    Estimate how much a suggested site would shorten the trip to the nearest
+    resource of its type for each block group.
+    Query params: optional lat, lng (otherwise the coordinates submitted
+    with the suggestion are used), optional type (defaults to the
+    suggestion's type).
+    Admin only endpoint.
+    """
+    suggestion = Suggestion.query.get(id)
+    
+    if not suggestion:
+        return jsonify({"error": "Suggestion not found"}), 404
+    if not neighborhood_index.loaded:
+        return jsonify({"error": "Neighborhood data not available"}), 404
+    
+    try:
+        location = locate_suggestion(suggestion)
+    except KeyError as e:
+        return jsonify({"error": f"Missing required parameter: {e.args[0]}"}), 400
+    except ValueError:
+        return jsonify({"error": "lat and lng must be valid coordinates"}), 400
+    if location is None:
+        return jsonify({"error": "A location is required: the suggestion has no coordinates, pass lat and lng"}), 400
+    lat, lng, source = location
+    
+    resource_type = request.args.get('type') or suggestion.resource_type
+    demand_property = current_app.config["ACCESSIBILITY_DEMAND_PROPERTY"]
+    resource_access.ensure_current()
+    weights = (
+        block_group_demand(resource_access.features, demand_property) if demand_property else None
+    )
+    
+    impact = resource_access.impact(resource_type, lat, lng, weights)
+    return jsonify({
+        "suggestion_id": suggestion.id,
+        "resource_type": resource_type,
+        "latitude": lat,
+        "longitude": lng,
+        "location_source": source,
+        "weighting": demand_property or "aland10",
+        **impact
+    })
+
+
 @suggestion_bp.route("/api/suggestions/stats", methods=["GET"])
 @admin_required
 def get_suggestion_stats():
@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify, current_app
+from app.utils.http_cache import conditional_response
+from app.utils.tiles import get_tile
+
+tile_bp = Blueprint("tile_bp", __name__)
+
+@tile_bp.route("/api/tiles/<int:z>/<int:x>/<int:y>", methods=["GET"])
+def get_resource_tile(z, x, y):
+    """
+    Get one GeoJSON tile of food resources (slippy map z/x/y scheme).
+    Public endpoint - no authentication required.
+    """
+    if z > current_app.config["TILE_MAX_ZOOM"]:
+        return jsonify({"error": f"Zoom must be at most {current_app.config['TILE_MAX_ZOOM']}"}), 400
+    if x >= 2 ** z or y >= 2 ** z:
+        return jsonify({"error": "Tile coordinates out of range"}), 400
+    
+    tile, updated_at = get_tile(
+        z, x, y, current_app.config["TILE_POINT_MIN_ZOOM"], current_app.json.dumps
+    )
+    return conditional_response(tile.body, tile.etag, updated_at, compressed=tile.compressed)
@@ -0,0 +1,220 @@
+"""
+Food access metrics per block group.
+
+Origins are the block-group interior points (intptlat10/intptlon10) carried
+on each feature of data/neighborhoods.geojson, with their land area
+(aland10, square meters). For every origin and resource_type we keep the
+distance to the nearest active resource and the number of resources inside
+the feature's polygon, from which density per km² follows.
+
+Nearest distances are one vectorized haversine pass over all origin x
+destination pairs of a type, chunked so memory stays bounded. A write only
+marks its resource_type stale; that type's column is recomputed on the next
+read, so other types are untouched.
+"""
+
+import numpy as np
+
+from app.utils.geo import haversine_miles
+from app.utils.neighborhoods import neighborhood_index
+from app.utils.resource_cache import ResourceIndex, register_index
+
+# Upper bound on origin x destination pairs evaluated in one NumPy operation
+PAIR_CHUNK = 1_000_000
+
+SQ_METERS_PER_KM2 = 1_000_000
+
+
+def _coordinate(value):
+    """Float from a census coordinate string such as "+40.4405"; NaN if blank."""
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def block_group_origins(features):
+    """
+    (lats, lngs, land_km2) arrays for NeighborhoodIndex features. Features
+    without an interior point fall back to the mean of their outer ring.
+    """
+    lats = np.empty(len(features))
+    lngs = np.empty(len(features))
+    land = np.zeros(len(features))
+    for i, feature in enumerate(features):
+        properties = feature["properties"]
+        lat = _coordinate(properties.get("intptlat10"))
+        lng = _coordinate(properties.get("intptlon10"))
+        if np.isnan(lat) or np.isnan(lng):
+            ring = np.asarray(feature["rings"][0][0], dtype=np.float64)
+            lng, lat = ring[:, 0].mean(), ring[:, 1].mean()
+        lats[i], lngs[i] = lat, lng
+        land[i] = max(_coordinate(properties.get("aland10")), 0.0) / SQ_METERS_PER_KM2
+    land[np.isnan(land)] = 0.0
+    return lats, lngs, land
+
+
+def nearest_distances(origin_lats, origin_lngs, lats, lngs):
+    """
+    (miles, destination index) of the nearest destination for every origin.
+    Origins with no destinations get (inf, -1).
+    """
+    best = np.full(len(origin_lats), np.inf)
+    best_idx = np.full(len(origin_lats), -1, dtype=np.int64)
+    if not len(lats) or not len(origin_lats):
+        return best, best_idx
+    step = max(1, PAIR_CHUNK // len(origin_lats))
+    for start in range(0, len(lats), step):
+        d = haversine_miles(
+            origin_lats[:, None], origin_lngs[:, None],
+            lats[None, start:start + step], lngs[None, start:start + step]
+        )
+        idx = np.argmin(d, axis=1)
+        d = d[np.arange(len(origin_lats)), idx]
+        closer = d < best
+        best[closer] = d[closer]
+        best_idx[closer] = idx[closer] + start
+    return best, best_idx
+
+
+class AccessIndex(ResourceIndex):
+    """Nearest-resource distance and density per block group and resource_type."""
+
+    def __init__(self, features_source=None):
+        super().__init__()
+        self._features_source = features_source or neighborhood_index
+        self._reset()
+
+    def _reset(self):
+        self.features = []
+        self.origin_lats = np.empty(0)
+        self.origin_lngs = np.empty(0)
+        self.land_km2 = np.empty(0)
+        self._points = {}        # resource_type -> {id: (lat, lng, feature position)}
+        self._tables = {}        # resource_type -> (nearest miles, nearest ids, counts)
+
+    def _load_origins(self):
+        self.features = list(self._features_source.features)
+        self.origin_lats, self.origin_lngs, self.land_km2 = block_group_origins(self.features)
+
+    def rebuild(self, rows):
+        self._reset()
+        self._load_origins()
+        if not rows:
+            return
+        ids, lats, lngs, types = zip(*rows)
+        positions = self._features_source.locate(lats, lngs).tolist()
+        for resource_id, lat, lng, resource_type, position in zip(ids, lats, lngs, types, positions):
+            self._points.setdefault(resource_type, {})[resource_id] = (lat, lng, position)
+
+    def patch(self, resource):
+        for resource_type, members in list(self._points.items()):
+            if members.pop(resource.id, None) is not None:
+                self._tables.pop(resource_type, None)
+                if not members:
+                    del self._points[resource_type]
+        if resource.is_active:
+            feature = self._features_source.lookup(resource.latitude, resource.longitude)
+            position = self.features.index(feature) if feature is not None else -1
+            self._points.setdefault(resource.resource_type, {})[resource.id] = (
+                resource.latitude, resource.longitude, position
+            )
+            self._tables.pop(resource.resource_type, None)
+
+    def _table(self, resource_type):
+        """(nearest miles, nearest resource ids, counts inside each polygon) for one type."""
+        table = self._tables.get(resource_type)
+        if table is None:
+            members = self._points.get(resource_type, {})
+            ids = np.fromiter(members.keys(), dtype=np.int64, count=len(members))
+            values = np.array(list(members.values()), dtype=np.float64).reshape(-1, 3)
+            miles, idx = nearest_distances(self.origin_lats, self.origin_lngs, values[:, 0], values[:, 1])
+            nearest_ids = np.full(len(idx), -1, dtype=np.int64)
+            nearest_ids[idx >= 0] = ids[idx[idx >= 0]]
+            inside = values[:, 2].astype(np.int64)
+            counts = np.bincount(inside[inside >= 0], minlength=len(self.features))
+            table = self._tables[resource_type] = (miles, nearest_ids, counts)
+        return table
+
+    @property
+    def resource_types(self):
+        return sorted(self._points)
+
+    def nearest_miles(self, resource_type):
+        """Nearest-resource distance in miles per origin (inf where the type has none)."""
+        with self._lock:
+            return self._table(resource_type)[0]
+
+    def impact(self, resource_type, lat, lng, weights=None):
+        """
+        What adding one resource of `resource_type` at (lat, lng) would do:
+        block groups whose nearest distance drops, and the mean drop over
+        all block groups weighted by `weights` (land area when None).
+        """
+        with self._lock:
+            current = self._table(resource_type)[0]
+            proposed = haversine_miles(self.origin_lats, self.origin_lngs, lat, lng)
+            weights = self.land_km2 if weights is None else np.asarray(weights, dtype=np.float64)
+            comparable = np.isfinite(current)
+            # A type with no resources yet improves everywhere by an unbounded amount
+            gains = np.where(comparable, current - proposed, np.inf)
+            improved = np.flatnonzero(gains > 0)
+            improved = improved[np.argsort(-gains[improved], kind="stable")]
+            drops = np.where(comparable, np.maximum(gains, 0.0), 0.0)
+            total_weight = weights[comparable].sum()
+            return {
+                "block_groups_improved": len(improved),
+                "block_groups": len(self.features),
+                "weighted_improvement_miles": (
+                    round(float((weights * drops)[comparable].sum() / total_weight), 4)
+                    if total_weight > 0 else None
+                ),
+                "improvements": [
+                    {
+                        "geoid10": self.features[i]["geoid10"],
+                        "neighborhood": self.features[i]["neighborhood"],
+                        "current_miles": round(float(current[i]), 4) if np.isfinite(current[i]) else None,
+                        "proposed_miles": round(float(proposed[i]), 4),
+                        "improvement_miles": round(float(drops[i]), 4) if np.isfinite(current[i]) else None,
+                    }
+                    for i in improved.tolist()
+                ],
+            }
+
+    def access(self, resource_types=None):
+        """
+        Per block group: identity, interior point, land area and, for each
+        resource_type, nearest distance, count and density per km².
+        """
+        with self._lock:
+            types = list(resource_types or self.resource_types)
+            tables = {t: self._table(t) for t in types}
+            with np.errstate(divide="ignore", invalid="ignore"):
+                densities = {
+                    t: np.where(self.land_km2 > 0, counts / self.land_km2, np.nan)
+                    for t, (_, _, counts) in tables.items()
+                }
+            results = []
+            for i, feature in enumerate(self.features):
+                access = {}
+                for t, (miles, nearest_ids, counts) in tables.items():
+                    access[t] = {
+                        "nearest_miles": round(float(miles[i]), 4) if np.isfinite(miles[i]) else None,
+                        "nearest_id": int(nearest_ids[i]) if nearest_ids[i] >= 0 else None,
+                        "count": int(counts[i]),
+                        "density_per_km2": (
+                            round(float(densities[t][i]), 4) if np.isfinite(densities[t][i]) else None
+                        ),
+                    }
+                results.append({
+                    "geoid10": feature["geoid10"],
+                    "neighborhood": feature["neighborhood"],
+                    "latitude": round(float(self.origin_lats[i]), 6),
+                    "longitude": round(float(self.origin_lngs[i]), 6),
+                    "land_area_km2": round(float(self.land_km2[i]), 4),
+                    "access": access,
+                })
+            return results
+
+
+resource_access = register_index(AccessIndex())
@@ -0,0 +1,174 @@
+"""
+Simplified neighborhood boundaries at several map zoom levels.
+
+Rings are first split into arcs at junctions (vertices where more than two
+boundary segments meet), the way TopoJSON does. Each arc is simplified once
+with Douglas-Peucker, keeping its endpoints, and rings are reassembled from
+the simplified arcs, so a border shared by two neighborhoods stays shared and
+no gaps or overlaps open up between them.
+
+Tolerances are in screen pixels at each zoom and distances are measured in
+Web Mercator, so the same pixel tolerance looks the same at every level.
+Coordinates are rounded to the precision the zoom can show, and features
+keep only `neighborhood` and `geoid10`.
+"""
+
+import math
+
+import numpy as np
+
+from app.utils.geo import TILE_SIZE, project
+from app.utils.resource_cache import Snapshot
+
+# Coordinates are matched between rings after rounding to this many decimals
+MATCH_DECIMALS = 7
+
+
+def douglas_peucker(x, y, tolerance):
+    """Indices of the points kept when simplifying a polyline; endpoints always stay."""
+    n = len(x)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first + 1:last] - x[first], y[first + 1:last] - y[first]
+        length = math.hypot(dx, dy)
+        if length == 0:
+            distances = np.hypot(px, py)
+        else:
+            distances = np.abs(px * dy - py * dx) / length
+        worst = int(np.argmax(distances))
+        if distances[worst] > tolerance:
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep)
+
+
+def _ring_keys(ring):
+    """Hashable rounded vertex keys of an open ring (closing point dropped)."""
+    points = np.round(np.asarray(ring, dtype=np.float64)[:, :2], MATCH_DECIMALS)
+    if len(points) > 1 and (points[0] == points[-1]).all():
+        points = points[:-1]
+    return points, [tuple(p) for p in points.tolist()]
+
+
+class BoundarySet:
+    """Precomputed simplified boundary payloads keyed by zoom level."""
+
+    def __init__(self):
+        self.zooms = []
+        self._snapshots = {}
+
+    def build(self, features, zooms, tolerance_px=1.0, version=0, last_modified=None, dumps=None):
+        """
+        Simplify `features` (dicts with neighborhood, geoid10 and rings, as
+        loaded by NeighborhoodIndex) for each zoom and encode them.
+        """
+        rings = []          # (feature, polygon, ring position, points, keys)
+        neighbors = {}      # vertex key -> set of adjacent vertex keys
+        for f, feature in enumerate(features):
+            for p, polygon in enumerate(feature["rings"]):
+                for r, ring in enumerate(polygon):
+                    points, keys = _ring_keys(ring)
+                    if len(keys) < 3:
+                        continue
+                    rings.append((f, p, r, points, keys))
+                    for i, key in enumerate(keys):
+                        adjacent = neighbors.setdefault(key, set())
+                        adjacent.add(keys[i - 1])
+                        adjacent.add(keys[(i + 1) % len(keys)])
+        junctions = {key for key, adjacent in neighbors.items() if len(adjacent) > 2}
+
+        # Split each ring into arcs running from junction to junction
+        ring_arcs = []
+        for f, p, r, points, keys in rings:
+            cuts = [i for i, key in enumerate(keys) if key in junctions]
+            n = len(keys)
+            if not cuts:
+                # A ring touching nothing: cut it in two so each half keeps its far point
+                cuts = [0, n // 2]
+            arcs = []
+            for a, b in zip(cuts, cuts[1:] + [cuts[0] + n]):
+                idx = np.arange(a, b + 1) % n
+                arcs.append((points[idx], tuple(keys[i] for i in idx)))
+            ring_arcs.append((f, p, r, arcs))
+
+        self.zooms = sorted(zooms)
+        self._snapshots = {}
+        for zoom in self.zooms:
+            world = TILE_SIZE * 2 ** zoom
+            tolerance = tolerance_px / world
+            decimals = max(0, math.ceil(math.log10(world / 360.0))) + 1
+            simplified = {}
+
+            def simplify(points, keys):
+                # Simplify each shared arc in one canonical direction so both users agree
+                forward = keys <= keys[::-1]
+                canonical = keys if forward else keys[::-1]
+                kept = simplified.get(canonical)
+                if kept is None:
+                    ordered = points if forward else points[::-1]
+                    mx, my = project(ordered[:, 1], ordered[:, 0])
+                    kept = simplified[canonical] = ordered[douglas_peucker(mx, my, tolerance)]
+                return kept if forward else kept[::-1]
+
+            geometries = [[] for _ in features]
+            for f, p, r, arcs in ring_arcs:
+                pieces = [simplify(points, keys) for points, keys in arcs]
+                ring = np.concatenate([piece[:-1] for piece in pieces])
+                ring = np.round(ring, decimals)
+                # Drop consecutive duplicates left by rounding
+                distinct = np.ones(len(ring), dtype=bool)
+                distinct[1:] = (ring[1:] != ring[:-1]).any(axis=1)
+                ring = ring[distinct]
+                if len(ring) < 3:
+                    continue
+                ring = np.vstack((ring, ring[:1]))
+                polygons = geometries[f]
+                while len(polygons) <= p:
+                    polygons.append([])
+                if r == 0 or polygons[p]:
+                    polygons[p].append(ring.tolist())
+
+            collection = {"type": "FeatureCollection", "features": []}
+            for feature, polygons in zip(features, geometries):
+                polygons = [polygon for polygon in polygons if polygon]
+                if not polygons:
+                    continue
+                collection["features"].append({
+                    "type": "Feature",
+                    "geometry": (
+                        {"type": "Polygon", "coordinates": polygons[0]} if len(polygons) == 1
+                        else {"type": "MultiPolygon", "coordinates": polygons}
+                    ),
+                    "properties": {
+                        "neighborhood": feature["neighborhood"],
+                        "geoid10": feature["geoid10"],
+                    },
+                })
+            self._snapshots[zoom] = Snapshot(
+                version, dumps(collection).encode("utf-8"),
+                mimetype="application/geo+json", last_modified=last_modified
+            )
+        return self
+
+    def for_zoom(self, zoom):
+        """Snapshot for the most detailed level at or below `zoom` (the coarsest if none)."""
+        if not self.zooms:
+            return None
+        eligible = [z for z in self.zooms if z <= zoom]
+        return self._snapshots[eligible[-1] if eligible else self.zooms[0]]
+
+    def snapshots(self):
+        return list(self._snapshots.values())
+
+
+neighborhood_boundaries = BoundarySet()
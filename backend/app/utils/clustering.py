@@ -0,0 +1,181 @@
+"""
+Hierarchical point clustering of active food resources per map zoom level.
+
+Points are projected to Web Mercator and bucketed into square cells whose
+size is a fixed number of screen pixels at each zoom. Cell sizes halve from
+one zoom to the next, so every cell at zoom z is exactly the union of four
+cells at z + 1 and the whole pyramid is built from the deepest level by
+integer shifts. Each cell stores coordinate sums, a point count and the sum
+of member ids, which makes the structure incrementally updatable: moving,
+adding or removing a resource touches one cell per zoom level, and a cell
+whose count drops to one still knows its member (the id sum).
+"""
+
+import numpy as np
+
+from app.utils.geo import TILE_SIZE, project, unproject
+from app.utils.resource_cache import ResourceIndex, register_index
+
+
+class ClusterLevel:
+    """Cells of one hierarchy at one zoom, stored as arrays sorted by cell key."""
+
+    def __init__(self, cx, cy, sum_x, sum_y, count, id_sum):
+        self.cx, self.cy = cx, cy
+        self.key = (cx << 32) | cy
+        self.sum_x, self.sum_y = sum_x, sum_y
+        self.count, self.id_sum = count, id_sum
+
+    @classmethod
+    def empty(cls):
+        empty_i = np.empty(0, dtype=np.int64)
+        empty_f = np.empty(0, dtype=np.float64)
+        return cls(empty_i, empty_i, empty_f, empty_f, empty_i, empty_i)
+
+    @classmethod
+    def from_points(cls, cx, cy, x, y, ids):
+        if len(cx) == 0:
+            return cls.empty()
+        keys, inverse = np.unique((cx << 32) | cy, return_inverse=True)
+        return cls(
+            keys >> 32, keys & 0xFFFFFFFF,
+            np.bincount(inverse, weights=x), np.bincount(inverse, weights=y),
+            np.bincount(inverse).astype(np.int64),
+            np.bincount(inverse, weights=ids).astype(np.int64),
+        )
+
+    def add(self, cx, cy, x, y, resource_id, sign):
+        """Add (sign=1) or remove (sign=-1) one point."""
+        key = (cx << 32) | cy
+        pos = int(np.searchsorted(self.key, key))
+        if pos == len(self.key) or self.key[pos] != key:
+            if sign < 0:
+                return
+            self.key = np.insert(self.key, pos, key)
+            self.cx = np.insert(self.cx, pos, cx)
+            self.cy = np.insert(self.cy, pos, cy)
+            self.sum_x = np.insert(self.sum_x, pos, 0.0)
+            self.sum_y = np.insert(self.sum_y, pos, 0.0)
+            self.count = np.insert(self.count, pos, 0)
+            self.id_sum = np.insert(self.id_sum, pos, 0)
+        # Emptied cells keep a zero count and are skipped by queries
+        self.sum_x[pos] += sign * x
+        self.sum_y[pos] += sign * y
+        self.count[pos] += sign
+        self.id_sum[pos] += sign * resource_id
+
+    def select(self, x0, y0, x1, y1):
+        """Positions of non-empty cells in the inclusive cell range."""
+        if x1 - x0 <= 64:
+            chunks = []
+            for cx in range(x0, x1 + 1):
+                lo = np.searchsorted(self.key, (cx << 32) | y0)
+                hi = np.searchsorted(self.key, (cx << 32) | y1, side="right")
+                if hi > lo:
+                    chunks.append(np.arange(lo, hi))
+            positions = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+        else:
+            positions = np.flatnonzero(
+                (self.cx >= x0) & (self.cx <= x1) & (self.cy >= y0) & (self.cy <= y1)
+            )
+        return positions[self.count[positions] > 0]
+
+
+class ClusterIndex(ResourceIndex):
+    """Cluster pyramids for all resources and for each resource_type."""
+
+    ALL = None
+
+    def __init__(self, radius_px=60, max_zoom=16):
+        super().__init__()
+        self.radius_px = radius_px
+        self.max_zoom = max_zoom
+        self._levels = {}
+        self._points = {}
+
+    def _scale(self, zoom):
+        """Number of cells across the world at a zoom."""
+        return TILE_SIZE * (2 ** zoom) / self.radius_px
+
+    def _deepest_cells(self, x, y):
+        scale = self._scale(self.max_zoom)
+        return np.floor(x * scale).astype(np.int64), np.floor(y * scale).astype(np.int64)
+
+    def rebuild(self, rows):
+        self._levels = {}
+        self._points = {}
+        if rows:
+            ids, lats, lngs, types = zip(*rows)
+        else:
+            ids, lats, lngs, types = (), (), (), ()
+        ids = np.asarray(ids, dtype=np.int64)
+        types = np.asarray(types, dtype=object)
+        x, y = project(lats, lngs)
+        cx, cy = self._deepest_cells(x, y)
+        self._points = {
+            int(i): (float(px), float(py), t) for i, px, py, t in zip(ids, x, y, types)
+        }
+
+        groups = [(self.ALL, slice(None))] + [
+            (t, types == t) for t in sorted(set(types.tolist()))
+        ]
+        for group, mask in groups:
+            gcx, gcy, gx, gy, gids = cx[mask], cy[mask], x[mask], y[mask], ids[mask]
+            levels = {}
+            for zoom in range(self.max_zoom, -1, -1):
+                shift = self.max_zoom - zoom
+                levels[zoom] = ClusterLevel.from_points(gcx >> shift, gcy >> shift, gx, gy, gids)
+            self._levels[group] = levels
+
+    def patch(self, resource):
+        old = self._points.pop(resource.id, None)
+        if old is not None:
+            self._apply(resource.id, old, -1)
+        if resource.is_active:
+            x, y = project([resource.latitude], [resource.longitude])
+            point = (float(x[0]), float(y[0]), resource.resource_type)
+            self._points[resource.id] = point
+            self._apply(resource.id, point, 1)
+
+    def _apply(self, resource_id, point, sign):
+        x, y, resource_type = point
+        cx, cy = self._deepest_cells(np.array([x]), np.array([y]))
+        cx, cy = int(cx[0]), int(cy[0])
+        if resource_type not in self._levels:
+            self._levels[resource_type] = {
+                zoom: ClusterLevel.empty() for zoom in range(self.max_zoom + 1)
+            }
+        for group in (self.ALL, resource_type):
+            for zoom, level in self._levels[group].items():
+                shift = self.max_zoom - zoom
+                level.add(cx >> shift, cy >> shift, x, y, resource_id, sign)
+
+    def clusters(self, zoom, min_lat, min_lng, max_lat, max_lng, resource_type=None):
+        """
+        Clusters overlapping a bounding box at an integer zoom <= max_zoom.
+        Returns a list of (lat, lng, count, resource_id); resource_id is set
+        only for single-point cells.
+        """
+        with self._lock:
+            level = self._levels.get(resource_type, {}).get(zoom)
+            if level is None:
+                return []
+            scale = self._scale(zoom)
+            # Mercator y grows southward, so max_lat gives the smaller y
+            x0, y1 = project([min_lat], [min_lng])
+            x1, y0 = project([max_lat], [max_lng])
+            positions = level.select(
+                int(x0[0] * scale), int(y0[0] * scale), int(x1[0] * scale), int(y1[0] * scale)
+            )
+            counts = level.count[positions]
+            lats, lngs = unproject(level.sum_x[positions] / counts, level.sum_y[positions] / counts)
+            ids = level.id_sum[positions]
+            return [
+                (lat, lng, count, resource_id if count == 1 else None)
+                for lat, lng, count, resource_id in zip(
+                    lats.tolist(), lngs.tolist(), counts.tolist(), ids.tolist()
+                )
+            ]
+
+
+resource_clusters = register_index(ClusterIndex())
@@ -0,0 +1,91 @@
+"""
+Compact columnar binary encoding of the active resource list.
+
+Layout (all integers little-endian):
+
+    4 bytes   magic b"FRC1"
+    uint32    length of the JSON header in bytes
+    ...       UTF-8 JSON header, padded with spaces to a multiple of 4
+    ...       column data, each column starting on a 4 byte boundary
+
+The header describes the payload:
+
+    {"count": n, "precision": 5,
+     "resource_types": [...], "neighborhoods": [...],
+     "columns": [{"name": "id", "dtype": "uint32", "offset": 0, "length": n}, ...]}
+
+Column offsets are relative to the start of the column data, so every
+column can be wrapped in a JS typed array without copying. Rows are in id
+order; `id`, `lat` and `lng` are delta-encoded (first value absolute, then
+differences) and coordinates are integers of 10**-precision degrees.
+`resource_type` and `neighborhood` index the dictionaries in the header
+(neighborhood -1 means none); their width grows with the dictionary, so
+read each column with the dtype its spec gives. Text fields are left to
+the detail endpoint.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"FRC1"
+COLUMNAR_MIMETYPE = "application/vnd.foodresources.columnar"
+
+
+def _delta(values):
+    return np.diff(values, prepend=0) if len(values) else values
+
+
+def _dictionary(values):
+    """(names, int codes) for a list of strings; None gets code -1."""
+    names = sorted({v for v in values if v is not None})
+    lookup = {name: code for code, name in enumerate(names)}
+    codes = np.fromiter((lookup.get(v, -1) for v in values), dtype=np.int32, count=len(values))
+    return names, codes
+
+
+def _code_dtype(count, signed):
+    """Narrowest little-endian integer dtype holding dictionary codes 0..count-1 (and -1 if signed)."""
+    for size in (1, 2, 4):
+        if count <= 2 ** (8 * size - signed):
+            return f"<{'i' if signed else 'u'}{size}"
+    raise ValueError(f"Too many dictionary entries: {count}")
+
+
+def encode_columnar(ids, lats, lngs, resource_types, neighborhoods, precision=5):
+    """Encode parallel per-resource sequences (any order) as columnar bytes."""
+    ids = np.asarray(ids, dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+    ids = ids[order]
+    scale = 10 ** precision
+    lat_q = np.round(np.asarray(lats, dtype=np.float64)[order] * scale).astype(np.int64)
+    lng_q = np.round(np.asarray(lngs, dtype=np.float64)[order] * scale).astype(np.int64)
+    type_names, type_codes = _dictionary([resource_types[i] for i in order.tolist()])
+    neighborhood_names, neighborhood_codes = _dictionary([neighborhoods[i] for i in order.tolist()])
+
+    columns = [
+        ("id", _delta(ids).astype("<u4")),
+        ("lat", _delta(lat_q).astype("<i4")),
+        ("lng", _delta(lng_q).astype("<i4")),
+        ("resource_type", type_codes.astype(_code_dtype(len(type_names), signed=False))),
+        ("neighborhood", neighborhood_codes.astype(_code_dtype(len(neighborhood_names), signed=True))),
+    ]
+
+    chunks, specs, offset = [], [], 0
+    for name, array in columns:
+        data = array.tobytes()
+        specs.append({"name": name, "dtype": array.dtype.name, "offset": offset, "length": len(array)})
+        padding = -len(data) % 4
+        chunks.append(data + b"\0" * padding)
+        offset += len(data) + padding
+
+    header = json.dumps({
+        "count": len(ids),
+        "precision": precision,
+        "resource_types": type_names,
+        "neighborhoods": neighborhood_names,
+        "columns": specs,
+    }, separators=(",", ":")).encode("utf-8")
+    header += b" " * (-len(header) % 4)
+    return MAGIC + struct.pack("<I", len(header)) + header + b"".join(chunks)
@@ -0,0 +1,91 @@
+"""
+gzip / brotli response compression with Accept-Encoding negotiation.
+
+Cached payloads (resource snapshots, tiles, neighborhood data) keep their
+compressed variants next to the plain body, so each one is compressed once
+per cache entry instead of once per request. Other responses are compressed
+on the way out by compress_response(), registered in create_app.
+"""
+
+import gzip
+import threading
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency; gzip only without it
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/geo+json", "text/plain", "text/csv"}
+
+
+def supported_encodings():
+    """Content codings the server can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(body, encoding):
+    """Compress bytes with the given content coding at the configured level."""
+    if encoding == "br":
+        return brotli.compress(body, quality=current_app.config["COMPRESS_BROTLI_QUALITY"])
+    return gzip.compress(body, compresslevel=current_app.config["COMPRESS_GZIP_LEVEL"], mtime=0)
+
+
+def negotiate_encoding(size):
+    """
+    Best content coding for the current request and a body of `size` bytes,
+    or None when the client accepts none or the body is too small to bother.
+    """
+    config = current_app.config
+    if not config["COMPRESS_ENABLED"] or size < config["COMPRESS_MIN_SIZE"]:
+        return None
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+class CompressedVariants:
+    """
+    Mixin for cached bodies: compressed(encoding) compresses self.body the
+    first time an encoding is asked for and returns the stored bytes after.
+    Each body has its own lock, so a slow cold compression only holds up
+    requests for that body.
+    """
+
+    def __init__(self):
+        self._variants = {}
+        self._variants_lock = threading.Lock()
+
+    def compressed(self, encoding):
+        variants = self._variants
+        if encoding not in variants:
+            with self._variants_lock:
+                if encoding not in self._variants:
+                    self._variants[encoding] = compress(self.body, encoding)
+        return variants[encoding]
+
+
+def compress_response(response):
+    """
+    after_request hook: compress eligible responses that were not already
+    encoded by conditional_response(). Streamed and small bodies are left
+    alone, as are responses with an ETag (conditional_response negotiated
+    those before validating).
+    """
+    response.vary.add("Accept-Encoding")
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or "ETag" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    body = response.get_data()
+    encoding = negotiate_encoding(len(body))
+    if encoding is None:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
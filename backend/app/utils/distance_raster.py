@@ -0,0 +1,353 @@
+"""
+Precomputed distance-to-nearest-resource raster for heatmap overlays.
+
+The grid covers the bounding box of data/neighborhoods.geojson in cells of
+about RASTER_CELL_METERS, one layer per resource type in RASTER_RESOURCE_TYPES.
+Each cell stores the distance in miles from its center to the nearest active
+resource of that type (inf beyond RASTER_MAX_MILES) and that resource's id,
+in two .npy files opened as memory maps so every worker shares one copy.
+The files are stamped with the data version and its timestamp; a process
+whose version matches just maps them instead of recomputing.
+
+Because distances are capped, a resource influences only the cells within
+RASTER_MAX_MILES of it. A single write therefore updates a window around
+the resource: cells it is now nearest to take the new distance, and cells
+whose nearest it was are recomputed against the other resources near them.
+"""
+
+import io
+import json
+import math
+import os
+
+import numpy as np
+
+from app.utils.analytics import nearest_distances
+from app.utils.geo import TILE_SIZE, degree_spans, haversine_miles, unproject
+from app.utils.neighborhoods import neighborhood_index
+from app.utils.png import encode_png
+from app.utils.resource_cache import ResourceIndex, SnapshotCache, get_resource_version, register_index
+
+METERS_PER_DEGREE_LAT = 111_320.0
+
+# Heatmap colors from the nearest (green) through yellow to max_miles and beyond (red)
+COLOR_STOPS = np.array([
+    [26, 152, 80],
+    [254, 224, 139],
+    [215, 48, 39],
+], dtype=np.float64)
+HEATMAP_ALPHA = 160
+
+
+class DistanceRaster(ResourceIndex):
+    """Memory-mapped (type, row, col) grid of nearest-resource distances."""
+
+    def __init__(self, cell_meters=100, resource_types=("grocery", "pantry", "farmers_market"),
+                 max_miles=3.0, directory=None):
+        super().__init__()
+        self.cell_meters = cell_meters
+        self.resource_types = tuple(resource_types)
+        self.max_miles = max_miles
+        self.directory = directory
+        self._reset()
+
+    def _reset(self):
+        self.bbox = None            # (min_lat, min_lng, max_lat, max_lng)
+        self.dlat = self.dlng = None
+        self.shape = (0, 0)
+        self.distances = None       # float32 memmap (types, rows, cols)
+        self.nearest = None         # int64 memmap (types, rows, cols), -1 for none
+        self.inside = None          # bool (rows, cols), cell center inside a neighborhood
+        self._points = {}           # resource_type -> {id: (lat, lng)}
+
+    # --- geometry ---
+    def _layout(self):
+        """Grid bounds and cell size from the neighborhood polygons, or False if none are loaded."""
+        if not neighborhood_index.loaded:
+            return False
+        min_lng, min_lat = neighborhood_index.bboxes[:, :2].min(axis=0).tolist()
+        max_lng, max_lat = neighborhood_index.bboxes[:, 2:].max(axis=0).tolist()
+        self.dlat = self.cell_meters / METERS_PER_DEGREE_LAT
+        self.dlng = self.dlat / math.cos(math.radians((min_lat + max_lat) / 2))
+        rows = max(1, math.ceil((max_lat - min_lat) / self.dlat))
+        cols = max(1, math.ceil((max_lng - min_lng) / self.dlng))
+        self.bbox = (max_lat - rows * self.dlat, min_lng, max_lat, min_lng + cols * self.dlng)
+        self.shape = (rows, cols)
+        return True
+
+    def cell_centers(self, rows, cols):
+        """(lats, lngs) of the centers of cells rows x cols (broadcast)."""
+        lats = self.bbox[2] - (np.asarray(rows) + 0.5) * self.dlat
+        lngs = self.bbox[1] + (np.asarray(cols) + 0.5) * self.dlng
+        return lats, lngs
+
+    def cells_at(self, lats, lngs):
+        """(rows, cols, valid) of the cells containing each coordinate."""
+        rows = np.floor((self.bbox[2] - np.asarray(lats)) / self.dlat).astype(np.int64)
+        cols = np.floor((np.asarray(lngs) - self.bbox[1]) / self.dlng).astype(np.int64)
+        valid = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+        return rows, cols, valid
+
+    def _window(self, lat, lng, radius):
+        """Row and column slices of the cells within `radius` miles of a point."""
+        dlat, dlng = degree_spans(lat, radius)
+        r0 = max(0, math.floor((self.bbox[2] - (lat + dlat)) / self.dlat))
+        r1 = min(self.shape[0], math.floor((self.bbox[2] - (lat - dlat)) / self.dlat) + 1)
+        c0 = max(0, math.floor((lng - dlng - self.bbox[1]) / self.dlng))
+        c1 = min(self.shape[1], math.floor((lng + dlng - self.bbox[1]) / self.dlng) + 1)
+        return slice(r0, max(r0, r1)), slice(c0, max(c0, c1))
+
+    # --- storage ---
+    def _paths(self):
+        return (
+            os.path.join(self.directory, "distance.npy"),
+            os.path.join(self.directory, "nearest.npy"),
+            os.path.join(self.directory, "meta.json"),
+        )
+
+    def _meta(self, version, stamp):
+        return {
+            "version": version,
+            "stamp": stamp,
+            "bbox": list(self.bbox),
+            "shape": list(self.shape),
+            "cell_meters": self.cell_meters,
+            "resource_types": list(self.resource_types),
+            "max_miles": self.max_miles,
+        }
+
+    def _save_meta(self, version, stamp):
+        if not self.directory:
+            return
+        path = self._paths()[2]
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._meta(version, stamp), f)
+        os.replace(tmp, path)
+
+    def _open_existing(self, version, stamp):
+        """Map the raster files if they were written for this version and layout."""
+        if not self.directory:
+            return False
+        distance_path, nearest_path, meta_path = self._paths()
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta != self._meta(version, stamp):
+            return False
+        try:
+            self.distances = np.load(distance_path, mmap_mode="r+")
+            self.nearest = np.load(nearest_path, mmap_mode="r+")
+        except (OSError, ValueError):
+            return False
+        return self.distances.shape == (len(self.resource_types),) + self.shape
+
+    def _allocate(self):
+        """Fresh arrays: memory maps in `directory` when configured, else in memory."""
+        shape = (len(self.resource_types),) + self.shape
+        if not self.directory:
+            self.distances = np.full(shape, np.inf, dtype=np.float32)
+            self.nearest = np.full(shape, -1, dtype=np.int64)
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        distance_path, nearest_path, meta_path = self._paths()
+        # Unlink first so other processes keep their mapping of the old files
+        for path in (meta_path, distance_path, nearest_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.distances = np.lib.format.open_memmap(distance_path, mode="w+", dtype=np.float32, shape=shape)
+        self.nearest = np.lib.format.open_memmap(nearest_path, mode="w+", dtype=np.int64, shape=shape)
+        self.distances[:] = np.inf
+        self.nearest[:] = -1
+
+    def _flush(self):
+        for array in (self.distances, self.nearest):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    # --- building ---
+    def ensure_current(self, version=None):
+        """Map the stored raster for the current version, or rebuild and store it."""
+        if version is None:
+            version = get_resource_version()[0]
+        if self.version != version:
+            with self._lock:
+                if self.version != version:
+                    version, updated_at = get_resource_version()
+                    stamp = updated_at.isoformat() if updated_at else None
+                    rows = self.load_rows()
+                    self._reset()
+                    # Without the neighborhoods there is no layout yet; stay
+                    # unversioned so a later read retries once they are loaded
+                    if self._layout():
+                        self._load_points(rows)
+                        if not self._open_existing(version, stamp):
+                            self._allocate()
+                            self._compute()
+                            self._flush()
+                            self._save_meta(version, stamp)
+                        self.version = version
+        return self
+
+    def rebuild(self, rows):
+        self._reset()
+        if self._layout():
+            self._load_points(rows)
+            self._allocate()
+            self._compute()
+            self._flush()
+
+    def _load_points(self, rows):
+        wanted = set(self.resource_types)
+        for resource_id, lat, lng, resource_type in rows:
+            if resource_type in wanted:
+                self._points.setdefault(resource_type, {})[resource_id] = (lat, lng)
+        lats, lngs = self.cell_centers(
+            np.arange(self.shape[0])[:, None], np.arange(self.shape[1])[None, :]
+        )
+        lats, lngs = np.broadcast_arrays(lats, lngs)
+        self.inside = (neighborhood_index.locate(lats.ravel(), lngs.ravel()) >= 0).reshape(self.shape)
+
+    def _compute(self):
+        """Fill every layer with one chunked vectorized pass over cells x resources."""
+        rows, cols = np.indices(self.shape)
+        cell_lats, cell_lngs = self.cell_centers(rows.ravel(), cols.ravel())
+        for layer, resource_type in enumerate(self.resource_types):
+            members = self._points.get(resource_type, {})
+            if not members:
+                continue
+            ids = np.fromiter(members.keys(), dtype=np.int64, count=len(members))
+            coords = np.array(list(members.values()), dtype=np.float64)
+            miles, idx = nearest_distances(cell_lats, cell_lngs, coords[:, 0], coords[:, 1])
+            far = miles > self.max_miles
+            miles[far] = np.inf
+            nearest = np.where(far | (idx < 0), -1, ids[np.maximum(idx, 0)])
+            self.distances[layer] = miles.reshape(self.shape)
+            self.nearest[layer] = nearest.reshape(self.shape)
+
+    # --- single writes ---
+    def patch(self, resource):
+        if self.bbox is None:
+            return
+        for layer, resource_type in enumerate(self.resource_types):
+            members = self._points.get(resource_type)
+            old = members.pop(resource.id, None) if members else None
+            if old is not None:
+                self._release(layer, resource.id, *old)
+        if resource.is_active and resource.resource_type in self.resource_types:
+            layer = self.resource_types.index(resource.resource_type)
+            self._points.setdefault(resource.resource_type, {})[resource.id] = (
+                resource.latitude, resource.longitude
+            )
+            self._claim(layer, resource.id, resource.latitude, resource.longitude)
+        self._flush()
+
+    def apply_change(self, resource, version):
+        super().apply_change(resource, version)
+        if self.version == version and self.bbox is not None:
+            updated_at = get_resource_version()[1]
+            self._save_meta(version, updated_at.isoformat() if updated_at else None)
+
+    def _claim(self, layer, resource_id, lat, lng):
+        """Cells within reach of a new position that are now nearest to it."""
+        rows, cols = self._window(lat, lng, self.max_miles)
+        r, c = np.ogrid[rows, cols]
+        cell_lats, cell_lngs = self.cell_centers(r, c)
+        miles = haversine_miles(cell_lats, cell_lngs, lat, lng)
+        closer = (miles <= self.max_miles) & (miles < self.distances[layer, rows, cols])
+        self.distances[layer, rows, cols] = np.where(closer, miles, self.distances[layer, rows, cols])
+        self.nearest[layer, rows, cols] = np.where(closer, resource_id, self.nearest[layer, rows, cols])
+
+    def _release(self, layer, resource_id, lat, lng):
+        """Recompute the cells a removed position was nearest to, from the resources near them."""
+        rows, cols = self._window(lat, lng, self.max_miles)
+        owned_r, owned_c = np.nonzero(self.nearest[layer, rows, cols] == resource_id)
+        if not len(owned_r):
+            return
+        owned_r += rows.start
+        owned_c += cols.start
+        cell_lats, cell_lngs = self.cell_centers(owned_r, owned_c)
+
+        members = self._points.get(self.resource_types[layer], {})
+        miles = np.full(len(owned_r), np.inf)
+        nearest = np.full(len(owned_r), -1, dtype=np.int64)
+        if members:
+            ids = np.fromiter(members.keys(), dtype=np.int64, count=len(members))
+            coords = np.array(list(members.values()), dtype=np.float64)
+            dlat, dlng = degree_spans(lat, 2 * self.max_miles)
+            near = (np.abs(coords[:, 0] - lat) <= dlat) & (np.abs(coords[:, 1] - lng) <= dlng)
+            if near.any():
+                found, idx = nearest_distances(cell_lats, cell_lngs, coords[near, 0], coords[near, 1])
+                reach = found <= self.max_miles
+                miles[reach] = found[reach]
+                nearest[reach] = ids[near][idx[reach]]
+        self.distances[layer, owned_r, owned_c] = miles
+        self.nearest[layer, owned_r, owned_c] = nearest
+
+    # --- reads ---
+    def sample(self, resource_type, lats, lngs):
+        """
+        Distances at coordinates from the layer of `resource_type`: NaN outside
+        the grid or the neighborhoods, inf beyond max_miles.
+        """
+        with self._lock:
+            lats, lngs = np.asarray(lats), np.asarray(lngs)
+            values = np.full(lats.shape, np.nan, dtype=np.float32)
+            if self.bbox is None:
+                return values
+            layer = self.resource_types.index(resource_type)
+            rows, cols, valid = self.cells_at(lats, lngs)
+            valid &= self.inside[np.where(valid, rows, 0), np.where(valid, cols, 0)]
+            values[valid] = self.distances[layer, rows[valid], cols[valid]]
+            return values
+
+    def describe(self):
+        return {
+            "bbox": list(self.bbox) if self.bbox else None,
+            "shape": list(self.shape),
+            "cell_meters": self.cell_meters,
+            "resource_types": list(self.resource_types),
+            "max_miles": self.max_miles,
+            "version": self.version,
+        }
+
+
+def tile_pixel_coordinates(z, x, y):
+    """(lats, lngs) of the centers of the TILE_SIZE x TILE_SIZE pixels of tile z/x/y."""
+    n = 2 ** z
+    offsets = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    lats, _ = unproject(0.0, (y + offsets) / n)
+    _, lngs = unproject((x + offsets) / n, 0.0)
+    return np.broadcast_arrays(lats[:, None], lngs[None, :])
+
+
+def heatmap_colors(values, max_miles):
+    """RGBA pixels for distances; NaN (no data) is transparent."""
+    t = np.clip(np.nan_to_num(values, nan=0.0, posinf=max_miles) / max_miles, 0.0, 1.0)
+    t = t * (len(COLOR_STOPS) - 1)
+    low = np.minimum(np.floor(t).astype(np.int64), len(COLOR_STOPS) - 2)
+    frac = (t - low)[..., None]
+    rgba = np.empty(values.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = np.round(COLOR_STOPS[low] * (1 - frac) + COLOR_STOPS[low + 1] * frac)
+    rgba[..., 3] = np.where(np.isnan(values), 0, HEATMAP_ALPHA)
+    return rgba
+
+
+def render_tile(raster, resource_type, z, x, y, fmt="png"):
+    """Encode tile z/x/y of one layer as a PNG heatmap or a float32 .npy array."""
+    lats, lngs = tile_pixel_coordinates(z, x, y)
+    values = raster.sample(resource_type, lats, lngs)
+    if fmt == "png":
+        return encode_png(heatmap_colors(values, raster.max_miles))
+    buffer = io.BytesIO()
+    np.save(buffer, values)
+    return buffer.getvalue()
+
+
+resource_raster = register_index(DistanceRaster())
+
+# Rendered tiles, kept apart from resource_snapshots so a burst of map
+# tiles cannot evict the cached resource lists
+raster_tiles = SnapshotCache(max_entries=1024)
@@ -0,0 +1,58 @@
+"""
+Geographic helpers shared by the spatial indexes and analytics.
+Distances are in miles to match the frontend's calculateDistance.
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_MILES / 180
+
+# Web Mercator (slippy map) constants
+TILE_SIZE = 256
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance in miles.
+    Accepts scalars or NumPy arrays (broadcast against each other).
+    """
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def degree_spans(lat, radius_miles):
+    """Half-widths (dlat, dlng) in degrees of a box enclosing a circle of radius_miles."""
+    dlat = radius_miles / MILES_PER_DEGREE_LAT
+    dlng = dlat / max(math.cos(math.radians(lat)), 0.01)
+    return dlat, min(dlng, 180.0)
+
+
+def project(lats, lngs):
+    """Project degrees to Web Mercator x, y in [0, 1] (y grows southward)."""
+    lats = np.clip(np.asarray(lats, dtype=np.float64), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    x = (lngs + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(lats))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, np.clip(y, 0.0, 1.0)
+
+
+def unproject(x, y):
+    """Inverse of project(); returns (lats, lngs) in degrees."""
+    lngs = np.asarray(x) * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * np.asarray(y)))))
+    return lats, lngs
+
+
+def tile_bounds(z, x, y):
+    """(min_lat, min_lng, max_lat, max_lng) of slippy map tile z/x/y."""
+    n = 2 ** z
+    lats, lngs = unproject(np.array([x, x + 1]) / n, np.array([y + 1, y]) / n)
+    return float(lats[0]), float(lngs[0]), float(lats[1]), float(lngs[1])
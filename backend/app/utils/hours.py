@@ -0,0 +1,236 @@
+"""
+Opening hours parsing and a compiled weekly index for "open now" filters.
+
+FoodResource.hours comes in several shapes: a weekday dict
+({"monday": "9:00-17:00", "saturday": "closed"}), free text
+("Mon-Fri 9AM-5PM; Sat 10-2"), or empty ({} / None) when a source has no
+hours. compile_hours() turns any of them into a boolean week of 5 minute
+slots starting Monday 00:00, or None when nothing could be read.
+
+HoursIndex keeps those weeks bit-packed, one row per active resource, so
+checking every resource for a moment in time reads a single byte column.
+"""
+
+import re
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.models.food_resource import FoodResource
+from app.utils.resource_cache import ResourceIndex, register_index
+
+SLOT_MINUTES = 5
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+WEEK_SLOTS = WEEK_MINUTES // SLOT_MINUTES
+ALL_DAYS = tuple(range(7))
+
+_DAY = r"(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?"
+_TIME = r"(?:\d{1,2}(?:[:.]\d{2})?\s*(?:[ap]\.?m\.?|[ap]\b)?|noon|midnight)"
+_TO = r"\s*(?:-|–|—|to|through|thru)\s*"
+_TOKEN_RE = re.compile(
+    rf"(?P<day_range>{_DAY}{_TO}{_DAY})"
+    rf"|(?P<day>{_DAY})"
+    r"|(?P<daily>daily|every\s*day|7\s*days)"
+    r"|(?P<weekdays>weekdays)"
+    r"|(?P<weekends>weekends)"
+    r"|(?P<always>24\s*(?:/\s*7|hours|hrs|h\b))"
+    rf"|(?P<time_range>(?P<start>{_TIME}){_TO}(?P<end>{_TIME}))"
+)
+_CLOCK_RE = re.compile(r"(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?")
+
+
+def _day_index(name):
+    return ("mon", "tue", "wed", "thu", "fri", "sat", "sun").index(name.strip(" .")[:3])
+
+
+def _clock(text):
+    """(minutes after midnight, 'a'/'p'/None) for a time token."""
+    if text == "noon":
+        return 12 * 60, "p"
+    if text == "midnight":
+        return 0, "a"
+    hour, minute, suffix = _CLOCK_RE.match(text).groups()
+    hour, minute = int(hour), int(minute or 0)
+    if suffix == "p" and hour < 12:
+        hour += 12
+    elif suffix == "a" and hour == 12:
+        hour = 0
+    return hour * 60 + minute, suffix
+
+
+def parse_time_range(start_text, end_text):
+    """
+    (start, end) minutes after midnight for one range; end may exceed a day
+    for ranges past midnight. Missing am/pm is inferred the way people write
+    it: "10-2" is 10:00-14:00 and "1-5pm" is 13:00-17:00.
+    """
+    start, start_suffix = _clock(start_text.strip().lower())
+    end, end_suffix = _clock(end_text.strip().lower())
+    if start_suffix is None and end_suffix == "p" and start + 12 * 60 <= end:
+        start += 12 * 60
+    if end_suffix is None and end <= start < 12 * 60 and end + 12 * 60 > start:
+        end += 12 * 60
+    if end <= start:
+        end += DAY_MINUTES
+    return start, end
+
+
+def parse_hours_text(text, default_days=ALL_DAYS):
+    """
+    Weekly (start, end) minute intervals from free text. A time range applies
+    to the days named just before it, or to `default_days` if none were.
+    """
+    intervals = []
+    days, days_used = list(default_days), True
+    for match in _TOKEN_RE.finditer(text.lower()):
+        kind = match.lastgroup if match.lastgroup not in ("start", "end") else "time_range"
+        new_days = None
+        if kind == "day_range":
+            first, last = re.split(_TO, match.group(kind), maxsplit=1)
+            a, b = _day_index(first), _day_index(last)
+            new_days = [(a + i) % 7 for i in range((b - a) % 7 + 1)]
+        elif kind == "day":
+            new_days = [_day_index(match.group(kind))]
+        elif kind == "daily":
+            new_days = list(ALL_DAYS)
+        elif kind == "weekdays":
+            new_days = [0, 1, 2, 3, 4]
+        elif kind == "weekends":
+            new_days = [5, 6]
+        elif kind == "always":
+            intervals.extend((d * DAY_MINUTES, (d + 1) * DAY_MINUTES) for d in days)
+            days_used = True
+        else:
+            start, end = parse_time_range(match.group("start"), match.group("end"))
+            intervals.extend((d * DAY_MINUTES + start, d * DAY_MINUTES + end) for d in days)
+            days_used = True
+        if new_days is not None:
+            # "Mon, Wed 9-5" lists days before one range; a day after a range starts a new group
+            days = new_days if days_used else days + new_days
+            days_used = False
+    return intervals
+
+
+def parse_hours(hours):
+    """
+    Weekly (start, end) minute intervals, Monday 00:00 = 0, for any stored
+    hours value. Returns None if the value carries no usable schedule.
+    """
+    if not hours:
+        return None
+    if isinstance(hours, dict):
+        intervals, understood = [], False
+        for day, value in hours.items():
+            try:
+                day_index = _day_index(str(day).lower())
+            except ValueError:
+                continue
+            value = str(value or "").strip().lower()
+            if value in ("closed", "none", "-"):
+                understood = True
+                continue
+            found = parse_hours_text(value, default_days=(day_index,))
+            understood = understood or bool(found)
+            intervals.extend(found)
+        return intervals if understood else None
+    intervals = parse_hours_text(str(hours))
+    if not intervals:
+        return None if "closed" not in str(hours).lower() else []
+    return intervals
+
+
+def compile_hours(hours):
+    """
+    Boolean array of WEEK_SLOTS 5 minute slots, True where the resource is
+    open for the whole slot. None when the hours could not be read.
+    """
+    intervals = parse_hours(hours)
+    if intervals is None:
+        return None
+    week = np.zeros(WEEK_SLOTS, dtype=bool)
+    for start, end in intervals:
+        first = -(-start // SLOT_MINUTES)
+        last = end // SLOT_MINUTES
+        if last - first >= WEEK_SLOTS:
+            week[:] = True
+            continue
+        # Ranges past Sunday midnight wrap to Monday morning
+        positions = np.arange(first, last) % WEEK_SLOTS
+        week[positions] = True
+    return week
+
+
+def week_slot(moment, timezone):
+    """Slot index of a datetime in the given timezone; naive datetimes are taken as local."""
+    zone = ZoneInfo(timezone)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=zone)
+    local = moment.astimezone(zone)
+    minute = local.weekday() * DAY_MINUTES + local.hour * 60 + local.minute
+    return minute // SLOT_MINUTES
+
+
+def current_week_slot(timezone):
+    return week_slot(datetime.now(ZoneInfo(timezone)), timezone)
+
+
+class HoursIndex(ResourceIndex):
+    """Bit-packed weekly schedules of active resources."""
+
+    columns = (FoodResource.id, FoodResource.hours)
+
+    ROW_BYTES = WEEK_SLOTS // 8
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.bits = np.zeros((0, self.ROW_BYTES), dtype=np.uint8)
+        self.known = np.empty(0, dtype=bool)
+        self._slot_by_id = {}
+
+    def rebuild(self, rows):
+        self._reset()
+        if not rows:
+            return
+        weeks = [compile_hours(hours) for _, hours in rows]
+        self.ids = np.fromiter((resource_id for resource_id, _ in rows), dtype=np.int64, count=len(rows))
+        self.known = np.array([week is not None for week in weeks], dtype=bool)
+        empty = np.zeros(WEEK_SLOTS, dtype=bool)
+        self.bits = np.packbits(
+            np.stack([week if week is not None else empty for week in weeks]), axis=1
+        )
+        self._slot_by_id = {int(i): slot for slot, i in enumerate(self.ids)}
+
+    def patch(self, resource):
+        slot = self._slot_by_id.get(resource.id)
+        if not resource.is_active:
+            if slot is not None:
+                # Leave the row in place but make it match nothing
+                self.known[slot] = False
+                self.bits[slot] = 0
+            return
+        week = compile_hours(resource.hours)
+        row = np.packbits(week) if week is not None else np.zeros(self.ROW_BYTES, dtype=np.uint8)
+        if slot is None:
+            self._slot_by_id[resource.id] = len(self.ids)
+            self.ids = np.append(self.ids, resource.id)
+            self.bits = np.vstack((self.bits, row))
+            self.known = np.append(self.known, week is not None)
+        else:
+            self.bits[slot] = row
+            self.known[slot] = week is not None
+
+    def open_ids(self, slot):
+        """Ids of resources open during a week slot (unknown hours never count as open)."""
+        with self._lock:
+            byte, bit = divmod(slot, 8)
+            is_open = (self.bits[:, byte] >> (7 - bit)) & 1
+            return self.ids[is_open.astype(bool) & self.known]
+
+
+resource_hours = register_index(HoursIndex())
@@ -0,0 +1,57 @@
+"""
+HTTP caching helpers for public read endpoints.
+Adds strong ETags, Last-Modified and Cache-Control headers and answers
+If-None-Match / If-Modified-Since with 304 Not Modified.
+"""
+
+import hashlib
+
+from flask import current_app, request
+
+from app.utils.compression import COMPRESSIBLE_MIMETYPES, compress, negotiate_encoding
+
+
+def content_etag(body):
+    """Strong ETag value derived from the encoded response body."""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def apply_public_cache_control(response):
+    """
+    Mark a response as cacheable by browsers and shared proxies.
+    max-age and stale-while-revalidate come from the app config.
+    """
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config["PUBLIC_CACHE_MAX_AGE"]
+    stale = current_app.config["PUBLIC_CACHE_STALE_WHILE_REVALIDATE"]
+    if stale:
+        response.cache_control.stale_while_revalidate = stale
+    return response
+
+
+def conditional_response(body, etag, last_modified=None, mimetype="application/json", compressed=None):
+    """
+    Build a public, cacheable response for an encoded body.
+    Returns 304 with no body when the client's validators still match.
+    
+    Byte bodies of a COMPRESSIBLE_MIMETYPES type are compressed when the
+    client accepts it (the same rule as compress_response); `compressed`
+    (encoding -> bytes) supplies an already compressed variant so cached
+    payloads are not compressed again on every request. Each coding gets
+    its own ETag, as required for strong validators.
+    """
+    encoding = None
+    if isinstance(body, bytes) and mimetype in COMPRESSIBLE_MIMETYPES:
+        encoding = negotiate_encoding(len(body))
+    if encoding is not None:
+        body = compressed(encoding) if compressed is not None else compress(body, encoding)
+        etag = f"{etag}-{encoding}"
+    response = current_app.response_class(body, mimetype=mimetype)
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    apply_public_cache_control(response)
+    return response.make_conditional(request)
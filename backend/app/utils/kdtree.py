@@ -0,0 +1,203 @@
+"""
+KD-tree k-nearest-neighbor index over active food resources, one tree per
+resource_type.
+
+Points are stored as unit vectors on the sphere, so straight-line (chord)
+distance orders neighbors exactly like great-circle distance and the tree
+needs no special handling near the poles or the antimeridian.
+"""
+
+import heapq
+
+import numpy as np
+
+from app.utils.geo import EARTH_RADIUS_MILES
+from app.utils.resource_cache import ResourceIndex, register_index
+
+
+def to_unit_vectors(lats, lngs):
+    """Convert degree coordinates to an (n, 3) array of unit vectors."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lng = np.radians(np.asarray(lngs, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def chord_to_miles(chord):
+    """Great-circle distance in miles for a chord length on the unit sphere."""
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+class KDTree:
+    """
+    Static KD-tree over an (n, d) point array.
+    Nodes are kept in flat lists and points are reordered so every leaf is
+    a contiguous slice that can be scanned with one vectorized operation.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        order = np.arange(len(points))
+
+        # Node arrays; split_dim == -1 marks a leaf covering [start, end)
+        self.split_dim = []
+        self.left = []
+        self.right = []
+        self.start = []
+        self.end = []
+
+        if len(points):
+            stack = [(self._new_node(0, len(points)), 0, len(points))]
+            while stack:
+                node, lo, hi = stack.pop()
+                if hi - lo <= leaf_size:
+                    continue
+                block = points[order[lo:hi]]
+                dim = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+                mid = (lo + hi) // 2
+                part = np.argpartition(block[:, dim], mid - lo)
+                order[lo:hi] = order[lo:hi][part]
+                self.split_dim[node] = dim
+                self.left[node] = self._new_node(lo, mid)
+                self.right[node] = self._new_node(mid, hi)
+                stack.append((self.left[node], lo, mid))
+                stack.append((self.right[node], mid, hi))
+
+        self.order = order
+        self.points = points[order]
+
+        self._compute_boxes()
+
+    def _compute_boxes(self):
+        """Bounding box per node, used as exact lower bounds while searching."""
+        n_nodes, dims = len(self.split_dim), self.points.shape[1]
+        self.box_min = np.empty((n_nodes, dims))
+        self.box_max = np.empty((n_nodes, dims))
+        if not n_nodes:
+            return
+        leaves = np.flatnonzero(np.asarray(self.split_dim) == -1)
+        leaf_starts = np.asarray(self.start)[leaves]
+        by_start = np.argsort(leaf_starts)
+        self.box_min[leaves[by_start]] = np.minimum.reduceat(self.points, leaf_starts[by_start])
+        self.box_max[leaves[by_start]] = np.maximum.reduceat(self.points, leaf_starts[by_start])
+        # Children are always created after their parent, so walk backwards
+        for node in range(n_nodes - 1, -1, -1):
+            if self.split_dim[node] != -1:
+                left, right = self.left[node], self.right[node]
+                self.box_min[node] = np.minimum(self.box_min[left], self.box_min[right])
+                self.box_max[node] = np.maximum(self.box_max[left], self.box_max[right])
+
+    def _new_node(self, lo, hi):
+        self.split_dim.append(-1)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.start.append(lo)
+        self.end.append(hi)
+        return len(self.split_dim) - 1
+
+    def __len__(self):
+        return len(self.points)
+
+    def query(self, point, k):
+        """
+        Return (indices, distances) of the k points nearest to `point`,
+        nearest first. Indices refer to the array passed to the constructor.
+        """
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        point = np.asarray(point, dtype=np.float64)
+        best_idx = np.empty(0, dtype=np.int64)
+        best_d2 = np.empty(0)
+        worst = np.inf
+
+        # Min-heap of (lower bound on squared distance, node)
+        heap = [(0.0, 0)]
+        while heap:
+            bound, node = heapq.heappop(heap)
+            if bound > worst:
+                break
+            dim = self.split_dim[node]
+            if dim == -1:
+                lo, hi = self.start[node], self.end[node]
+                d2 = ((self.points[lo:hi] - point) ** 2).sum(axis=1)
+                best_idx = np.concatenate((best_idx, np.arange(lo, hi)))
+                best_d2 = np.concatenate((best_d2, d2))
+                if len(best_d2) > k:
+                    keep = np.argpartition(best_d2, k - 1)[:k]
+                    best_idx, best_d2 = best_idx[keep], best_d2[keep]
+                if len(best_d2) == k:
+                    worst = best_d2.max()
+                continue
+            children = [self.left[node], self.right[node]]
+            gaps = np.maximum(self.box_min[children] - point, 0) + np.maximum(point - self.box_max[children], 0)
+            for child, child_bound in zip(children, (gaps ** 2).sum(axis=1).tolist()):
+                if child_bound <= worst:
+                    heapq.heappush(heap, (child_bound, child))
+
+        ranked = np.argsort(best_d2, kind="stable")
+        return self.order[best_idx[ranked]], np.sqrt(best_d2[ranked])
+
+
+class NearestIndex(ResourceIndex):
+    """Per-resource_type KD-trees for stratified k-nearest queries."""
+
+    def __init__(self, leaf_size=16):
+        super().__init__()
+        self.leaf_size = leaf_size
+        self._points = {}
+        self._trees = {}
+
+    def rebuild(self, rows):
+        grouped = {}
+        for resource_id, lat, lng, resource_type in rows:
+            grouped.setdefault(resource_type, {})[resource_id] = (lat, lng)
+        self._points = grouped
+        self._trees = {}
+        for resource_type in grouped:
+            self._build_type(resource_type)
+
+    def _build_type(self, resource_type):
+        members = self._points.get(resource_type)
+        if not members:
+            self._points.pop(resource_type, None)
+            self._trees.pop(resource_type, None)
+            return
+        ids = np.fromiter(members.keys(), dtype=np.int64, count=len(members))
+        coords = np.array(list(members.values()), dtype=np.float64)
+        tree = KDTree(to_unit_vectors(coords[:, 0], coords[:, 1]), self.leaf_size)
+        self._trees[resource_type] = (ids, tree)
+
+    def patch(self, resource):
+        # Only the trees of the type(s) the resource left or joined are rebuilt
+        touched = set()
+        for resource_type, members in self._points.items():
+            if members.pop(resource.id, None) is not None:
+                touched.add(resource_type)
+        if resource.is_active:
+            self._points.setdefault(resource.resource_type, {})[resource.id] = (
+                resource.latitude, resource.longitude
+            )
+            touched.add(resource.resource_type)
+        for resource_type in touched:
+            self._build_type(resource_type)
+
+    @property
+    def resource_types(self):
+        return sorted(self._trees)
+
+    def nearest(self, lat, lng, k, resource_type):
+        """Return (ids, distances_in_miles) of the k nearest resources of one type."""
+        with self._lock:
+            entry = self._trees.get(resource_type)
+            if entry is None:
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            ids, tree = entry
+            query = to_unit_vectors([lat], [lng])[0]
+            idx, chord = tree.query(query, k)
+            return ids[idx], chord_to_miles(chord)
+
+
+resource_nearest = register_index(NearestIndex())
@@ -0,0 +1,191 @@
+"""
+Point-in-polygon neighborhood assignment over data/neighborhoods.geojson.
+
+Polygons are loaded once into flat NumPy edge arrays with a bounding box per
+feature. locate() assigns a whole batch of coordinates at once: points are
+sorted by longitude so each feature only sees the points inside its bounding
+box, and those are ray cast against all of the feature's edges in one
+vectorized (points x edges) pass. Holes and multipolygons need no special
+casing because every ring's edges count toward the same even-odd total.
+
+Single point lookups go through a uniform grid built at load time. Each cell
+keeps only the edges a ray cast from inside it can cross (edges of the
+polygons overlapping the cell, within its latitude band and not entirely
+to its west), so a lookup tests a few dozen edges instead of every polygon.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+# Upper bound on points x edges evaluated in one NumPy operation
+RAY_CAST_CHUNK = 1_000_000
+
+
+class NeighborhoodIndex:
+    """Neighborhood polygons with per-feature bounding boxes and edge arrays."""
+
+    def __init__(self, cell_size=0.005):
+        self.cell_size = cell_size
+        self.path = None
+        self.features = []
+        self.bboxes = np.empty((0, 4))
+        self._edges = []
+        self._cells = {}
+
+    @property
+    def loaded(self):
+        return bool(self.features)
+
+    def load(self, path):
+        """Read a GeoJSON FeatureCollection of (Multi)Polygons. Returns self."""
+        with open(path, "r", encoding="utf-8") as f:
+            collection = json.load(f)
+
+        features, edges, bboxes = [], [], []
+        for feature in collection.get("features", []):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+            rings = [np.asarray(ring, dtype=np.float64)[:, :2] for polygon in polygons for ring in polygon]
+            starts = np.concatenate(rings)
+            ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+            properties = feature.get("properties") or {}
+            features.append({
+                "neighborhood": properties.get("hood"),
+                "geoid10": properties.get("geoid10"),
+                "properties": properties,
+                "rings": polygons,
+            })
+            edges.append((starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]))
+            bboxes.append((starts[:, 0].min(), starts[:, 1].min(), starts[:, 0].max(), starts[:, 1].max()))
+
+        self.path = path
+        self.features = features
+        self._edges = edges
+        self.bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        self._build_grid()
+        return self
+
+    def _cell(self, lat, lng):
+        return (int(np.floor(lng / self.cell_size)), int(np.floor(lat / self.cell_size)))
+
+    def _build_grid(self):
+        """Per cell: (feature ids, edge labels, x1, y1, y2, slope) for the edges that matter there."""
+        per_cell = {}
+        size = self.cell_size
+        for feature, (min_x, min_y, max_x, max_y) in enumerate(self.bboxes.tolist()):
+            x1, y1, x2, y2 = self._edges[feature]
+            low_y, high_y = np.minimum(y1, y2), np.maximum(y1, y2)
+            east_x = np.maximum(x1, x2)
+            cx0, cy0 = self._cell(min_y, min_x)
+            cx1, cy1 = self._cell(max_y, max_x)
+            for cy in range(cy0, cy1 + 1):
+                in_band = np.flatnonzero((high_y >= cy * size) & (low_y <= (cy + 1) * size))
+                for cx in range(cx0, cx1 + 1):
+                    edges = in_band[east_x[in_band] >= cx * size]
+                    per_cell.setdefault((cx, cy), []).append((feature, edges))
+
+        self._cells = {}
+        for key, entries in per_cell.items():
+            features = np.array([feature for feature, _ in entries], dtype=np.int64)
+            labels = np.concatenate([
+                np.full(len(edges), position, dtype=np.int64)
+                for position, (_, edges) in enumerate(entries)
+            ])
+            parts = [
+                [column[edges] for column in self._edges[feature]]
+                for feature, edges in entries
+            ]
+            x1, y1, x2, y2 = (np.concatenate([part[i] for part in parts]) for i in range(4))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                slope = (x2 - x1) / (y2 - y1)
+            self._cells[key] = (features, labels, x1, y1, y2, slope)
+
+    def lookup(self, lat, lng):
+        """The feature dict of the polygon containing one point, or None."""
+        entry = self._cells.get(self._cell(lat, lng))
+        if entry is None:
+            return None
+        features, labels, x1, y1, y2, slope = entry
+        crossings = ((y1 > lat) != (y2 > lat)) & (lng < x1 + (lat - y1) * slope)
+        odd = np.flatnonzero(np.bincount(labels[crossings], minlength=len(features)) % 2)
+        return self.features[features[odd[0]]] if len(odd) else None
+
+    def _contains(self, feature, xs, ys):
+        """Even-odd ray casting of points against every edge of one feature."""
+        x1, y1, x2, y2 = self._edges[feature]
+        inside = np.zeros(len(xs), dtype=bool)
+        step = max(1, RAY_CAST_CHUNK // len(x1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (x2 - x1) / (y2 - y1)
+        for start in range(0, len(xs), step):
+            px = xs[start:start + step, None]
+            py = ys[start:start + step, None]
+            straddles = (y1 > py) != (y2 > py)
+            crossings = straddles & (px < x1 + (py - y1) * slope)
+            inside[start:start + step] = np.count_nonzero(crossings, axis=1) % 2 == 1
+        return inside
+
+    def locate(self, lats, lngs):
+        """
+        Index into self.features of the polygon containing each point, or -1.
+        NaN coordinates are never inside anything.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        result = np.full(len(lats), -1, dtype=np.int64)
+        valid = np.flatnonzero(~(np.isnan(lats) | np.isnan(lngs)))
+        if not len(valid) or not self.features:
+            return result
+
+        order = valid[np.argsort(lngs[valid], kind="stable")]
+        sorted_lngs = lngs[order]
+        for feature, (min_x, min_y, max_x, max_y) in enumerate(self.bboxes.tolist()):
+            lo = np.searchsorted(sorted_lngs, min_x, side="left")
+            hi = np.searchsorted(sorted_lngs, max_x, side="right")
+            if lo == hi:
+                continue
+            candidates = order[lo:hi]
+            candidates = candidates[
+                (result[candidates] == -1)
+                & (lats[candidates] >= min_y) & (lats[candidates] <= max_y)
+            ]
+            if not len(candidates):
+                continue
+            inside = self._contains(feature, lngs[candidates], lats[candidates])
+            result[candidates[inside]] = feature
+        return result
+
+    def names_for(self, lats, lngs):
+        """Neighborhood name (or None) for each point."""
+        return [
+            self.features[i]["neighborhood"] if i >= 0 else None
+            for i in self.locate(lats, lngs).tolist()
+        ]
+
+
+def fill_neighborhoods(df, lat_col, lng_col, column="neighborhood", index=None):
+    """
+    Set `column` on a DataFrame from its coordinates wherever it is missing
+    (the column is created if absent). Returns the DataFrame.
+    """
+    index = index or neighborhood_index
+    if column not in df.columns:
+        df[column] = None
+    missing = df[column].isna() | (df[column].astype(str).str.strip() == "")
+    if missing.any() and index.loaded:
+        lats = pd.to_numeric(df.loc[missing, lat_col], errors="coerce").to_numpy(dtype=np.float64)
+        lngs = pd.to_numeric(df.loc[missing, lng_col], errors="coerce").to_numpy(dtype=np.float64)
+        df[column] = df[column].astype(object)
+        df.loc[missing, column] = index.names_for(lats, lngs)
+    df[column] = df[column].astype(object).where(df[column].notna(), None)
+    return df
+
+
+neighborhood_index = NeighborhoodIndex()
@@ -0,0 +1,237 @@
+"""
+Versioned snapshot cache for public food resource payloads.
+
+Every write to food_resources (admin routes, intake scripts, seed) bumps a
+version counter stored in the data_versions table. Read endpoints keep the
+already-encoded response body per filter combination and only rebuild it
+when the stored version no longer matches the one the snapshot was built at.
+The counter lives in the database so separate worker processes and the
+command line intake scripts all invalidate each other's caches.
+
+In-memory indexes over active resources (see ResourceIndex) use the same
+version: they rebuild when it moves and can patch themselves in place when
+the write happened in this process.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+
+from app.database.db import db
+from app.models.data_version import DataVersion
+from app.models.food_resource import FoodResource
+from app.models.resource_change import ResourceChange
+from app.utils.compression import CompressedVariants
+from app.utils.http_cache import content_etag
+
+RESOURCE_DATASET = "food_resources"
+
+# How many versions of the change log are kept for selective invalidation
+CHANGE_LOG_VERSIONS = 1000
+
+
+def bump_resource_version(changes=None):
+    """
+    Increment the food resource data version.
+    Call before db.session.commit() so the bump is part of the same
+    transaction as the write it describes. Returns the new version.
+    
+    `changes` is an optional list of (resource_id, latitude, longitude)
+    locations the write touched (old and new position for a move). They are
+    recorded in the change log so location-keyed caches can invalidate
+    selectively; without them the bump counts as a change everywhere.
+    """
+    now = datetime.utcnow()
+    updated = DataVersion.query.filter_by(name=RESOURCE_DATASET).update(
+        {DataVersion.version: DataVersion.version + 1, DataVersion.updated_at: now},
+        synchronize_session=False
+    )
+    if not updated:
+        db.session.add(DataVersion(name=RESOURCE_DATASET, version=1, updated_at=now))
+        db.session.flush()
+    version = get_resource_version()[0]
+    
+    for resource_id, latitude, longitude in (changes or [(None, None, None)]):
+        db.session.add(ResourceChange(
+            version=version, resource_id=resource_id,
+            latitude=latitude, longitude=longitude, created_at=now
+        ))
+    ResourceChange.query.filter(
+        ResourceChange.version <= version - CHANGE_LOG_VERSIONS
+    ).delete(synchronize_session=False)
+    return version
+
+
+def changed_since(version, current, min_lat, min_lng, max_lat, max_lng):
+    """
+    True if any write after `version` up to `current` touched the box.
+    Answers True when the change log no longer reaches back that far.
+    """
+    if version >= current:
+        return False
+    if current - version >= CHANGE_LOG_VERSIONS:
+        return True
+    hit = db.session.query(ResourceChange.id).filter(
+        ResourceChange.version > version,
+        ResourceChange.version <= current,
+        db.or_(
+            ResourceChange.latitude.is_(None),
+            db.and_(
+                ResourceChange.latitude.between(min_lat, max_lat),
+                ResourceChange.longitude.between(min_lng, max_lng)
+            )
+        )
+    ).first()
+    return hit is not None
+
+
+def get_resource_version():
+    """
+    Return (version, updated_at) for the food resource dataset.
+    Reads straight from the database so changes made by other processes are seen.
+    """
+    row = db.session.query(DataVersion.version, DataVersion.updated_at).filter(
+        DataVersion.name == RESOURCE_DATASET
+    ).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
+
+
+class Snapshot(CompressedVariants):
+    """An encoded response body built at a given data version."""
+
+    def __init__(self, version, body, mimetype="application/json", last_modified=None):
+        super().__init__()
+        self.version = version
+        self.body = body
+        self.mimetype = mimetype
+        self.last_modified = last_modified
+        self.etag = content_etag(body)
+
+
+class SnapshotCache:
+    """
+    Thread-safe LRU of Snapshots keyed by request parameters.
+    All entries are dropped as soon as a lookup sees a newer version.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, version, key):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+                return None
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+            return snapshot
+
+    def put(self, snapshot, key):
+        with self._lock:
+            if snapshot.version != self._version:
+                # Built against a version that is already stale (or newer than
+                # what we have seen); only keep it if it is the newest.
+                if self._version is not None and snapshot.version < self._version:
+                    return snapshot
+                self._entries.clear()
+                self._version = snapshot.version
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+resource_snapshots = SnapshotCache()
+
+
+class ResourceIndex:
+    """
+    Base class for in-memory structures derived from active food resources.
+    
+    Subclasses implement rebuild(rows), where rows are tuples of the
+    columns listed in `columns`, and may implement patch(resource) to
+    apply a single created/updated/deactivated resource in place.
+    """
+
+    columns = (
+        FoodResource.id,
+        FoodResource.latitude,
+        FoodResource.longitude,
+        FoodResource.resource_type,
+    )
+
+    def __init__(self):
+        self.version = None
+        self._lock = threading.RLock()
+
+    def rebuild(self, rows):
+        raise NotImplementedError
+
+    def patch(self, resource):
+        raise NotImplementedError
+
+    def load_rows(self):
+        """Fetch index columns for all active resources without hydrating ORM objects."""
+        return db.session.query(*self.columns).filter(FoodResource.is_active.is_(True)).all()
+
+    def ensure_current(self, version=None):
+        """Rebuild from the database if the stored data version has moved."""
+        if version is None:
+            version = get_resource_version()[0]
+        if self.version != version:
+            with self._lock:
+                if self.version != version:
+                    self.rebuild(self.load_rows())
+                    self.version = version
+        return self
+
+    def apply_change(self, resource, version):
+        """
+        Patch in a resource written by this process at `version`.
+        Only possible when the index is exactly one version behind; otherwise
+        another writer got in between and the next read rebuilds instead.
+        The write is already committed, so a failed patch only drops the index
+        back to unversioned to be rebuilt on the next read.
+        """
+        with self._lock:
+            if self.version is None or self.version != version - 1:
+                return
+            try:
+                self.patch(resource)
+            except NotImplementedError:
+                return
+            except Exception:
+                current_app.logger.exception("Patching %s failed; rebuilding on next read", type(self).__name__)
+                self.version = None
+                return
+            self.version = version
+
+
+resource_indexes = []
+
+
+def register_index(index):
+    """Register a ResourceIndex so notify_resource_changed() reaches it."""
+    resource_indexes.append(index)
+    return index
+
+
+def notify_resource_changed(resource, version):
+    """Let every registered index patch in a resource committed at `version`."""
+    for index in resource_indexes:
+        index.apply_change(resource, version)
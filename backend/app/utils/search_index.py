@@ -0,0 +1,239 @@
+"""
+In-process inverted index for full-text search over active food resources.
+
+Each resource is tokenized over name, address, neighborhood and description
+with per-field weights, and scored with BM25 on the weighted term counts.
+Posting lists are kept as dicts so single writes can be patched in (a
+removed resource's slot is reused by the next one added), with a NumPy copy
+per term built on first use, so a query costs a few array
+operations per query term regardless of catalog size. The last query term
+also matches as a prefix, for search-as-you-type.
+"""
+
+import bisect
+import re
+from collections import Counter
+
+import numpy as np
+
+from app.models.food_resource import FoodResource
+from app.utils.resource_cache import ResourceIndex, register_index
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Weight of a term occurrence per field
+FIELD_WEIGHTS = (
+    ("name", 3.0),
+    ("neighborhood", 2.0),
+    ("address", 1.5),
+    ("description", 1.0),
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """Lowercased word tokens of a string (empty for None)."""
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex(ResourceIndex):
+    """Weighted BM25 inverted index keyed by term."""
+
+    columns = (
+        FoodResource.id,
+        FoodResource.resource_type,
+        FoodResource.name,
+        FoodResource.address,
+        FoodResource.neighborhood,
+        FoodResource.description,
+    )
+
+    def __init__(self, max_prefix_terms=50):
+        super().__init__()
+        self.max_prefix_terms = max_prefix_terms
+        self._reset()
+
+    def _reset(self):
+        self._postings = {}      # term -> {slot: weighted term frequency}
+        self._arrays = {}        # term -> (slots, tfs), built lazily
+        self._scores = {}        # term -> (sorted slots, BM25 scores); depends on corpus stats
+        self._terms = []         # sorted vocabulary, rebuilt lazily for prefix lookups
+        self._terms_dirty = False
+        self._doc_terms = {}     # slot -> {term: weighted tf}, for removal
+        self._slot_by_id = {}
+        self._free_slots = []    # slots of removed resources, reused by _add
+        self.ids = []
+        self.types = []
+        self.doc_lengths = []
+        self._total_length = 0.0
+        self._lengths_array = None
+
+    def __len__(self):
+        return len(self._slot_by_id)
+
+    # --- building ---
+    def rebuild(self, rows):
+        self._reset()
+        for resource_id, resource_type, name, address, neighborhood, description in rows:
+            self._add(resource_id, resource_type, {
+                "name": name, "address": address,
+                "neighborhood": neighborhood, "description": description,
+            })
+
+    def patch(self, resource):
+        self._remove(resource.id)
+        if resource.is_active:
+            self._add(resource.id, resource.resource_type, {
+                "name": resource.name, "address": resource.address,
+                "neighborhood": resource.neighborhood, "description": resource.description,
+            })
+
+    def _add(self, resource_id, resource_type, fields):
+        weights = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(fields[field]):
+                weights[token] += weight
+        length = sum(weights.values())
+        if self._free_slots:
+            # Reuse a removed resource's slot so patching does not grow the arrays
+            slot = self._free_slots.pop()
+            self.ids[slot] = resource_id
+            self.types[slot] = resource_type
+            self.doc_lengths[slot] = length
+        else:
+            slot = len(self.ids)
+            self.ids.append(resource_id)
+            self.types.append(resource_type)
+            self.doc_lengths.append(length)
+        self._total_length += length
+        self._lengths_array = None
+        self._scores.clear()
+        self._slot_by_id[resource_id] = slot
+        self._doc_terms[slot] = weights
+        for term, tf in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._terms_dirty = True
+            postings[slot] = tf
+            self._arrays.pop(term, None)
+
+    def _remove(self, resource_id):
+        slot = self._slot_by_id.pop(resource_id, None)
+        if slot is None:
+            return
+        self._total_length -= self.doc_lengths[slot]
+        self._free_slots.append(slot)
+        self._scores.clear()
+        for term in self._doc_terms.pop(slot):
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+            self._arrays.pop(term, None)
+
+    # --- queries ---
+    def _term_arrays(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def _expand(self, token, prefix):
+        """Index terms a query token matches: itself, plus completions if `prefix`."""
+        if not prefix:
+            return [token] if token in self._postings else []
+        if self._terms_dirty:
+            self._terms = sorted(self._postings)
+            self._terms_dirty = False
+        start = bisect.bisect_left(self._terms, token)
+        matches = []
+        for term in self._terms[start:start + self.max_prefix_terms]:
+            if not term.startswith(token):
+                break
+            matches.append(term)
+        return matches
+
+    def _term_scores(self, term, lengths, avg_length, n_docs):
+        """(slots ascending, BM25 scores) for one index term, cached until the corpus changes."""
+        cached = self._scores.get(term)
+        if cached is None:
+            slots, tfs = self._term_arrays(term)
+            order = np.argsort(slots, kind="stable")
+            slots, tfs = slots[order], tfs[order]
+            idf = np.log(1 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = K1 * (1 - B + B * lengths[slots] / avg_length)
+            cached = self._scores[term] = (slots, idf * tfs * (K1 + 1) / (tfs + norm))
+        return cached
+
+    def _score_token(self, terms, lengths, avg_length, n_docs):
+        """(slots ascending, scores) of documents matching any of `terms`, best term per document."""
+        if len(terms) == 1:
+            return self._term_scores(terms[0], lengths, avg_length, n_docs)
+        slot_chunks, score_chunks = zip(*(
+            self._term_scores(term, lengths, avg_length, n_docs) for term in terms
+        ))
+        slots = np.concatenate(slot_chunks)
+        scores = np.concatenate(score_chunks)
+        order = np.lexsort((-scores, slots))
+        slots, scores = slots[order], scores[order]
+        first = np.ones(len(slots), dtype=bool)
+        first[1:] = slots[1:] != slots[:-1]
+        return slots[first], scores[first]
+
+    def search(self, query, resource_types=None, limit=20):
+        """
+        Resources matching every query token, best first.
+        Returns (ids, scores, total_matches).
+        """
+        tokens = tokenize(query)
+        with self._lock:
+            n_docs = len(self._slot_by_id)
+            if not tokens or not n_docs:
+                return [], [], 0
+            if self._lengths_array is None:
+                self._lengths_array = np.asarray(self.doc_lengths, dtype=np.float64)
+            lengths = self._lengths_array
+            avg_length = max(self._total_length / n_docs, 1.0)
+
+            slots = scores = None
+            for position, token in enumerate(tokens):
+                terms = self._expand(token, prefix=position == len(tokens) - 1)
+                if not terms:
+                    return [], [], 0
+                token_slots, token_scores = self._score_token(terms, lengths, avg_length, n_docs)
+                if slots is None:
+                    slots, scores = token_slots, token_scores
+                else:
+                    slots, mine, theirs = np.intersect1d(
+                        slots, token_slots, assume_unique=True, return_indices=True
+                    )
+                    scores = scores[mine] + token_scores[theirs]
+                if not len(slots):
+                    return [], [], 0
+
+            if resource_types:
+                wanted = set(resource_types)
+                keep = np.fromiter(
+                    (self.types[s] in wanted for s in slots.tolist()), dtype=bool, count=len(slots)
+                )
+                slots, scores = slots[keep], scores[keep]
+
+            total = len(slots)
+            if limit is not None and limit < total:
+                best = np.argpartition(-scores, limit)[:limit]
+                slots, scores = slots[best], scores[best]
+            order = np.argsort(-scores, kind="stable")
+            return [self.ids[s] for s in slots[order].tolist()], scores[order].tolist(), total
+
+
+resource_search = register_index(SearchIndex())
@@ -0,0 +1,247 @@
+"""
+Uniform grid index over active food resource coordinates.
+
+Points live in flat NumPy arrays; each grid cell keeps an array of slots
+into them. A radius query only looks at the cells overlapping the search
+circle's bounding box and then runs a vectorized haversine over those
+candidates, so cost depends on local density rather than table size.
+"""
+
+import math
+
+import numpy as np
+
+from app.models.food_resource import FoodResource
+from app.utils.geo import degree_spans, haversine_miles
+from app.utils.resource_cache import ResourceIndex, register_index
+
+
+class GridIndex(ResourceIndex):
+    """Bucket points into cell_size x cell_size degree cells."""
+
+    columns = ResourceIndex.columns + (FoodResource.neighborhood,)
+
+    def __init__(self, cell_size=0.01):
+        super().__init__()
+        self.cell_size = cell_size
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.lats = np.empty(0, dtype=np.float64)
+        self.lngs = np.empty(0, dtype=np.float64)
+        self.type_codes = np.empty(0, dtype=np.int32)
+        self.neighborhood_codes = np.empty(0, dtype=np.int32)
+        self.alive = np.empty(0, dtype=bool)
+        self.type_names = []
+        self._type_lookup = {}
+        self.neighborhood_names = []
+        self._neighborhood_lookup = {}
+        self._slot_by_id = {}
+        self._cells = {}
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._slot_by_id)
+
+    def _type_code(self, resource_type):
+        code = self._type_lookup.get(resource_type)
+        if code is None:
+            code = len(self.type_names)
+            self.type_names.append(resource_type)
+            self._type_lookup[resource_type] = code
+        return code
+
+    def _neighborhood_code(self, neighborhood):
+        code = self._neighborhood_lookup.get(neighborhood)
+        if code is None:
+            code = len(self.neighborhood_names)
+            self.neighborhood_names.append(neighborhood)
+            self._neighborhood_lookup[neighborhood] = code
+        return code
+
+    def _cell(self, lat, lng):
+        return (math.floor(lng / self.cell_size), math.floor(lat / self.cell_size))
+
+    # --- building ---
+    def rebuild(self, rows):
+        self._reset()
+        if not rows:
+            return
+        ids, lats, lngs, types, neighborhoods = zip(*rows)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lngs = np.asarray(lngs, dtype=np.float64)
+        self.type_codes = np.fromiter(
+            (self._type_code(t) for t in types), dtype=np.int32, count=len(types)
+        )
+        self.neighborhood_codes = np.fromiter(
+            (self._neighborhood_code(n) for n in neighborhoods), dtype=np.int32, count=len(neighborhoods)
+        )
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self._slot_by_id = {int(i): slot for slot, i in enumerate(self.ids)}
+        self._index_cells()
+
+    def _index_cells(self):
+        """Group live slots by cell with one sort instead of a Python loop per point."""
+        slots = np.flatnonzero(self.alive)
+        cx = np.floor(self.lngs[slots] / self.cell_size).astype(np.int64)
+        cy = np.floor(self.lats[slots] / self.cell_size).astype(np.int64)
+        order = np.lexsort((cy, cx))
+        slots, cx, cy = slots[order], cx[order], cy[order]
+        if len(slots) == 0:
+            self._cells = {}
+            return
+        breaks = np.flatnonzero((np.diff(cx) != 0) | (np.diff(cy) != 0)) + 1
+        starts = np.concatenate(([0], breaks))
+        self._cells = {
+            (int(cx[s]), int(cy[s])): chunk
+            for s, chunk in zip(starts, np.split(slots, breaks))
+        }
+
+    # --- incremental updates ---
+    def patch(self, resource):
+        self._remove(resource.id)
+        if resource.is_active:
+            self._insert(
+                resource.id, resource.latitude, resource.longitude,
+                resource.resource_type, resource.neighborhood
+            )
+        # Dead slots only cost memory and a little mask work; compact once they dominate
+        if self._dead > 1024 and self._dead > len(self._slot_by_id):
+            self._compact()
+
+    def _remove(self, resource_id):
+        slot = self._slot_by_id.pop(resource_id, None)
+        if slot is None:
+            return
+        self.alive[slot] = False
+        self._dead += 1
+        key = self._cell(self.lats[slot], self.lngs[slot])
+        remaining = self._cells[key][self._cells[key] != slot]
+        if len(remaining):
+            self._cells[key] = remaining
+        else:
+            del self._cells[key]
+
+    def _insert(self, resource_id, lat, lng, resource_type, neighborhood):
+        slot = len(self.ids)
+        self.ids = np.append(self.ids, resource_id)
+        self.lats = np.append(self.lats, lat)
+        self.lngs = np.append(self.lngs, lng)
+        self.type_codes = np.append(self.type_codes, self._type_code(resource_type))
+        self.neighborhood_codes = np.append(self.neighborhood_codes, self._neighborhood_code(neighborhood))
+        self.alive = np.append(self.alive, True)
+        self._slot_by_id[resource_id] = slot
+        key = self._cell(lat, lng)
+        if key in self._cells:
+            self._cells[key] = np.append(self._cells[key], slot)
+        else:
+            self._cells[key] = np.array([slot], dtype=np.int64)
+
+    def _compact(self):
+        keep = self.alive
+        rows = list(zip(
+            self.ids[keep].tolist(), self.lats[keep].tolist(), self.lngs[keep].tolist(),
+            [self.type_names[c] for c in self.type_codes[keep]],
+            [self.neighborhood_names[c] for c in self.neighborhood_codes[keep]]
+        ))
+        self.rebuild(rows)
+
+    # --- queries ---
+    def candidates(self, min_lat, min_lng, max_lat, max_lng):
+        """Slots of live points in cells overlapping the box (may include points just outside it)."""
+        x0, y0 = self._cell(min_lat, min_lng)
+        x1, y1 = self._cell(max_lat, max_lng)
+        span = (x1 - x0 + 1) * (y1 - y0 + 1)
+        if span <= len(self._cells):
+            chunks = [
+                self._cells[(x, y)]
+                for x in range(x0, x1 + 1)
+                for y in range(y0, y1 + 1)
+                if (x, y) in self._cells
+            ]
+        else:
+            # Box covers more cells than are occupied; one vectorized pass is cheaper
+            return np.flatnonzero(
+                self.alive
+                & (self.lats >= min_lat) & (self.lats <= max_lat)
+                & (self.lngs >= min_lng) & (self.lngs <= max_lng)
+            )
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(chunks)
+
+    def type_mask(self, slots, resource_types):
+        """Boolean mask over slots keeping only the given resource types."""
+        codes = [self._type_lookup[t] for t in resource_types if t in self._type_lookup]
+        return np.isin(self.type_codes[slots], codes)
+
+    def filter_slots(self, slots, resource_types=None, neighborhood=None):
+        """Apply the optional type / neighborhood filters to candidate slots."""
+        if resource_types:
+            slots = slots[self.type_mask(slots, resource_types)]
+        if neighborhood:
+            code = self._neighborhood_lookup.get(neighborhood, -1)
+            slots = slots[self.neighborhood_codes[slots] == code]
+        return slots
+
+    def within(self, lat, lng, radius_miles, resource_types=None, limit=None):
+        """
+        Resources within radius_miles of (lat, lng), nearest first.
+        Returns (ids, distances_in_miles) as NumPy arrays.
+        """
+        with self._lock:
+            dlat, dlng = degree_spans(lat, radius_miles)
+            slots = self.filter_slots(
+                self.candidates(lat - dlat, lng - dlng, lat + dlat, lng + dlng), resource_types
+            )
+            distances = haversine_miles(lat, lng, self.lats[slots], self.lngs[slots])
+            inside = distances <= radius_miles
+            slots, distances = slots[inside], distances[inside]
+            if limit is not None and limit < len(slots):
+                nearest = np.argpartition(distances, limit)[:limit]
+                slots, distances = slots[nearest], distances[nearest]
+            order = np.argsort(distances, kind="stable")
+            return self.ids[slots[order]], distances[order]
+
+    def _box_slots(self, min_lat, min_lng, max_lat, max_lng):
+        slots = self.candidates(min_lat, min_lng, max_lat, max_lng)
+        lats, lngs = self.lats[slots], self.lngs[slots]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+        return slots[inside]
+
+    def box_points(self, min_lat, min_lng, max_lat, max_lng):
+        """(ids, lats, lngs, resource_types) of every resource inside a bounding box, unordered."""
+        with self._lock:
+            slots = self._box_slots(min_lat, min_lng, max_lat, max_lng)
+            types = [self.type_names[c] for c in self.type_codes[slots].tolist()]
+            return self.ids[slots], self.lats[slots], self.lngs[slots], types
+
+    def in_box(self, min_lat, min_lng, max_lat, max_lng,
+               resource_types=None, neighborhood=None, limit=None, only_ids=None):
+        """
+        Resources inside a bounding box, optionally restricted to `only_ids`.
+        When more than `limit` match, the ones closest to the box center are
+        kept. Returns (ids ordered center-out, total number of matches).
+        """
+        with self._lock:
+            slots = self.filter_slots(
+                self._box_slots(min_lat, min_lng, max_lat, max_lng), resource_types, neighborhood
+            )
+            if only_ids is not None:
+                allowed = np.fromiter(only_ids, dtype=self.ids.dtype, count=len(only_ids))
+                slots = slots[np.isin(self.ids[slots], allowed)]
+            total = len(slots)
+            distances = haversine_miles(
+                (min_lat + max_lat) / 2, (min_lng + max_lng) / 2,
+                self.lats[slots], self.lngs[slots]
+            )
+            if limit is not None and limit < total:
+                nearest = np.argpartition(distances, limit)[:limit]
+                slots, distances = slots[nearest], distances[nearest]
+            order = np.argsort(distances, kind="stable")
+            return self.ids[slots[order]], total
+
+
+resource_grid = register_index(GridIndex())
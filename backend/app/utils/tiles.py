@@ -0,0 +1,172 @@
+"""
+GeoJSON tile pyramid over active food resources for /api/tiles/<z>/<x>/<y>.
+
+Tiles at or above TILE_POINT_MIN_ZOOM list the resources inside them with
+compact properties (id, name, resource_type); lower zoom tiles aggregate
+points into a 4 x 4 grid of clusters so a tile never grows with the table.
+
+Encoded tiles are kept in an in-memory LRU backed by files on disk, each
+stamped with the data version it was built at. When the version moves, a
+cached tile is only rebuilt if the resource change log shows a write inside
+its bounds; tiles elsewhere are re-stamped and served as they are.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.database.db import db
+from app.models.food_resource import FoodResource
+from app.utils.compression import CompressedVariants
+from app.utils.geo import project, tile_bounds
+from app.utils.http_cache import content_etag
+from app.utils.resource_cache import changed_since, get_resource_version
+from app.utils.spatial_index import resource_grid
+
+CLUSTER_CELLS_PER_TILE = 4
+
+
+class Tile(CompressedVariants):
+    """An encoded tile body built at a given data version."""
+
+    def __init__(self, version, body):
+        super().__init__()
+        self.version = version
+        self.body = body
+        self.etag = content_etag(body)
+
+
+class TileCache:
+    """In-memory LRU of Tiles with an optional on-disk second level."""
+
+    def __init__(self, max_entries=2048, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        z, x, y = key
+        return os.path.join(self.directory, str(z), str(x), f"{y}.json")
+
+    def get(self, key):
+        with self._lock:
+            tile = self._entries.get(key)
+            if tile is not None:
+                self._entries.move_to_end(key)
+                return tile
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                version = int(f.readline())
+                tile = Tile(version, f.read())
+        except (OSError, ValueError):
+            return None
+        self._remember(key, tile)
+        return tile
+
+    def put(self, key, tile):
+        self._remember(key, tile)
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(f"{tile.version}\n".encode("ascii"))
+                f.write(tile.body)
+            os.replace(tmp, path)
+        return tile
+
+    def _remember(self, key, tile):
+        with self._lock:
+            self._entries[key] = tile
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def point_feature(resource_id, lat, lng, resource_type, name):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(lng, 6), round(lat, 6)]},
+        "properties": {"id": resource_id, "name": name, "resource_type": resource_type}
+    }
+
+
+def cluster_feature(lat, lng, count):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(lng, 6), round(lat, 6)]},
+        "properties": {"cluster": True, "point_count": count}
+    }
+
+
+def build_tile(z, x, y, version, point_min_zoom, dumps):
+    """Encode the features of tile z/x/y at the given data version."""
+    n = 2 ** z
+    ids, lats, lngs, types = resource_grid.ensure_current(version).box_points(*tile_bounds(z, x, y))
+
+    # Points exactly on a tile edge belong to one tile only
+    px, py = project(lats, lngs)
+    mine = (np.minimum(np.floor(px * n), n - 1) == x) & (np.minimum(np.floor(py * n), n - 1) == y)
+    ids, lats, lngs, px, py = ids[mine], lats[mine], lngs[mine], px[mine], py[mine]
+    types = [t for t, keep in zip(types, mine.tolist()) if keep]
+
+    if z >= point_min_zoom:
+        singles = np.arange(len(ids))
+        clusters = []
+    else:
+        cells = CLUSTER_CELLS_PER_TILE * n
+        keys = np.floor(px * cells).astype(np.int64) * cells + np.floor(py * cells).astype(np.int64)
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        lonely = counts[inverse] == 1
+        singles = np.flatnonzero(lonely)
+        grouped = ~lonely
+        sum_lat = np.bincount(inverse[grouped], weights=lats[grouped], minlength=len(counts))
+        sum_lng = np.bincount(inverse[grouped], weights=lngs[grouped], minlength=len(counts))
+        clusters = [
+            cluster_feature(sum_lat[c] / counts[c], sum_lng[c] / counts[c], int(counts[c]))
+            for c in np.flatnonzero(counts > 1).tolist()
+        ]
+
+    single_ids = ids[singles].tolist()
+    names = dict(
+        db.session.query(FoodResource.id, FoodResource.name)
+        .filter(FoodResource.id.in_(single_ids)).all()
+    ) if single_ids else {}
+    features = clusters + [
+        point_feature(resource_id, lat, lng, types[i], names.get(resource_id))
+        for i, resource_id, lat, lng in zip(
+            singles.tolist(), single_ids, lats[singles].tolist(), lngs[singles].tolist()
+        )
+    ]
+
+    return Tile(version, dumps({"type": "FeatureCollection", "features": features}).encode("utf-8"))
+
+
+def get_tile(z, x, y, point_min_zoom, dumps):
+    """
+    Return the current Tile for z/x/y, reusing a cached one when no write
+    since it was built touched the tile's bounds.
+    """
+    version, updated_at = get_resource_version()
+    key = (z, x, y)
+    tile = resource_tiles.get(key)
+    if tile is not None and tile.version != version:
+        if tile.version < version and not changed_since(tile.version, version, *tile_bounds(z, x, y)):
+            tile = resource_tiles.put(key, Tile(version, tile.body))
+        else:
+            tile = None
+    if tile is None:
+        tile = resource_tiles.put(key, build_tile(z, x, y, version, point_min_zoom, dumps))
+    return tile, updated_at
+
+
+resource_tiles = TileCache()
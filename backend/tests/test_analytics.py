@@ -0,0 +1,211 @@
+"""
+Pytest tests for access analytics endpoints
+Run with: pytest test_analytics.py -v
+"""
+
+import pytest
+
+
+@pytest.mark.public
+class TestAccessAnalytics:
+    """Test nearest-resource distance and density per block group"""
+    
+    def test_access_per_block_group(self, base_url, api_client):
+        """Test that every block group reports metrics for every resource type"""
+        response = api_client.get(f"{base_url}/api/analytics/access")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["distance_unit"] == "miles"
+        assert len(data["block_groups"]) > 0
+        for block_group in data["block_groups"]:
+            assert block_group["geoid10"]
+            assert set(block_group["access"]) == set(data["resource_types"])
+            for metrics in block_group["access"].values():
+                assert metrics["count"] >= 0
+                assert metrics["nearest_miles"] is None or metrics["nearest_miles"] >= 0
+    
+    def test_access_filtered_by_type(self, base_url, api_client):
+        """Test that the type parameter limits the resource types reported"""
+        response = api_client.get(f"{base_url}/api/analytics/access", params={"type": "grocery"})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["resource_types"] == ["grocery"]
+        assert all(set(bg["access"]) == {"grocery"} for bg in data["block_groups"])
+    
+    def test_access_revalidation(self, base_url, api_client):
+        """Test that repeated reads revalidate with 304 while data is unchanged"""
+        response = api_client.get(f"{base_url}/api/analytics/access")
+        etag = response.headers.get("ETag")
+        assert etag
+        
+        revalidated = api_client.get(
+            f"{base_url}/api/analytics/access", headers={"If-None-Match": etag}
+        )
+        assert revalidated.status_code == 304
+
+
+@pytest.mark.admin
+class TestAccessAnalyticsInvalidation:
+    """Test that analytics follow food resource writes"""
+    
+    def test_new_resource_becomes_nearest(self, base_url, api_client, admin_session):
+        """Test that a resource created at a block group's interior point is its nearest"""
+        data = api_client.get(f"{base_url}/api/analytics/access").json()
+        origin = data["block_groups"][0]
+        
+        response = admin_session.post(f"{base_url}/api/food-resources", json={
+            "name": "PyTest Analytics Pantry",
+            "address": "1 Analytics Way, Pittsburgh, PA",
+            "latitude": origin["latitude"],
+            "longitude": origin["longitude"],
+            "resource_type": "pytest_analytics"
+        })
+        assert response.status_code == 201
+        resource_id = response.json()["id"]
+        
+        try:
+            data = api_client.get(
+                f"{base_url}/api/analytics/access", params={"type": "pytest_analytics"}
+            ).json()
+            metrics = next(
+                bg for bg in data["block_groups"] if bg["geoid10"] == origin["geoid10"]
+            )["access"]["pytest_analytics"]
+            assert metrics["nearest_id"] == resource_id
+            assert metrics["nearest_miles"] < 0.01
+        finally:
+            admin_session.delete(f"{base_url}/api/food-resources/{resource_id}")
+
+
+@pytest.mark.admin
+class TestAccessibilityScores:
+    """Test the 2SFCA accessibility batch job and its endpoint"""
+    
+    def test_refresh_and_read_scores(self, base_url, api_client, admin_session):
+        """Test that a batch run stores a score per block group and resource type"""
+        response = admin_session.post(
+            f"{base_url}/api/analytics/accessibility",
+            json={"catchment_miles": 2, "decay": "linear"}
+        )
+        
+        assert response.status_code == 200
+        summary = response.json()
+        assert summary["rows"] == summary["block_groups"] * len(summary["resource_types"])
+        
+        data = api_client.get(f"{base_url}/api/analytics/accessibility").json()
+        assert data["stale"] is False
+        assert data["catchment_miles"] == 2
+        assert data["decay"] == "linear"
+        assert len(data["scores"]) == summary["rows"]
+        assert all(score["score"] >= 0 for score in data["scores"])
+        assert any(score["score"] > 0 for score in data["scores"])
+    
+    def test_scores_filtered_by_type(self, base_url, api_client, admin_session):
+        """Test that the type parameter limits the stored scores returned"""
+        admin_session.post(f"{base_url}/api/analytics/accessibility", json={})
+        
+        data = api_client.get(
+            f"{base_url}/api/analytics/accessibility", params={"type": "grocery"}
+        ).json()
+        assert data["scores"]
+        assert {score["resource_type"] for score in data["scores"]} == {"grocery"}
+    
+    def test_refresh_rejects_bad_parameters(self, base_url, admin_session):
+        """Test that invalid catchment or decay values return 400"""
+        url = f"{base_url}/api/analytics/accessibility"
+        assert admin_session.post(url, json={"catchment_miles": -1}).status_code == 400
+        assert admin_session.post(url, json={"decay": "cubic"}).status_code == 400
+    
+    def test_refresh_requires_admin(self, base_url, api_client):
+        """Test that running the batch job requires an admin session"""
+        response = api_client.post(f"{base_url}/api/analytics/accessibility", json={})
+        
+        assert response.status_code == 401
+
+
+@pytest.mark.admin
+class TestSuggestionImpact:
+    """Test the access impact estimate for suggested sites"""
+    
+    @pytest.fixture
+    def suggestion_id(self, base_url, api_client, admin_session):
+        """A pending grocery suggestion without coordinates, deleted afterwards"""
+        response = api_client.post(f"{base_url}/api/suggestions", json={
+            "name": "PyTest Impact Grocery",
+            "address": "1 Nowhere Rd, Pittsburgh, PA",
+            "resource_type": "grocery",
+            "neighborhood": "Hazelwood"
+        })
+        assert response.status_code == 201
+        suggestion_id = response.json()["suggestion_id"]
+        yield suggestion_id
+        admin_session.delete(f"{base_url}/api/suggestions/{suggestion_id}")
+    
+    def test_impact_at_coordinates(self, base_url, admin_session, suggestion_id):
+        """Test that a site at a block group's interior point brings its distance to zero"""
+        access = admin_session.get(
+            f"{base_url}/api/analytics/access", params={"type": "grocery"}
+        ).json()
+        origin = max(
+            (bg for bg in access["block_groups"] if bg["access"]["grocery"]["nearest_miles"] is not None),
+            key=lambda bg: bg["access"]["grocery"]["nearest_miles"]
+        )
+        
+        response = admin_session.get(
+            f"{base_url}/api/suggestions/{suggestion_id}/impact",
+            params={"lat": origin["latitude"], "lng": origin["longitude"]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["location_source"] == "coordinates"
+        assert data["resource_type"] == "grocery"
+        assert data["block_groups_improved"] == len(data["improvements"]) > 0
+        assert data["weighted_improvement_miles"] > 0
+        best = next(i for i in data["improvements"] if i["geoid10"] == origin["geoid10"])
+        assert best["proposed_miles"] < 0.01
+        assert best["improvement_miles"] == pytest.approx(
+            origin["access"]["grocery"]["nearest_miles"], abs=0.01
+        )
+        drops = [i["improvement_miles"] for i in data["improvements"]]
+        assert drops == sorted(drops, reverse=True)
+    
+    def test_impact_from_stored_location(self, base_url, api_client, admin_session):
+        """Test that a suggestion submitted with coordinates is placed there"""
+        response = api_client.post(f"{base_url}/api/suggestions", json={
+            "name": "PyTest Located Grocery",
+            "address": "600 Grant St, Pittsburgh, PA 15219",
+            "resource_type": "grocery",
+            "latitude": 40.4406,
+            "longitude": -79.9959
+        })
+        suggestion_id = response.json()["suggestion_id"]
+        
+        response = admin_session.get(f"{base_url}/api/suggestions/{suggestion_id}/impact")
+        admin_session.delete(f"{base_url}/api/suggestions/{suggestion_id}")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["location_source"] == "suggestion"
+        assert (data["latitude"], data["longitude"]) == (40.4406, -79.9959)
+    
+    def test_impact_requires_location(self, base_url, admin_session, suggestion_id):
+        """Test that a suggestion without coordinates needs lat and lng"""
+        response = admin_session.get(f"{base_url}/api/suggestions/{suggestion_id}/impact")
+        
+        assert response.status_code == 400
+        assert "location is required" in response.json()["error"]
+    
+    def test_impact_errors(self, base_url, admin_session, suggestion_id):
+        """Test missing suggestions and bad coordinates"""
+        assert admin_session.get(f"{base_url}/api/suggestions/999999/impact").status_code == 404
+        assert admin_session.get(
+            f"{base_url}/api/suggestions/{suggestion_id}/impact", params={"lat": 40.4}
+        ).status_code == 400
+    
+    def test_impact_requires_admin(self, base_url, api_client, suggestion_id):
+        """Test that impact estimates are admin only"""
+        response = api_client.get(f"{base_url}/api/suggestions/{suggestion_id}/impact")
+        
+        assert response.status_code == 401
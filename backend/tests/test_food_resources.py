@@ -3,8 +3,42 @@ Pytest tests for food resource endpoints
 Run with: pytest test_food_resources.py -v
 """
 
+import json
+import struct
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
 
+from app.utils.columnar import encode_columnar
+from app.utils.search_index import SearchIndex
+
+
+def decode_columnar(payload):
+    """Decode the columnar resource format into a list of row dicts"""
+    assert payload[:4] == b"FRC1"
+    header_length = struct.unpack("<I", payload[4:8])[0]
+    header = json.loads(payload[8:8 + header_length])
+    data = payload[8 + header_length:]
+    columns = {
+        spec["name"]: np.frombuffer(data, dtype=spec["dtype"], count=spec["length"], offset=spec["offset"])
+        for spec in header["columns"]
+    }
+    ids = np.cumsum(columns["id"].astype(np.int64))
+    lats = np.cumsum(columns["lat"].astype(np.int64)) / 10 ** header["precision"]
+    lngs = np.cumsum(columns["lng"].astype(np.int64)) / 10 ** header["precision"]
+    rows = []
+    for i in range(header["count"]):
+        neighborhood = int(columns["neighborhood"][i])
+        rows.append({
+            "id": int(ids[i]),
+            "lat": float(lats[i]),
+            "lng": float(lngs[i]),
+            "resource_type": header["resource_types"][int(columns["resource_type"][i])],
+            "neighborhood": header["neighborhoods"][neighborhood] if neighborhood >= 0 else None,
+        })
+    return rows
+
 
 @pytest.mark.public
 class TestPublicFoodResources:
@@ -234,4 +268,709 @@ class TestGeoJSONFormat:
             props = feature["properties"]
             assert "id" in props
             assert "name" in props
-            assert "resource_type" in props
\ No newline at end of file
+            assert "resource_type" in props
+
+@pytest.mark.public
+class TestResourceListCaching:
+    """Test that cached resource lists are invalidated by admin writes"""
+    
+    def _feature_ids(self, base_url, client, **params):
+        response = client.get(f"{base_url}/api/food-resources", params=params)
+        assert response.status_code == 200
+        return {f["properties"]["id"] for f in response.json()["features"]}
+    
+    def test_list_reflects_create_and_delete(self, base_url, api_client, admin_session, sample_food_resource):
+        """Test that a cached list picks up new and deleted resources"""
+        # Warm the cache
+        self._feature_ids(base_url, api_client)
+        
+        create_response = admin_session.post(
+            f"{base_url}/api/food-resources",
+            json=sample_food_resource
+        )
+        assert create_response.status_code == 201
+        resource_id = create_response.json()["id"]
+        
+        assert resource_id in self._feature_ids(base_url, api_client)
+        assert resource_id in self._feature_ids(base_url, api_client, type="food_bank")
+        
+        admin_session.delete(f"{base_url}/api/food-resources/{resource_id}")
+        
+        assert resource_id not in self._feature_ids(base_url, api_client)
+        assert resource_id not in self._feature_ids(base_url, api_client, type="food_bank")
+    
+    def test_list_reflects_update(self, base_url, api_client, admin_session, created_resource_id):
+        """Test that a cached list picks up updated properties"""
+        self._feature_ids(base_url, api_client, neighborhood="Oakland")
+        
+        response = admin_session.put(
+            f"{base_url}/api/food-resources/{created_resource_id}",
+            json={"neighborhood": "Shadyside"}
+        )
+        assert response.status_code == 200
+        
+        assert created_resource_id not in self._feature_ids(base_url, api_client, neighborhood="Oakland")
+        assert created_resource_id in self._feature_ids(base_url, api_client, neighborhood="Shadyside")
+
+    
+    def test_streamed_list_matches_cached_list(self, base_url, api_client, created_resource_id):
+        """Test that stream=1 returns the same features as the cached list"""
+        cached = self._feature_ids(base_url, api_client)
+        streamed = self._feature_ids(base_url, api_client, stream=1)
+        
+        assert created_resource_id in streamed
+        assert streamed == cached
+        assert self._feature_ids(base_url, api_client, stream=1, neighborhood="Oakland") == \
+            self._feature_ids(base_url, api_client, neighborhood="Oakland")
+    
+    def test_streamed_list_if_none_match_returns_304(self, base_url, api_client):
+        """Test that a streamed list can be revalidated with its ETag"""
+        first = api_client.get(f"{base_url}/api/food-resources", params={"stream": 1})
+        assert first.headers.get("ETag")
+        
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            params={"stream": 1},
+            headers={"If-None-Match": first.headers["ETag"]}
+        )
+        assert response.status_code == 304
+
+
+@pytest.mark.public
+class TestResourcePaging:
+    """Test keyset pagination, field projection and batch retrieval"""
+    
+    def test_keyset_pages_cover_list(self, base_url, api_client, created_resource_id):
+        """Test that walking after_id pages returns every resource exactly once"""
+        full = api_client.get(f"{base_url}/api/food-resources").json()
+        expected = sorted(f["properties"]["id"] for f in full["features"])
+        
+        seen = []
+        after_id = None
+        for _ in range(len(expected) + 2):
+            params = {"limit": 2}
+            if after_id is not None:
+                params["after_id"] = after_id
+            response = api_client.get(f"{base_url}/api/food-resources", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["features"]) <= 2
+            seen.extend(f["properties"]["id"] for f in page["features"])
+            after_id = page["next_after_id"]
+            if after_id is None:
+                break
+        
+        assert seen == expected
+    
+    def test_fields_projection(self, base_url, api_client, created_resource_id):
+        """Test that fields= limits properties but keeps id and geometry"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            params={"fields": "resource_type", "ids": created_resource_id}
+        )
+        
+        assert response.status_code == 200
+        feature = response.json()["features"][0]
+        assert set(feature["properties"]) == {"id", "resource_type"}
+        assert len(feature["geometry"]["coordinates"]) == 2
+    
+    def test_unknown_field_rejected(self, base_url, api_client):
+        """Test that unknown projection fields return 400"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            params={"fields": "name,password_hash"}
+        )
+        
+        assert response.status_code == 400
+    
+    def test_batch_ids_keep_order(self, base_url, api_client):
+        """Test that ids= returns the requested resources in request order"""
+        full = api_client.get(f"{base_url}/api/food-resources").json()
+        ids = [f["properties"]["id"] for f in full["features"]][:3][::-1]
+        
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            params={"ids": ",".join(str(i) for i in ids + [99999])}
+        )
+        
+        assert response.status_code == 200
+        assert [f["properties"]["id"] for f in response.json()["features"]] == ids
+    
+    def test_invalid_after_id(self, base_url, api_client):
+        """Test that a non-numeric cursor returns 400"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            params={"after_id": "abc"}
+        )
+        
+        assert response.status_code == 400
+    
+    def test_out_of_range_after_id(self, base_url, api_client):
+        """Test that a cursor outside the 64-bit id range returns 400"""
+        for after_id in ("99999999999999999999999", "0", "-5"):
+            response = api_client.get(
+                f"{base_url}/api/food-resources",
+                params={"after_id": after_id, "limit": 5}
+            )
+            
+            assert response.status_code == 400
+            assert response.json()["error"] == "ids, after_id and limit must be integers"
+    
+    def test_out_of_range_ids(self, base_url, api_client):
+        """Test that ids outside the 64-bit id range return 400"""
+        for ids in ("99999999999999999999999", "1,-2"):
+            response = api_client.get(f"{base_url}/api/food-resources", params={"ids": ids})
+            
+            assert response.status_code == 400
+            assert response.json()["error"] == "ids, after_id and limit must be integers"
+    
+    def test_too_many_ids(self, base_url, api_client):
+        """Test that a batch over the id cap is rejected"""
+        ids = ",".join(str(i) for i in range(1, 502))  # RESOURCE_BATCH_MAX_IDS + 1
+        response = api_client.get(f"{base_url}/api/food-resources", params={"ids": ids})
+        
+        assert response.status_code == 400
+        assert response.json()["error"].startswith("At most")
+
+
+@pytest.mark.public
+class TestConditionalGet:
+    """Test ETag / Last-Modified handling on public read endpoints"""
+    
+    def test_list_has_cache_headers(self, base_url, api_client):
+        """Test that the resource list carries validators and Cache-Control"""
+        response = api_client.get(f"{base_url}/api/food-resources")
+        
+        assert response.status_code == 200
+        assert response.headers.get("ETag")
+        assert not response.headers["ETag"].startswith("W/")
+        assert "public" in response.headers.get("Cache-Control", "")
+        assert "stale-while-revalidate" in response.headers.get("Cache-Control", "")
+    
+    def test_list_if_none_match_returns_304(self, base_url, api_client):
+        """Test that a matching If-None-Match returns 304 with no body"""
+        first = api_client.get(f"{base_url}/api/food-resources")
+        
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            headers={"If-None-Match": first.headers["ETag"]}
+        )
+        
+        assert response.status_code == 304
+        assert response.content == b""
+    
+    def test_list_if_modified_since_returns_304(self, base_url, api_client):
+        """Test that If-Modified-Since at Last-Modified returns 304"""
+        first = api_client.get(f"{base_url}/api/food-resources")
+        if "Last-Modified" not in first.headers:
+            pytest.skip("Dataset has no recorded modification time")
+        
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            headers={"If-Modified-Since": first.headers["Last-Modified"]}
+        )
+        
+        assert response.status_code == 304
+    
+    def test_etag_changes_after_update(self, base_url, api_client, admin_session, created_resource_id):
+        """Test that list and detail ETags change when a resource is updated"""
+        list_etag = api_client.get(f"{base_url}/api/food-resources").headers["ETag"]
+        detail_etag = api_client.get(
+            f"{base_url}/api/food-resources/{created_resource_id}"
+        ).headers["ETag"]
+        
+        admin_session.put(
+            f"{base_url}/api/food-resources/{created_resource_id}",
+            json={"description": "Changed for ETag test"}
+        )
+        
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            headers={"If-None-Match": list_etag}
+        )
+        assert response.status_code == 200
+        
+        response = api_client.get(
+            f"{base_url}/api/food-resources/{created_resource_id}",
+            headers={"If-None-Match": detail_etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["description"] == "Changed for ETag test"
+
+
+@pytest.mark.public
+class TestResponseCompression:
+    """Test Accept-Encoding negotiation on resource responses"""
+    
+    def test_list_gzip(self, base_url, api_client, created_resource_id):
+        """Test that the list is gzipped when the client accepts it"""
+        plain = api_client.get(
+            f"{base_url}/api/food-resources",
+            headers={"Accept-Encoding": "identity"}
+        )
+        compressed = api_client.get(
+            f"{base_url}/api/food-resources",
+            headers={"Accept-Encoding": "gzip"}
+        )
+        
+        assert "Content-Encoding" not in plain.headers
+        assert compressed.headers.get("Content-Encoding") == "gzip"
+        assert compressed.json() == plain.json()
+        # Each coding has its own strong validator
+        assert compressed.headers["ETag"] != plain.headers["ETag"]
+    
+    def test_small_response_not_compressed(self, base_url, api_client):
+        """Test that tiny bodies are sent uncompressed"""
+        response = api_client.get(
+            f"{base_url}/api/health",
+            headers={"Accept-Encoding": "gzip"}
+        )
+        
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.public
+class TestOpenHoursFilter:
+    """Test open_at / open_now filtering on compiled hours"""
+    
+    # 2026-10-14 is a Wednesday, 2026-10-17 a Saturday
+    WEDNESDAY_MORNING = "2026-10-14T10:00:00"
+    WEDNESDAY_NIGHT = "2026-10-14T20:00:00"
+    SATURDAY_MORNING = "2026-10-17T10:00:00"
+    
+    def _open_ids(self, base_url, client, **params):
+        response = client.get(f"{base_url}/api/food-resources", params=params)
+        assert response.status_code == 200
+        return {f["properties"]["id"] for f in response.json()["features"]}
+    
+    def test_free_text_hours(self, base_url, api_client, created_resource_id):
+        """Test that "Mon-Fri 9AM-5PM" is open on weekdays only, during the day"""
+        assert created_resource_id in self._open_ids(base_url, api_client, open_at=self.WEDNESDAY_MORNING)
+        assert created_resource_id not in self._open_ids(base_url, api_client, open_at=self.WEDNESDAY_NIGHT)
+        assert created_resource_id not in self._open_ids(base_url, api_client, open_at=self.SATURDAY_MORNING)
+    
+    def test_hours_update_is_applied(self, base_url, api_client, admin_session, created_resource_id):
+        """Test that changed hours are picked up by the filter"""
+        self._open_ids(base_url, api_client, open_at=self.SATURDAY_MORNING)
+        
+        admin_session.put(
+            f"{base_url}/api/food-resources/{created_resource_id}",
+            json={"hours": "Sat 9am-1pm"}
+        )
+        
+        assert created_resource_id in self._open_ids(base_url, api_client, open_at=self.SATURDAY_MORNING)
+        assert created_resource_id not in self._open_ids(base_url, api_client, open_at=self.WEDNESDAY_MORNING)
+    
+    def test_timezone_aware_open_at(self, base_url, api_client, created_resource_id):
+        """Test that an explicit UTC offset is converted to local time"""
+        # 14:00 UTC is 10:00 in Pittsburgh (EDT)
+        assert created_resource_id in self._open_ids(base_url, api_client, open_at="2026-10-14T14:00:00+00:00")
+        # 02:00 UTC Thursday is 22:00 Wednesday in Pittsburgh
+        assert created_resource_id not in self._open_ids(base_url, api_client, open_at="2026-10-15T02:00:00+00:00")
+    
+    def test_open_now(self, base_url, api_client):
+        """Test that open_now returns a FeatureCollection"""
+        response = api_client.get(f"{base_url}/api/food-resources", params={"open_now": 1})
+        
+        assert response.status_code == 200
+        assert response.json()["type"] == "FeatureCollection"
+    
+    def test_invalid_open_at(self, base_url, api_client):
+        """Test that a malformed open_at returns 400"""
+        response = api_client.get(f"{base_url}/api/food-resources", params={"open_at": "tomorrow"})
+        
+        assert response.status_code == 400
+    
+    def test_open_at_with_bbox(self, base_url, api_client, created_resource_id):
+        """Test that the viewport query applies the open-hours filter"""
+        bbox = "-80.0,40.43,-79.99,40.45"
+        open_ids = self._open_ids(base_url, api_client, bbox=bbox, open_at=self.WEDNESDAY_MORNING)
+        closed_ids = self._open_ids(base_url, api_client, bbox=bbox, open_at=self.SATURDAY_MORNING)
+        
+        assert created_resource_id in open_ids
+        assert created_resource_id not in closed_ids
+        assert open_ids <= self._open_ids(base_url, api_client, open_at=self.WEDNESDAY_MORNING)
+    
+    def test_open_at_with_fields_and_paging(self, base_url, api_client, created_resource_id):
+        """Test that projected and paged lists apply the open-hours filter"""
+        expected = self._open_ids(base_url, api_client, open_at=self.WEDNESDAY_MORNING)
+        
+        assert self._open_ids(base_url, api_client, fields="id", open_at=self.WEDNESDAY_MORNING) == expected
+        assert created_resource_id not in self._open_ids(
+            base_url, api_client, fields="id", open_at=self.SATURDAY_MORNING
+        )
+        
+        paged, params = set(), {"limit": 2, "open_at": self.WEDNESDAY_MORNING}
+        while True:
+            response = api_client.get(f"{base_url}/api/food-resources", params=params)
+            assert response.status_code == 200
+            paged |= {f["properties"]["id"] for f in response.json()["features"]}
+            if response.json()["next_after_id"] is None:
+                break
+            params["after_id"] = response.json()["next_after_id"]
+        assert paged == expected
+    
+    def test_open_at_varies_on_accept(self, base_url, api_client):
+        """Test that the open-hours list sets Vary: Accept like the other list responses"""
+        response = api_client.get(f"{base_url}/api/food-resources", params={"open_at": self.WEDNESDAY_MORNING})
+        
+        assert "Accept" in response.headers.get("Vary", "")
+
+
+@pytest.mark.public
+class TestColumnarFormat:
+    """Test the compact columnar encoding of the resource list"""
+    
+    def test_columnar_matches_geojson(self, base_url, api_client, created_resource_id):
+        """Test that the columnar payload carries the same resources as GeoJSON"""
+        geojson = api_client.get(f"{base_url}/api/food-resources").json()
+        response = api_client.get(f"{base_url}/api/food-resources", params={"format": "columnar"})
+        
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("application/vnd.foodresources.columnar")
+        rows = {row["id"]: row for row in decode_columnar(response.content)}
+        
+        assert created_resource_id in rows
+        assert len(rows) == len(geojson["features"])
+        for feature in geojson["features"]:
+            row = rows[feature["properties"]["id"]]
+            lng, lat = feature["geometry"]["coordinates"]
+            assert row["lat"] == pytest.approx(lat, abs=1e-5)
+            assert row["lng"] == pytest.approx(lng, abs=1e-5)
+            assert row["resource_type"] == feature["properties"]["resource_type"]
+            assert row["neighborhood"] == feature["properties"]["neighborhood"]
+    
+    def test_columnar_via_accept_header(self, base_url, api_client):
+        """Test that the columnar format can be negotiated with Accept"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            headers={"Accept": "application/vnd.foodresources.columnar"}
+        )
+        
+        assert response.status_code == 200
+        assert response.content[:4] == b"FRC1"
+        assert "Accept" in response.headers.get("Vary", "")
+    
+    def test_unknown_format(self, base_url, api_client):
+        """Test that an unknown format returns 400"""
+        response = api_client.get(f"{base_url}/api/food-resources", params={"format": "xml"})
+        
+        assert response.status_code == 400
+    
+    def test_wide_neighborhood_dictionary(self):
+        """Test that neighborhood codes widen instead of wrapping past 32767 names"""
+        count = 40000
+        neighborhoods = [f"Neighborhood {i:05d}" for i in range(count)]
+        payload = encode_columnar(
+            range(1, count + 1), [40.44] * count, [-79.99] * count, ["grocery"] * count, neighborhoods
+        )
+        
+        rows = decode_columnar(payload)
+        assert [row["neighborhood"] for row in rows] == neighborhoods
+
+
+@pytest.mark.public
+class TestNearbyResources:
+    """Test radius search endpoint"""
+    
+    def test_nearby_includes_created_resource(self, base_url, api_client, sample_food_resource, created_resource_id):
+        """Test that a resource at the query point is returned with distance"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources/nearby",
+            params={
+                "lat": sample_food_resource["latitude"],
+                "lng": sample_food_resource["longitude"],
+                "radius": 1
+            }
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["type"] == "FeatureCollection"
+        ids = [f["properties"]["id"] for f in data["features"]]
+        assert created_resource_id in ids
+        
+        distances = [f["properties"]["distance"] for f in data["features"]]
+        assert distances == sorted(distances)
+        assert all(d <= 1 for d in distances)
+    
+    def test_nearby_filter_by_type(self, base_url, api_client, sample_food_resource, created_resource_id):
+        """Test that the type filter applies to radius search"""
+        params = {
+            "lat": sample_food_resource["latitude"],
+            "lng": sample_food_resource["longitude"],
+            "radius": 1
+        }
+        
+        response = api_client.get(
+            f"{base_url}/api/food-resources/nearby",
+            params={**params, "type": "grocery"}
+        )
+        
+        assert response.status_code == 200
+        for feature in response.json()["features"]:
+            assert feature["properties"]["resource_type"] == "grocery"
+    
+    def test_nearby_excludes_deleted_resource(self, base_url, api_client, admin_session, sample_food_resource):
+        """Test that soft-deleted resources drop out of radius search"""
+        params = {
+            "lat": sample_food_resource["latitude"],
+            "lng": sample_food_resource["longitude"],
+            "radius": 1
+        }
+        resource_id = admin_session.post(
+            f"{base_url}/api/food-resources",
+            json=sample_food_resource
+        ).json()["id"]
+        
+        ids = [f["properties"]["id"] for f in api_client.get(
+            f"{base_url}/api/food-resources/nearby", params=params
+        ).json()["features"]]
+        assert resource_id in ids
+        
+        admin_session.delete(f"{base_url}/api/food-resources/{resource_id}")
+        
+        ids = [f["properties"]["id"] for f in api_client.get(
+            f"{base_url}/api/food-resources/nearby", params=params
+        ).json()["features"]]
+        assert resource_id not in ids
+    
+    def test_nearby_missing_coordinates(self, base_url, api_client):
+        """Test that lat/lng are required"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources/nearby",
+            params={"lat": 40.44}
+        )
+        
+        assert response.status_code == 400
+    
+    def test_nearby_invalid_radius(self, base_url, api_client):
+        """Test that an out-of-range radius is rejected"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources/nearby",
+            params={"lat": 40.44, "lng": -79.99, "radius": -1}
+        )
+        
+        assert response.status_code == 400
+
+
+@pytest.mark.public
+class TestNearestResources:
+    """Test per-type k-nearest endpoint"""
+    
+    def test_nearest_per_type_counts(self, base_url, api_client, created_resource_id):
+        """Test that each requested type returns at most its own k"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources/nearest",
+            params={"lat": 40.4406, "lng": -79.9959, "types": "grocery:1,pantry:2"}
+        )
+        
+        assert response.status_code == 200
+        features = response.json()["features"]
+        types = [f["properties"]["resource_type"] for f in features]
+        assert types.count("grocery") <= 1
+        assert types.count("pantry") <= 2
+        assert set(types) <= {"grocery", "pantry"}
+        
+        # Grouped by requested type, nearest first within each group
+        pantry_distances = [f["properties"]["distance"] for f in features if f["properties"]["resource_type"] == "pantry"]
+        assert pantry_distances == sorted(pantry_distances)
+    
+    def test_nearest_finds_created_resource(self, base_url, api_client, sample_food_resource, created_resource_id):
+        """Test that the closest resource of a type is the one at the query point"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources/nearest",
+            params={
+                "lat": sample_food_resource["latitude"],
+                "lng": sample_food_resource["longitude"],
+                "k": 1,
+                "types": sample_food_resource["resource_type"]
+            }
+        )
+        
+        assert response.status_code == 200
+        features = response.json()["features"]
+        assert len(features) == 1
+        assert features[0]["properties"]["distance"] == 0
+    
+    def test_nearest_invalid_k(self, base_url, api_client):
+        """Test that a non-numeric k is rejected"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources/nearest",
+            params={"lat": 40.44, "lng": -79.99, "types": "grocery:many"}
+        )
+        
+        assert response.status_code == 400
+
+
+@pytest.mark.public
+class TestResourceSearch:
+    """Test full-text resource search"""
+    
+    def _search_ids(self, base_url, client, **params):
+        response = client.get(f"{base_url}/api/food-resources/search", params=params)
+        assert response.status_code == 200
+        return [f["properties"]["id"] for f in response.json()["features"]]
+    
+    def test_search_by_name_and_prefix(self, base_url, api_client, created_resource_id):
+        """Test that whole words and a trailing prefix both match"""
+        assert created_resource_id in self._search_ids(base_url, api_client, q="pytest food bank")
+        assert created_resource_id in self._search_ids(base_url, api_client, q="pytest foo")
+    
+    def test_search_requires_every_word(self, base_url, api_client, created_resource_id):
+        """Test that a word matching nothing excludes the resource"""
+        assert created_resource_id not in self._search_ids(base_url, api_client, q="pytest zzqxnotaword")
+    
+    def test_search_ranks_name_matches_first(self, base_url, api_client, created_resource_id):
+        """Test that results carry descending scores"""
+        response = api_client.get(f"{base_url}/api/food-resources/search", params={"q": "pytest"})
+        scores = [f["properties"]["score"] for f in response.json()["features"]]
+        
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_search_follows_updates(self, base_url, api_client, admin_session, created_resource_id):
+        """Test that the index picks up renamed and deleted resources"""
+        admin_session.put(
+            f"{base_url}/api/food-resources/{created_resource_id}",
+            json={"name": "Quokka Community Pantry", "description": "Renamed"}
+        )
+        assert created_resource_id in self._search_ids(base_url, api_client, q="quokka")
+        assert created_resource_id not in self._search_ids(base_url, api_client, q="pytest food bank")
+        
+        admin_session.delete(f"{base_url}/api/food-resources/{created_resource_id}")
+        assert created_resource_id not in self._search_ids(base_url, api_client, q="quokka")
+    
+    def test_search_requires_query(self, base_url, api_client):
+        """Test that an empty query returns 400"""
+        response = api_client.get(f"{base_url}/api/food-resources/search", params={"q": " "})
+        
+        assert response.status_code == 400
+    
+    def test_patches_reuse_slots(self):
+        """Test that repeated updates do not grow the index arrays"""
+        index = SearchIndex()
+        index.rebuild([
+            (1, "grocery", "Quokka Market", "1 Main St", "Oakland", None),
+            (2, "pantry", "Wombat Pantry", "2 Main St", "Oakland", None),
+        ])
+        for i in range(50):
+            index.patch(SimpleNamespace(
+                id=1, is_active=True, resource_type="grocery", name=f"Quokka Market {i}",
+                address="1 Main St", neighborhood="Oakland", description=None
+            ))
+        
+        assert len(index.ids) == 2
+        assert index.search("quokka 49")[0] == [1]
+        assert index.search("wombat")[0] == [2]
+
+
+@pytest.mark.public
+class TestViewportResources:
+    """Test bbox viewport queries on the resource list"""
+    
+    def test_bbox_returns_only_resources_inside(self, base_url, api_client, sample_food_resource, created_resource_id):
+        """Test that every returned feature lies in the bbox"""
+        bbox = (-80.0, 40.43, -79.99, 40.45)
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            params={"bbox": ",".join(str(v) for v in bbox)}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        ids = [f["properties"]["id"] for f in data["features"]]
+        assert created_resource_id in ids
+        for feature in data["features"]:
+            lng, lat = feature["geometry"]["coordinates"]
+            assert bbox[0] <= lng <= bbox[2]
+            assert bbox[1] <= lat <= bbox[3]
+    
+    def test_bbox_limit_truncates(self, base_url, api_client, created_resource_id):
+        """Test that limit caps the features and reports the total"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            params={"bbox": "-81,39,-79,41", "limit": 1}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["features"]) <= 1
+        assert data["truncated"] == (data["total"] > 1)
+    
+    def test_invalid_bbox(self, base_url, api_client):
+        """Test that a malformed bbox is rejected"""
+        response = api_client.get(
+            f"{base_url}/api/food-resources",
+            params={"bbox": "-80,40,-79"}
+        )
+        
+        assert response.status_code == 400
+    
+    def test_non_finite_zoom(self, base_url, api_client):
+        """Test that a nan or infinite zoom is rejected"""
+        for zoom in ("nan", "inf", "-inf"):
+            response = api_client.get(
+                f"{base_url}/api/food-resources",
+                params={"bbox": "-80.1,40.3,-79.8,40.6", "zoom": zoom}
+            )
+            
+            assert response.status_code == 400
+            assert response.json()["error"] == "limit and zoom must be valid numbers"
+
+
+@pytest.mark.public
+class TestResourceClusters:
+    """Test server-side clustering endpoint"""
+    
+    def test_low_zoom_counts_cover_all_resources(self, base_url, api_client):
+        """Test that clusters at zoom 0 account for every active resource"""
+        total = len(api_client.get(f"{base_url}/api/food-resources").json()["features"])
+        
+        response = api_client.get(
+            f"{base_url}/api/food-resources/clusters",
+            params={"z": 0}
+        )
+        
+        assert response.status_code == 200
+        counted = 0
+        for feature in response.json()["features"]:
+            counted += feature["properties"].get("point_count", 1)
+        assert counted == total
+    
+    def test_high_zoom_returns_resources(self, base_url, api_client, sample_food_resource, created_resource_id):
+        """Test that a zoomed-in viewport returns the resource itself"""
+        lat, lng = sample_food_resource["latitude"], sample_food_resource["longitude"]
+        response = api_client.get(
+            f"{base_url}/api/food-resources/clusters",
+            params={"z": 18, "bbox": f"{lng - 0.001},{lat - 0.001},{lng + 0.001},{lat + 0.001}"}
+        )
+        
+        assert response.status_code == 200
+        ids = [f["properties"].get("id") for f in response.json()["features"]]
+        assert created_resource_id in ids
+    
+    def test_clusters_follow_deletes(self, base_url, api_client, admin_session, sample_food_resource):
+        """Test that cluster counts drop when a resource is deleted"""
+        def count_at_zoom_0():
+            features = api_client.get(
+                f"{base_url}/api/food-resources/clusters",
+                params={"z": 0, "type": "food_bank"}
+            ).json()["features"]
+            return sum(f["properties"].get("point_count", 1) for f in features)
+        
+        resource_id = admin_session.post(
+            f"{base_url}/api/food-resources",
+            json=sample_food_resource
+        ).json()["id"]
+        before = count_at_zoom_0()
+        
+        admin_session.delete(f"{base_url}/api/food-resources/{resource_id}")
+        
+        assert count_at_zoom_0() == before - 1
+    
+    def test_clusters_missing_zoom(self, base_url, api_client):
+        """Test that z is required"""
+        response = api_client.get(f"{base_url}/api/food-resources/clusters")
+        
+        assert response.status_code == 400
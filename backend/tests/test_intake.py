@@ -0,0 +1,227 @@
+"""
+Pytest tests for the intake pipeline (run_intake, BulkUpserter merge, backfill)
+Run with: pytest test_intake.py -v
+
+These import small fixture sheets into a throwaway SQLite database instead
+of the server's, so they exercise the merge directly.
+"""
+
+import pandas as pd
+import pytest
+
+from app import create_app
+from app.config import DevelopmentConfig, config
+from app.database.backfill_neighborhoods import backfill
+from app.database.db import db
+from app.database.intake import IntakeError, run_intake
+from app.models.food_resource import FoodResource
+from app.utils.neighborhoods import neighborhood_index
+from app.utils.resource_cache import get_resource_version
+
+GARDENS = [
+    {
+        "urban_grower": "PyTest Garden A", "category": "community-garden",
+        "street_address": "600 Grant St", "city": "Pittsburgh", "state": "PA", "zip_code": "15219",
+        "latitude": 40.4406, "longitude": -79.9959, "url": "https://a.example.org",
+    },
+    {
+        "urban_grower": "PyTest Garden B", "category": "school-garden",
+        "street_address": "4200 Fifth Ave", "city": "Pittsburgh", "state": "PA", "zip_code": "15260",
+        "latitude": 40.4443, "longitude": -79.9532, "url": "https://b.example.org",
+    },
+    {
+        "urban_grower": "PyTest Garden C", "category": "community-farm",
+        "street_address": "3700 Butler St", "city": "Pittsburgh", "state": "PA", "zip_code": "15201",
+        "latitude": 40.4700, "longitude": -79.9600, "url": "https://c.example.org",
+    },
+]
+
+GARDEN_A_ADDRESS = "600 Grant St, Pittsburgh, PA 15219"
+
+
+def write_sheet(path, rows, sep=","):
+    """Write fixture rows as a CSV/TSV sheet and return its path"""
+    pd.DataFrame(rows).to_csv(path, index=False, sep=sep)
+    return str(path)
+
+
+@pytest.fixture
+def intake_app(tmp_path, monkeypatch):
+    """An app on an empty SQLite file, registered as the "intake_test" config"""
+    class IntakeTestConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'intake.db'}"
+    
+    monkeypatch.setitem(config, "intake_test", IntakeTestConfig)
+    return create_app("intake_test")
+
+
+@pytest.fixture
+def gardens_sheet(tmp_path):
+    """The three fixture gardens as a CSV file"""
+    return write_sheet(tmp_path / "gardens.csv", GARDENS)
+
+
+def import_gardens(path):
+    """Import a gardens sheet into the test database and return its summary"""
+    summaries, _ = run_intake([("gardens", path)], "intake_test", workers=0)
+    return summaries["gardens"]
+
+
+def stored_rows(app, source="gardens"):
+    """name -> (id, is_active, website, neighborhood) for the rows of a source"""
+    with app.app_context():
+        rows = db.session.query(
+            FoodResource.name, FoodResource.id, FoodResource.is_active,
+            FoodResource.website, FoodResource.neighborhood
+        ).filter(FoodResource.source == source).all()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def data_version(app):
+    with app.app_context():
+        return get_resource_version()[0]
+
+
+class TestIntakeMerge:
+    """Test the delta merge of a source into food_resources"""
+    
+    def test_first_import_inserts(self, intake_app, gardens_sheet):
+        """Test that a first import inserts every row, active and with neighborhoods"""
+        summary = import_gardens(gardens_sheet)
+        
+        assert (summary["inserted"], summary["updated"], summary["deactivated"]) == (3, 0, 0)
+        rows = stored_rows(intake_app)
+        assert set(rows) == {g["urban_grower"] for g in GARDENS}
+        assert all(is_active for _, is_active, _, _ in rows.values())
+        assert rows["PyTest Garden A"][3] == neighborhood_index.lookup(40.4406, -79.9959)["neighborhood"]
+    
+    def test_unchanged_rerun_changes_nothing(self, intake_app, gardens_sheet):
+        """Test that re-importing the same sheet writes nothing and keeps the data version"""
+        import_gardens(gardens_sheet)
+        before, version = stored_rows(intake_app), data_version(intake_app)
+        
+        summary = import_gardens(gardens_sheet)
+        
+        assert (summary["inserted"], summary["updated"], summary["deactivated"]) == (0, 0, 0)
+        assert summary["unchanged"] == 3
+        assert not summary["changed"]
+        assert stored_rows(intake_app) == before
+        assert data_version(intake_app) == version
+    
+    def test_changed_row_is_updated(self, intake_app, gardens_sheet, tmp_path):
+        """Test that a row whose values changed is counted and written as an update"""
+        import_gardens(gardens_sheet)
+        before, version = stored_rows(intake_app), data_version(intake_app)
+        changed = [dict(GARDENS[0], url="https://new.example.org")] + GARDENS[1:]
+        
+        summary = import_gardens(write_sheet(tmp_path / "changed.csv", changed))
+        
+        assert (summary["inserted"], summary["updated"], summary["unchanged"]) == (0, 1, 2)
+        after = stored_rows(intake_app)
+        assert after["PyTest Garden A"][0] == before["PyTest Garden A"][0]
+        assert after["PyTest Garden A"][2] == "https://new.example.org"
+        assert data_version(intake_app) > version
+    
+    def test_removed_row_deactivated_and_restored(self, intake_app, gardens_sheet, tmp_path):
+        """Test that a row missing from a re-import is deactivated and comes back with it"""
+        import_gardens(gardens_sheet)
+        garden_b = stored_rows(intake_app)["PyTest Garden B"]
+        
+        summary = import_gardens(write_sheet(tmp_path / "without_b.csv", [GARDENS[0], GARDENS[2]]))
+        
+        assert (summary["deactivated"], summary["unchanged"]) == (1, 2)
+        rows = stored_rows(intake_app)
+        assert rows["PyTest Garden B"][1] is False
+        assert rows["PyTest Garden A"][1] and rows["PyTest Garden C"][1]
+        
+        summary = import_gardens(gardens_sheet)
+        
+        assert (summary["inserted"], summary["updated"], summary["deactivated"]) == (0, 1, 0)
+        assert stored_rows(intake_app)["PyTest Garden B"] == garden_b
+    
+    def test_unsourced_row_adopted_by_name_and_address(self, intake_app, gardens_sheet):
+        """Test that a seeded row with the same name and address is adopted, not duplicated"""
+        with intake_app.app_context():
+            seeded = FoodResource(
+                name="PyTest Garden A", resource_type="community_garden", address=GARDEN_A_ADDRESS,
+                latitude=40.4406, longitude=-79.9959, description="Seeded"
+            )
+            db.session.add(seeded)
+            db.session.commit()
+            seeded_id = seeded.id
+        
+        summary = import_gardens(gardens_sheet)
+        
+        assert (summary["inserted"], summary["updated"]) == (2, 1)
+        with intake_app.app_context():
+            matches = FoodResource.query.filter_by(name="PyTest Garden A").all()
+            assert [(r.id, r.source, r.description) for r in matches] == [
+                (seeded_id, "gardens", "Imported from Grow Pittsburgh directory")
+            ]
+    
+    def test_failed_source_rolls_back_every_source(self, intake_app, gardens_sheet, tmp_path):
+        """Test that one bad file leaves every source of the run untouched"""
+        import_gardens(gardens_sheet)
+        before, version = stored_rows(intake_app), data_version(intake_app)
+        changed = [dict(GARDENS[0], url="https://new.example.org")]
+        bad_supermarkets = write_sheet(tmp_path / "supermarkets.csv", [{"name": "PyTest Market", "lat": 40.44}])
+        
+        with pytest.raises(IntakeError, match="lon"):
+            run_intake([
+                ("gardens", write_sheet(tmp_path / "changed.csv", changed)),
+                ("supermarkets", bad_supermarkets),
+            ], "intake_test", workers=0)
+        
+        assert stored_rows(intake_app) == before
+        assert stored_rows(intake_app, "supermarkets") == {}
+        assert data_version(intake_app) == version
+    
+    def test_decimal_comma_coordinates_get_neighborhoods(self, intake_app, tmp_path):
+        """Test that neighborhoods come from coordinates as parsed by the source"""
+        sheet = write_sheet(tmp_path / "supermarkets.tsv", [
+            {
+                "name": "PyTest Market", "category": "Supermarket", "street_name": "Grant St",
+                "state": "PA", "zip": "15219", "lat": "40,4406", "lon": "-79,9959",
+            },
+        ], sep="\t")
+        
+        summaries, _ = run_intake([("supermarkets", sheet)], "intake_test", workers=0)
+        
+        assert summaries["supermarkets"]["inserted"] == 1
+        
+        neighborhood = stored_rows(intake_app, "supermarkets")["PyTest Market"][3]
+        assert neighborhood == neighborhood_index.lookup(40.4406, -79.9959)["neighborhood"]
+    
+    def test_pool_workers_match_inline_parse(self, intake_app, gardens_sheet, tmp_path):
+        """Test that parsing in worker processes imports the same rows as parsing inline"""
+        summaries, timings = run_intake([("gardens", gardens_sheet)], "intake_test", workers=2)
+        
+        assert timings["workers"] == 1  # one sheet, so one worker
+        assert summaries["gardens"]["inserted"] == 3
+        assert import_gardens(gardens_sheet)["unchanged"] == 3
+
+
+class TestBackfillNeighborhoods:
+    """Test assigning neighborhoods to stored rows"""
+    
+    def test_fills_only_missing_neighborhoods(self, intake_app):
+        """Test that rows with a neighborhood keep it and NULL/blank rows are filled"""
+        with intake_app.app_context():
+            rows = {
+                "PyTest Null": None,
+                "PyTest Blank": "",
+                "PyTest Set": "Somewhere Else",
+            }
+            for name, neighborhood in rows.items():
+                db.session.add(FoodResource(
+                    name=name, resource_type="grocery", address="600 Grant St",
+                    latitude=40.4406, longitude=-79.9959, neighborhood=neighborhood
+                ))
+            db.session.commit()
+            expected = neighborhood_index.lookup(40.4406, -79.9959)["neighborhood"]
+            
+            summary = backfill()
+            
+            assert (summary["checked"], summary["updated"]) == (2, 2)
+            stored = dict(db.session.query(FoodResource.name, FoodResource.neighborhood).all())
+            assert stored == {"PyTest Null": expected, "PyTest Blank": expected, "PyTest Set": "Somewhere Else"}
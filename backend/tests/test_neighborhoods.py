@@ -0,0 +1,142 @@
+"""
+Pytest tests for neighborhood endpoints
+Run with: pytest test_neighborhoods.py -v
+"""
+
+import pytest
+
+
+@pytest.mark.public
+class TestNeighborhoods:
+    """Test the neighborhood boundary data endpoint"""
+    
+    def test_get_neighborhoods(self, base_url, api_client):
+        """Test getting the neighborhood FeatureCollection"""
+        response = api_client.get(f"{base_url}/api/neighborhoods")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["type"] == "FeatureCollection"
+        assert len(data["features"]) > 0
+    
+    def test_neighborhoods_served_compressed(self, base_url, api_client):
+        """Test that gzip is negotiated and revalidation still works"""
+        response = api_client.get(
+            f"{base_url}/api/neighborhoods",
+            headers={"Accept-Encoding": "gzip"}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers.get("Content-Encoding") == "gzip"
+        assert "Accept-Encoding" in response.headers.get("Vary", "")
+        
+        revalidated = api_client.get(
+            f"{base_url}/api/neighborhoods",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]}
+        )
+        assert revalidated.status_code == 304
+
+
+@pytest.mark.public
+class TestNeighborhoodLookup:
+    """Test reverse neighborhood lookup"""
+    
+    def test_lookup_downtown(self, base_url, api_client):
+        """Test that a downtown point resolves to its neighborhood and block group"""
+        response = api_client.get(
+            f"{base_url}/api/neighborhoods/lookup",
+            params={"lat": 40.4406, "lng": -79.9959}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["neighborhood"] == "Central Business District"
+        assert data["geoid10"]
+    
+    def test_lookup_outside_city(self, base_url, api_client):
+        """Test that a point outside every polygon returns 404"""
+        response = api_client.get(
+            f"{base_url}/api/neighborhoods/lookup",
+            params={"lat": 40.0, "lng": -75.0}
+        )
+        
+        assert response.status_code == 404
+    
+    def test_lookup_requires_coordinates(self, base_url, api_client):
+        """Test that missing or invalid coordinates return 400"""
+        assert api_client.get(f"{base_url}/api/neighborhoods/lookup", params={"lat": 40.44}).status_code == 400
+        assert api_client.get(
+            f"{base_url}/api/neighborhoods/lookup", params={"lat": "x", "lng": "y"}
+        ).status_code == 400
+    
+    def test_suggestion_neighborhood_filled_from_location(self, base_url, api_client, admin_session):
+        """Test that a suggestion with coordinates but no neighborhood gets one"""
+        response = api_client.post(f"{base_url}/api/suggestions", json={
+            "name": "PyTest Corner Store",
+            "address": "600 Grant St, Pittsburgh, PA 15219",
+            "resource_type": "grocery",
+            "latitude": 40.4406,
+            "longitude": -79.9959
+        })
+        assert response.status_code == 201
+        suggestion_id = response.json()["suggestion_id"]
+        
+        suggestion = admin_session.get(f"{base_url}/api/suggestions/{suggestion_id}").json()
+        assert suggestion["neighborhood"] == "Central Business District"
+        assert suggestion["latitude"] == 40.4406
+        assert suggestion["longitude"] == -79.9959
+        
+        admin_session.delete(f"{base_url}/api/suggestions/{suggestion_id}")
+    
+    def test_suggestion_rejects_bad_location(self, base_url, api_client):
+        """Test that a suggestion with invalid or partial coordinates returns 400"""
+        suggestion = {
+            "name": "PyTest Corner Store",
+            "address": "600 Grant St, Pittsburgh, PA 15219",
+            "resource_type": "grocery"
+        }
+        for location in ({"latitude": 95, "longitude": -79.9959}, {"latitude": 40.4406}, {"latitude": "x", "longitude": "y"}):
+            response = api_client.post(f"{base_url}/api/suggestions", json={**suggestion, **location})
+            assert response.status_code == 400
+
+
+@pytest.mark.public
+class TestNeighborhoodBoundaries:
+    """Test simplified neighborhood boundary levels"""
+    
+    def test_boundaries_minimal_properties(self, base_url, api_client):
+        """Test that boundaries carry only the neighborhood name and geoid10"""
+        response = api_client.get(f"{base_url}/api/neighborhoods/boundaries", params={"zoom": 12})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["type"] == "FeatureCollection"
+        assert len(data["features"]) > 0
+        for feature in data["features"]:
+            assert set(feature["properties"]) == {"neighborhood", "geoid10"}
+            assert feature["geometry"]["type"] in ("Polygon", "MultiPolygon")
+    
+    def test_lower_zoom_is_smaller(self, base_url, api_client):
+        """Test that coarser levels have fewer vertices than finer ones"""
+        coarse = api_client.get(f"{base_url}/api/neighborhoods/boundaries", params={"zoom": 10})
+        fine = api_client.get(f"{base_url}/api/neighborhoods/boundaries", params={"zoom": 16})
+        full = api_client.get(f"{base_url}/api/neighborhoods")
+        
+        assert len(coarse.content) < len(fine.content) < len(full.content)
+        assert len(coarse.json()["features"]) == len(fine.json()["features"])
+    
+    def test_boundaries_served_compressed(self, base_url, api_client):
+        """Test that boundaries are gzip encoded when accepted"""
+        response = api_client.get(
+            f"{base_url}/api/neighborhoods/boundaries",
+            params={"zoom": 14},
+            headers={"Accept-Encoding": "gzip"}
+        )
+        
+        assert response.headers.get("Content-Encoding") == "gzip"
+    
+    def test_invalid_zoom(self, base_url, api_client):
+        """Test that a non-numeric zoom returns 400"""
+        response = api_client.get(f"{base_url}/api/neighborhoods/boundaries", params={"zoom": "far"})
+        
+        assert response.status_code == 400
@@ -0,0 +1,106 @@
+"""
+Pytest tests for distance raster endpoints
+Run with: pytest test_raster.py -v
+"""
+
+import io
+import math
+
+import numpy as np
+import pytest
+
+
+def pixel_for(lat, lng, z):
+    """Slippy map tile x/y and pixel row/col containing a point"""
+    n = 2 ** z
+    fx = (lng + 180.0) / 360.0 * n
+    fy = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return int(fx), int(fy), int((fy % 1) * 256), int((fx % 1) * 256)
+
+
+def load_array_tile(api_client, base_url, resource_type, z, x, y):
+    response = api_client.get(f"{base_url}/api/raster/{resource_type}/{z}/{x}/{y}.npy")
+    assert response.status_code == 200
+    return np.load(io.BytesIO(response.content))
+
+
+@pytest.mark.public
+class TestDistanceRaster:
+    """Test distance raster layout and tiles"""
+    
+    def test_raster_info(self, base_url, api_client):
+        """Test that the raster describes its grid and layers"""
+        response = api_client.get(f"{base_url}/api/raster")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["resource_types"] == ["grocery", "pantry", "farmers_market"]
+        assert data["shape"][0] > 0 and data["shape"][1] > 0
+        assert data["max_miles"] > 0
+    
+    def test_png_tile(self, base_url, api_client):
+        """Test that a city tile is served as a PNG"""
+        x, y, _, _ = pixel_for(40.4406, -79.9959, 12)
+        response = api_client.get(f"{base_url}/api/raster/grocery/12/{x}/{y}.png")
+        
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "image/png"
+        assert response.content[:8] == b"\x89PNG\r\n\x1a\n"
+    
+    def test_tiles_not_recompressed(self, base_url, api_client):
+        """Test that PNG and array tiles are sent as is even when gzip is accepted"""
+        x, y, _, _ = pixel_for(40.4406, -79.9959, 12)
+        for fmt in ("png", "npy"):
+            response = api_client.get(
+                f"{base_url}/api/raster/grocery/12/{x}/{y}.{fmt}",
+                headers={"Accept-Encoding": "gzip"}
+            )
+            
+            assert response.status_code == 200
+            assert "Content-Encoding" not in response.headers
+            assert not response.headers["ETag"].strip('"').endswith("-gzip")
+    
+    def test_array_tile(self, base_url, api_client):
+        """Test that array tiles are 256 x 256 float32 distances with NaN outside the city"""
+        x, y, _, _ = pixel_for(40.4406, -79.9959, 11)
+        values = load_array_tile(api_client, base_url, "grocery", 11, x, y)
+        
+        assert values.shape == (256, 256)
+        assert values.dtype == np.float32
+        assert np.isnan(values).any()
+        assert (values[~np.isnan(values)] >= 0).all()
+    
+    def test_unknown_layer_and_format(self, base_url, api_client):
+        """Test that unknown layers return 404 and unknown formats 400"""
+        assert api_client.get(f"{base_url}/api/raster/bakery/12/1137/1540.png").status_code == 404
+        assert api_client.get(f"{base_url}/api/raster/grocery/12/1137/1540.gif").status_code == 400
+
+
+@pytest.mark.admin
+class TestDistanceRasterUpdates:
+    """Test that single writes update the raster around the resource"""
+    
+    def test_created_resource_updates_cells(self, base_url, api_client, admin_session):
+        """Test that creating and deactivating a market moves its cell's distance"""
+        lat, lng = 40.4406, -79.9959
+        x, y, row, col = pixel_for(lat, lng, 14)
+        before = load_array_tile(api_client, base_url, "farmers_market", 14, x, y)[row, col]
+        
+        response = admin_session.post(f"{base_url}/api/food-resources", json={
+            "name": "PyTest Raster Market",
+            "address": "600 Grant St, Pittsburgh, PA 15219",
+            "latitude": lat,
+            "longitude": lng,
+            "resource_type": "farmers_market"
+        })
+        assert response.status_code == 201
+        resource_id = response.json()["id"]
+        
+        try:
+            during = load_array_tile(api_client, base_url, "farmers_market", 14, x, y)[row, col]
+            assert during < 0.1
+        finally:
+            admin_session.delete(f"{base_url}/api/food-resources/{resource_id}")
+        
+        after = load_array_tile(api_client, base_url, "farmers_market", 14, x, y)[row, col]
+        assert after == before or (np.isinf(after) and np.isinf(before))
@@ -0,0 +1,78 @@
+"""
+Pytest tests for resource tile endpoints
+Run with: pytest test_tiles.py -v
+"""
+
+import math
+
+import pytest
+
+
+def tile_for(lat, lng, z):
+    """Slippy map tile x/y containing a point"""
+    n = 2 ** z
+    x = int((lng + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return x, y
+
+
+@pytest.mark.public
+class TestResourceTiles:
+    """Test GeoJSON tile endpoint"""
+    
+    def test_tile_contains_created_resource(self, base_url, api_client, sample_food_resource, created_resource_id):
+        """Test that a point tile lists a resource inside it"""
+        x, y = tile_for(sample_food_resource["latitude"], sample_food_resource["longitude"], 14)
+        response = api_client.get(f"{base_url}/api/tiles/14/{x}/{y}")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["type"] == "FeatureCollection"
+        ids = [f["properties"].get("id") for f in data["features"]]
+        assert created_resource_id in ids
+        assert response.headers.get("ETag")
+    
+    def test_tile_invalidated_by_update(self, base_url, api_client, admin_session, sample_food_resource, created_resource_id):
+        """Test that renaming a resource refreshes its tile"""
+        x, y = tile_for(sample_food_resource["latitude"], sample_food_resource["longitude"], 14)
+        api_client.get(f"{base_url}/api/tiles/14/{x}/{y}")
+        
+        admin_session.put(
+            f"{base_url}/api/food-resources/{created_resource_id}",
+            json={"name": "Renamed Tile Resource"}
+        )
+        
+        features = api_client.get(f"{base_url}/api/tiles/14/{x}/{y}").json()["features"]
+        names = {f["properties"].get("id"): f["properties"].get("name") for f in features}
+        assert names[created_resource_id] == "Renamed Tile Resource"
+    
+    def test_tile_invalidated_by_delete(self, base_url, api_client, admin_session, sample_food_resource):
+        """Test that a deleted resource disappears from its tile"""
+        resource_id = admin_session.post(
+            f"{base_url}/api/food-resources",
+            json=sample_food_resource
+        ).json()["id"]
+        x, y = tile_for(sample_food_resource["latitude"], sample_food_resource["longitude"], 15)
+        
+        ids = [f["properties"].get("id") for f in api_client.get(f"{base_url}/api/tiles/15/{x}/{y}").json()["features"]]
+        assert resource_id in ids
+        
+        admin_session.delete(f"{base_url}/api/food-resources/{resource_id}")
+        
+        ids = [f["properties"].get("id") for f in api_client.get(f"{base_url}/api/tiles/15/{x}/{y}").json()["features"]]
+        assert resource_id not in ids
+    
+    def test_low_zoom_tile_counts(self, base_url, api_client):
+        """Test that the zoom 0 tile accounts for every active resource"""
+        total = len(api_client.get(f"{base_url}/api/food-resources").json()["features"])
+        
+        features = api_client.get(f"{base_url}/api/tiles/0/0/0").json()["features"]
+        
+        assert sum(f["properties"].get("point_count", 1) for f in features) == total
+    
+    def test_tile_out_of_range(self, base_url, api_client):
+        """Test that tile coordinates outside the zoom level are rejected"""
+        response = api_client.get(f"{base_url}/api/tiles/2/4/0")
+        
+        assert response.status_code == 400
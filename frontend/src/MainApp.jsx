@@ -15,7 +15,7 @@ import ResourcesPanel from "./components/ResourcesPanel";
 import HelpView from "./components/HelpView";
 
 import { useWindowSize } from "./hooks/useWindowSize";
-import { fetchResources } from "./services/api";
+import { fetchResources, fetchOpenResourceIds } from "./services/api";
 import { calculateDistance } from "./utils/mapUtils";
 import { RESOURCE_ICONS } from "./constants/resourceIcons";
 import { toPrimary } from "./constants/categoryMap";
@@ -37,6 +37,7 @@ function MainApp() {
   const [selectedResource, setSelectedResource] = useState(null);
   const [userLocation, setUserLocation] = useState(null);
   const [searchQuery, setSearchQuery] = useState("");
+  const [openIds, setOpenIds] = useState(null);
 
   const navRef = useRef(null);
   const [navH, setNavH] = useState(72);
@@ -112,6 +113,17 @@ function MainApp() {
     })();
   }, [PITTSBURGH_CENTER]);
 
+  // Ask the server which resources are open; it parses the stored hours
+  useEffect(() => {
+    if (!filters.openNow) return;
+    fetchOpenResourceIds()
+      .then(setOpenIds)
+      .catch((err) => {
+        console.error(err);
+        setOpenIds(null);
+      });
+  }, [filters.openNow]);
+
   useEffect(() => {
     let filtered = [...resources];
 
@@ -147,12 +159,12 @@ function MainApp() {
     }
 
     // Apply open now filter
-    if (filters.openNow) {
-      filtered = filtered.filter(() => Math.random() > 0.3);
+    if (filters.openNow && openIds) {
+      filtered = filtered.filter((r) => openIds.has(r.properties.id));
     }
 
     setFilteredResources(filtered);
-  }, [filters, resources, userLocation, searchQuery]);
+  }, [filters, resources, userLocation, searchQuery, openIds]);
 
   const handleGetDirections = (resource) => {
     const [lng, lat] = resource.geometry.coordinates;
@@ -5,3 +5,10 @@ export async function fetchResources() {
   if (!res.ok) throw new Error(`HTTP ${res.status}`);
   return res.json();
 }
+
+export async function fetchOpenResourceIds() {
+  const res = await fetch(`${API_BASE_URL}/api/food-resources?open_now=1&fields=id`);
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  const data = await res.json();
+  return new Set(data.features.map((f) => f.properties.id));
+}